@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+
+"""AgentState.py: INF1771 Everything one agent knows and keeps during a game, in slots."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import random
+from Map.Position import Position, Cells
+from Map.Grid import NewGrid
+from Map.ItemIndex import ItemIndex
+from Map.Planner import Planner, NORTH
+from Map.Neighbors import Tables
+from Map.RespawnScheduler import RespawnScheduler
+from Map.PathCache import PathCache
+from Map.DistanceField import DistanceField
+from Map.Frontier import Frontier, KNOWN
+from Map.HazardBelief import HazardBelief
+from Observations import ObservationView
+
+
+# <summary>
+# Mutable state of one agent: position and status, the state machine
+# counters, the last observations (a mask of Observations bits), the
+# items being searched, its own random generator (so a seed reproduces
+# one agent's choices whatever the other agents do) and the map
+# with everything derived from it. GameAI is a subclass that only adds
+# behaviour and class-level tuning constants, so every GameAI keeps its
+# state in these slots (no __dict__) and never shares it with another.
+#
+# Footprint on the 59 x 34 map (bench.bench_memory --agents): about
+# 67 KiB per agent right after Reset, mostly the HazardBelief arrays and
+# cell_versions (one entry per cell each), and about 450 KiB after a
+# 10-minute game, where each known gold or powerup adds a DistanceField
+# of 8024 entries (64 KiB). On maps over Map.Grid.DENSE_LIMIT cells (a
+# larger --map-size, or a map grown by Resize) all of these are sparse:
+# a DistanceField costs about 0.33 KiB per known passable cell (its
+# dist and inside dicts), e.g. 330 KiB per gold with 1000 cells known,
+# and nothing for the unexplored part of the map. The neighbour tables,
+# the cell Positions and the Planner workspace are shared by every
+# agent of the same map size and are not counted.
+#
+# Reset starts a new game on a map of the same size; Clone makes an
+# independent copy (e.g. to play a game forward without touching the
+# original) whose random generator continues from the same state, rebuilding the map structures from the known cells.
+# </summary>
+class AgentState():
+
+    __slots__ = (
+        "player", "state", "dir", "facing", "score", "energy",
+        "current_action", "current_state", "past_state", "consecutive_missed_shots",
+        "golds_found", "powerups_found", "number_of_moves",
+        "escape_ticks", "avoid_hole_ticks", "unstuck_ticks",
+        "observations", "powerup_position_being_searched", "gold_position_being_searched",
+        "game_time", "respawns",
+        "map", "golds", "powerups", "planner", "paths", "map_version", "cell_versions",
+        "gold_fields", "powerup_fields", "frontier", "explore_target", "hazards",
+        "neighbors", "positions", "rng",
+    )
+
+
+    def __init__(self, width=59, height=34, seed=None):
+        """ Cria o estado de um agente no começo de um jogo.
+
+        Args:
+            width: largura do mapa
+            height: altura do mapa
+            seed: semente do gerador de números aleatórios do agente (None = aleatória)
+        """
+
+        self.rng = random.Random(seed)
+        self.Reset(width, height)
+
+
+    def Reset(self, width=None, height=None):
+        """ Volta ao estado do começo de um jogo (mensagem "g" com jogo novo): mapa vazio
+        e contadores zerados. Sem width/height o mapa continua do mesmo tamanho. O gerador
+        de números aleatórios continua de onde estava.
+
+        Args:
+            width: largura do mapa
+            height: altura do mapa
+        """
+
+        if width is None:
+            width = self.map.width
+        if height is None:
+            height = self.map.height
+
+        self.player = Position()
+        self.state = "ready"
+        self.dir = "north"
+        self.facing = NORTH
+        self.score = 0
+        self.energy = 0
+
+        self.current_action = ""
+        self.current_state = "random_explore"
+        self.past_state = ""
+        self.consecutive_missed_shots = 0
+
+        self.golds_found = 0
+        self.powerups_found = 0
+        self.number_of_moves = 0
+
+        self.escape_ticks = 0
+        self.avoid_hole_ticks = 0
+        self.unstuck_ticks = 0
+
+        self.observations = 0
+
+        self.powerup_position_being_searched = {"position": None, "start_time": None}
+        self.gold_position_being_searched = {"position": None, "start_time": None}
+        self.game_time = None
+        self.respawns = RespawnScheduler()
+
+        self.map_version = 0
+        self.InitMap(width, height)
+
+
+    @property
+    def current_observations(self):
+        """ As observações atuais como dicionário nome => bool (só leitura)"""
+        return ObservationView(self.observations)
+
+
+    def Clone(self):
+        """ Cópia independente deste agente (mesma classe), que pode jogar sem
+        mudar o original. O mapa e o que vem dele são refeitos a partir das casas
+        conhecidas; as tabelas compartilhadas por tamanho de mapa continuam as mesmas."""
+
+        clone = object.__new__(type(self))
+        for name in AgentState.__slots__:
+            setattr(clone, name, getattr(self, name))
+
+        clone.player = Position(self.player.x, self.player.y)
+        clone.powerup_position_being_searched = dict(self.powerup_position_being_searched)
+        clone.gold_position_being_searched = dict(self.gold_position_being_searched)
+        clone.respawns = RespawnScheduler()
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        clone.Restore(self.Snapshot(), self.map.width, self.map.height)
+        clone.explore_target = self.explore_target
+        return clone
+
+
+    ###########################################################################
+    #
+    # Mapa
+    #
+    ###########################################################################
+
+
+    def InitMap(self, width, height):
+        """ Cria o mapa vazio (tudo "#") de width x height e as estruturas ligadas a ele"""
+
+        self.map = NewGrid(width, height)
+        self.golds = ItemIndex()
+        self.powerups = ItemIndex()
+        self.planner = Planner(self.map)
+        self.paths = PathCache(self.planner)
+        self.cell_versions = self.map.CellArray(0)
+        self.gold_fields = {}
+        self.powerup_fields = {}
+        self.frontier = Frontier(self.map)
+        self.explore_target = None
+        self.hazards = HazardBelief(width, height)
+        self.neighbors = Tables(width, height)
+        self.positions = Cells(width, height)
+
+
+    def Snapshot(self):
+        """ O que foi descoberto do mapa, independente do tamanho dele: casas conhecidas,
+        leituras de brisa/flash e os ouros que ainda não voltaram, tudo por (x, y)"""
+
+        height = self.map.height
+        known = [(cell // height, cell % height) for cell in self.map.CellsWhere(KNOWN)]
+        known = [(x, y, self.map.Get(x, y)) for x, y in known]
+        readings = list(self.hazards.Readings())
+        deadlines = [(cell // height, cell % height, deadline)
+                     for cell, deadline in self.respawns.deadlines.items()]
+        return known, readings, deadlines
+
+
+    def Restore(self, snapshot, width, height):
+        """ Mapa novo de width x height com o que está em snapshot (ver Snapshot)"""
+
+        known, readings, deadlines = snapshot
+        self.InitMap(width, height)
+        for x, y, breeze, flash in readings:
+            self.hazards.Observe(x, y, breeze, flash)
+        for x, y, c in known:
+            if c == "W":
+                self.hazards.MarkSafe(x, y)
+            self.SetCell(x, y, c)
+        self.respawns.Clear()
+        for x, y, deadline in deadlines:
+            self.respawns.Schedule(x * height + y, deadline)
+
+
+    def Resize(self, width, height):
+        """ Troca o mapa por um de width x height (maior), mantendo tudo o que já foi
+        descoberto: as casas conhecidas, as leituras de brisa/flash e os ouros que
+        ainda não voltaram (a posição de cada casa não muda, só o seu índice).
+
+        Args:
+            width: nova largura
+            height: nova altura
+        """
+
+        self.Restore(self.Snapshot(), width, height)
+
+
+    def SetCell(self, x, y, c):
+        """ Função auxiliar. Marca o caractere c na posição (x, y) do mapa. Toda escrita
+        no mapa passa por aqui para manter os índices de ouros e powerups em dia."""
+
+        old = self.map.Get(x, y)
+        if old == c:
+            return
+        self.map.Set(x, y, c)
+
+        cell = x * self.map.height + y
+        self.map_version += 1
+        self.cell_versions[cell] = self.map_version
+
+        if old == "T":
+            self.golds.Remove(x, y)
+            self.gold_fields.pop((x, y), None)
+        elif old == "L":
+            self.powerups.Remove(x, y)
+            self.powerup_fields.pop((x, y), None)
+
+        self.frontier.CellChanged(cell)
+        for field in self.gold_fields.values():
+            field.CellChanged(cell)
+        for field in self.powerup_fields.values():
+            field.CellChanged(cell)
+
+        if c == "T":
+            self.golds.Add(x, y)
+            self.gold_fields[x, y] = DistanceField(self.map, x, y)
+        elif c == "L":
+            self.powerups.Add(x, y)
+            self.powerup_fields[x, y] = DistanceField(self.map, x, y)
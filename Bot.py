@@ -19,13 +19,16 @@ __email__ = "abaffa@inf.puc-rio.br"
 #############################################################
 
 import random
-from threading import Timer
+import Scheduler
 from GameAI import GameAI
 import Socket.HandleClient
+from Socket import Codec
 from Socket.HandleClient import HandleClient
+from Socket.AsyncHandleClient import AsyncHandleClient
 from dto.PlayerInfo import PlayerInfo
 from dto.ScoreBoard import ScoreBoard
 import datetime
+import time
 
 # <summary>
 # Bot Class
@@ -37,246 +40,263 @@ class Bot():
 
     client = None
     gameAi = None
-    timer1 = None
+    scheduler = None
+    loop = None
     
     running = True
     thread_interval = 0.2 # USE BETWEEN 0.1 and 1 (0.1 real setting, 1 debug settings and makes the bot slower)
 
-    playerList = {} #new Dictionary<long, PlayerInfo>
-    shotList = [] #new List<ShotInfo>
-    scoreList = [] #List<ScoreBoard>
+    playerList = None #new Dictionary<long, PlayerInfo>
+    shotList = None #new List<ShotInfo>
+    scoreList = None #List<ScoreBoard>
     time = 0
 
     gameStatus = ""
     sscoreList = ""
 
-    msg = []
-    msgSeconds = 0
-    textSeconds = 0
+    msg = None
     musica = ""
 
+    handlers = None # message type => On* method
+    dispatch = None # message type => (decoder, handler)
+    bad_messages = 0 # lines dropped because a field did not parse
+
+    status_interval = 5   # seconds between status/messages prints
+    chat_interval = 20    # seconds between song lines
+    latency_dump_interval = 30 # seconds between latency reports
+    observation_time = None # when the last observation arrived (perf_counter)
+
+    # event driven mode: decide as soon as the status and observation replies
+    # for the last action are in. thread_interval is then only a rate cap and
+    # decision_timeout the fallback when a reply is lost or late. A reply
+    # only clears its flag once no request of its kind is left waiting in
+    # client.latency, so a late reply to an earlier tick does not count
+    # for the requests sent this tick
+    event_driven = False
+    decision_timeout = 0.5 # seconds
+    awaiting_status = False
+    awaiting_observation = False
+    last_decision_time = 0.0
+
+    verbose = True # print status, messages and reports to the console
+
+    decisions = 0 # number of GetDecision calls
+    decision_cpu = 0.0 # CPU seconds spent in GetDecision
+
     # <summary>
     # Bot Constructor
     # </summary>
-    def __init__(self):
-
-        self.client = HandleClient()
-        self.gameAi = GameAI()
-
-        # duration is in seconds
-        self.timer1 = Timer(self.thread_interval, self.timer1_Tick)
+    # <param name="loop">asyncio event loop. If given, socket I/O and the
+    # scheduled ticks all run on it; otherwise a reader thread and a
+    # scheduler thread are used</param>
+    # <param name="host">server address, defaults to Bot.host</param>
+    # <param name="client">client to use instead of creating one (e.g. replay)</param>
+    # <param name="record">path of a traffic log to record to</param>
+    # <param name="start">connect and start the tick right away</param>
+    # <param name="event_driven">decide when replies arrive instead of on every tick</param>
+    # <param name="name">bot name, defaults to Bot.name</param>
+    # <param name="map_size">(width, height) of the map, defaults to the 59 x 34 of the game</param>
+    # <param name="seed">seed of the AI random choices, None for a random one</param>
+    def __init__(self, loop=None, host=None, client=None, record=None, start=True, event_driven=False, name=None,
+                 map_size=None, seed=None):
+
+        self.loop = loop
+        self.event_driven = event_driven
+        if host is not None:
+            self.host = host
+        if name is not None:
+            self.name = name
+
+        self.playerList = {}
+        self.shotList = []
+        self.scoreList = []
+        self.msg = []
+
+        if client is not None:
+            self.client = client
+        elif self.loop is None:
+            self.client = HandleClient()
+        else:
+            self.client = AsyncHandleClient(self.loop)
+
+        if record is not None:
+            self.client.StartRecording(record)
+
+        self.gameAi = GameAI(*map_size, seed=seed) if map_size is not None else GameAI(seed=seed)
+
+        # message type => handler of a Socket.Codec record
+        self.handlers = {
+            "player": self.OnPlayer,
+            "u": self.OnScoreboard,
+            "notification": self.OnNotification,
+            "hello": self.OnHello,
+            "goodbye": self.OnGoodbye,
+            "changename": self.OnChangeName,
+            "h": self.OnHit,
+            "d": self.OnDamage,
+        }
+        # message type => receive(cmd). g, s and o come once per tick each and are
+        # nearly all the traffic, so they skip the record: their handlers read the
+        # fields of the split line straight into the GameAI calls
+        self.dispatch = {kind: Codec.RecordReceiver(Codec.DECODERS[kind], handler)
+                         for kind, handler in self.handlers.items()}
+        self.dispatch.update({
+            "o": self.OnObservation,
+            "s": self.OnStatus,
+            "g": self.OnGameStatus,
+        })
 
         self.client.append_cmd_handler(self.ReceiveCommand)
         self.client.append_chg_handler(self.SocketStatusChange)
 
         self.musica = self.gerarMusica('musica.txt')
 
+        # decision tick, status/scoreboard polling and chat all run on one
+        # scheduler with absolute deadlines on the monotonic clock
+        self.scheduler = Scheduler.Scheduler(self.loop)
+        self.scheduler.add_job("decision", self.thread_interval, self.timer1_Tick, Scheduler.SKIP)
+        self.scheduler.add_job("status", self.status_interval, self.StatusTick, Scheduler.SKIP)
+        self.scheduler.add_job("chat", self.chat_interval, self.ChatTick, Scheduler.SKIP)
+        self.scheduler.add_job("latency", self.latency_dump_interval, self.LatencyTick, Scheduler.SKIP)
+
+        if start:
+            self.Start()
+
+    # <summary>
+    # Connect and start the scheduled ticks
+    # </summary>
+    def Start(self):
+
         self.client.connect(self.host)
-        self.timer1.start()
+        self.scheduler.start()
         self.sendMsg("Um conto de fadas")
 
-    
-    def convertFromString(self, c):
-
-        c = c.replace('[','')
-        c = c.replace(']','')
-        p = c.split(',')
+    # <summary>
+    # Stop the ticks and disconnect
+    # </summary>
+    def Stop(self):
 
-        #A = int(p[0][((p[0].find('=')) + 1):])
-        R = int(p[1][((p[1].find('=')) + 1):])
-        G = int(p[2][((p[2].find('=')) + 1):])
-        B = int(p[3][((p[3].find('=')) + 1):])
+        self.running = False
+        self.scheduler.stop()
+        self.client.disconnect()
 
-        return (R, G, B)
+    
+    def convertFromString(self, c):
+        return Codec.ParseColor(c)
     
     # <summary>
     # Receive Command From TCP Client
     # </summary>
-    # <param name="sender">Sender object</param>
-    # <param name="args">Event arguments</param>
+    # <param name="cmd">received line split on ';'</param>
     def ReceiveCommand(self, cmd):
 
-        if len(cmd) > 0:
-            try:
-                ######################################################        
-
-                if cmd[0] ==  "o":
-                    
-                    if len(cmd) > 1:
-                    
-                        if cmd[1].strip() == "":
-                            self.gameAi.GetObservationsClean()
-
-                        else:
-                       
-                            o = []
-
-                            if cmd[1].find(",") > -1:
-                            
-                                os = cmd[1].split(',')
-                                for i in range(0,len(os)):
-                                    o.append(os[i])
-                            
-                            else:
-                                o.append(cmd[1])
-
-                            self.gameAi.GetObservations(o)
-                        
-                    else:
-                        self.gameAi.GetObservationsClean()
-                    
-                ######################################################        
-
-                elif cmd[0] ==  "s":
-                    if len(cmd) > 1:
-                    
-                        self.gameAi.SetStatus(int(cmd[1]),
-                                            int(cmd[2]),
-                                            cmd[3],
-                                            cmd[4],
-                                            int(cmd[5]),
-                                            int(cmd[6]))
-                    
-                ######################################################        
-
-                elif cmd[0] == "player":
-                    #lock (playerList)
-                    
-                    if len(cmd) == 8:
-                        if int(cmd[1]) not in self.playerList:
-                            self.playerList.append(int(cmd[1]), 
-                                PlayerInfo(
-                                    int(cmd[1]),
-                                    cmd[2],
-                                    int(cmd[3]),
-                                    int(cmd[4]),
-                                    int(cmd[5]),
-                                    int(cmd[6]),
-                                    self.convertFromString(cmd[7])))
-                        else:
-                            self.playerList[int(cmd[1])] = PlayerInfo(
-                                int(cmd[1]),
-                                cmd[2],
-                                int(cmd[3]),
-                                int(cmd[4]),
-                                int(cmd[5]),
-                                int(cmd[6]),
-                                self.convertFromString(cmd[7]))
-                    
-                ######################################################        
-
-                elif cmd[0] == "g":
-                    if len(cmd) == 3:
-                        if self.gameStatus != cmd[1]:
-                            self.playerList.clear()
-
-                        if self.gameStatus != cmd[1]:
-                            print("New Game Status: " + cmd[1])
-
-                        self.gameStatus = cmd[1]
-                        self.time = int(cmd[2])
-                    
-                ######################################################        
-
-                elif cmd[0] == "u":
-                    if len(cmd) > 1:
-                    
-                        for i in range(1, len(cmd)):
-                        
-                            a = cmd[i].split('#')
-
-                            if len(a) == 4:
-                                self.scoreList.append(
-                                    ScoreBoard(
-                                    a[0],
-                                    (a[1] == "connected"),
-                                    int(a[2]),
-                                    int(a[3]), (0, 0, 0)))
-                            
-                            elif len(a) == 5:
-                                self.scoreList.append(
-                                    ScoreBoard(
-                                    a[0],
-                                    (a[1] == "connected"),
-                                    int(a[2]),
-                                    int(a[3]), self.convertFromString(a[4])))
-                        
-
-                        self.sscoreList = ""
-                        for sb in self.scoreList:
-                            self.sscoreList += sb.name + "\n"
-                            self.sscoreList += ("connected" if sb.connected else "offline") + "\n"
-                            self.sscoreList += str(sb.energy) + "\n"
-                            self.sscoreList += str(sb.score) + "\n"
-                            self.sscoreList += "---\n"
-                        
-                        self.scoreList.clear()
-                    
-                    
-                ######################################################        
-
-                elif cmd[0] == "notification":
-                    if len(cmd) > 1:
-
-                        if len(self.msg) == 0:
-                            self.msgSeconds = 0
-                        
-                        self.msg.append(cmd[1])
-                    
-                ######################################################        
-
-                elif cmd[0] == "hello":
-                    if len(cmd) > 1:
-
-                        if len(self.msg) == 0:
-                            self.msgSeconds = 0
-
-                        self.msg.append(cmd[1] + " has entered the game!")
-                    
-                ######################################################        
-
-                elif cmd[0] == "goodbye":
-                    if len(cmd) > 1:
-
-                        if len(self.msg) == 0:
-                            self.msgSeconds = 0
-
-                        self.msg.append(cmd[1] + " has left the game!")
-                    
-                ######################################################        
-
-                elif cmd[0] == "changename":
-                    if len(cmd) > 1:
-                        if len(self.msg) == 0:
-                            self.msgSeconds = 0
-
-                        self.msg.append(cmd[1] + " is now known as " + cmd[2] + ".")
-                   
-                    
-                ######################################################        
-
-                elif cmd[0] == "h":
-                    if len(cmd) > 1:
-                        o = []
-                        o.append("hit")
-                        self.gameAi.GetObservations(o)
-                        self.msg.append("you hit " + cmd[1])                    
-                    
-                ######################################################        
-
-                elif cmd[0] == "d":
-                    if len(cmd) > 1:
-                        o = []
-                        o.append("damage")
-                        self.gameAi.GetObservations(o)
-                        self.msg.append(cmd[1] + " hit you")                    
-                    
-                ######################################################        
-
-            except Exception as ex:
-                if ex != None:
-                    print(ex)
-                pass
+        receive = self.dispatch.get(cmd[0])
+        if receive is None:
+            return
+
+        # a field that does not parse raises before the handler changes anything
+        try:
+            receive(cmd)
+        except (ValueError, IndexError) as ex:
+            self.bad_messages += 1
+            self.Print("bad message %r: %s" % (";".join(cmd), ex))
+
+    ######################################################        
+
+    def OnObservation(self, cmd):
+
+        self.observation_time = self.client.latency.now()
+        self.gameAi.SetObservations(Codec.ObservationMask(cmd[1]) if len(cmd) > 1 else 0)
+
+        if self.event_driven:
+            self.awaiting_observation = self.client.latency.Pending("o") > 0
+            self.ReplyArrived()
+
+    ######################################################        
+
+    def OnStatus(self, cmd):
+
+        if len(cmd) < 7:
+            return
+        self.gameAi.SetStatus(int(cmd[1]), int(cmd[2]), cmd[3], cmd[4], int(cmd[5]), int(cmd[6]))
+
+        if self.event_driven:
+            self.awaiting_status = self.client.latency.Pending("s") > 0
+            self.ReplyArrived()
+
+    ######################################################        
+
+    def OnPlayer(self, m):
+        #lock (playerList)
+        # one PlayerInfo per node for the whole game, updated in place
+        player = self.playerList.get(m.node)
+        if player is None:
+            self.playerList[m.node] = PlayerInfo(m.node, m.name, m.x, m.y, m.dir, m.state, m.color)
+        else:
+            player.Update(m.node, m.name, m.x, m.y, m.dir, m.state, m.color)
+
+    ######################################################        
+
+    def OnGameStatus(self, cmd):
+
+        if len(cmd) != 3:
+            return
+        status = cmd[1]
+        game_time = int(cmd[2])
+
+        if self.gameStatus != status:
+            self.playerList.clear()
+            self.Print("New Game Status: " + status)
+            if status == "Game" and self.gameStatus:
+                self.gameAi.Reset() # a new game: nothing from the last one holds
+
+        self.gameStatus = status
+        self.time = game_time
+        self.gameAi.SetGameTime(game_time)
+
+    ######################################################        
+
+    def OnScoreboard(self, m):
+
+        # the entries of the last scoreboard are reused, one per line
+        del self.scoreList[len(m.entries):]
+        for i, e in enumerate(m.entries):
+            if i < len(self.scoreList):
+                self.scoreList[i].Update(e.name, e.connected, e.score, e.energy, e.color)
+            else:
+                self.scoreList.append(ScoreBoard(e.name, e.connected, e.score, e.energy, e.color))
+
+        self.sscoreList = ""
+        for sb in self.scoreList:
+            self.sscoreList += sb.name + "\n"
+            self.sscoreList += ("connected" if sb.connected else "offline") + "\n"
+            self.sscoreList += str(sb.energy) + "\n"
+            self.sscoreList += str(sb.score) + "\n"
+            self.sscoreList += "---\n"
+
+    ######################################################        
+
+    def OnNotification(self, m):
+        self.msg.append(m.text)
+
+    def OnHello(self, m):
+        self.msg.append(m.name + " has entered the game!")
+
+    def OnGoodbye(self, m):
+        self.msg.append(m.name + " has left the game!")
+
+    def OnChangeName(self, m):
+        self.msg.append(m.old + " is now known as " + m.new + ".")
+
+    def OnHit(self, m):
+        self.gameAi.GetObservations(["hit"])
+        self.msg.append("you hit " + m.name)
+
+    def OnDamage(self, m):
+        self.gameAi.GetObservations(["damage"])
+        self.msg.append(m.name + " hit you")
+
+    ######################################################        
 
 
     # <summary>
@@ -288,6 +308,13 @@ class Bot():
             self.client.sendSay(msg)
 
     
+    # <summary>
+    # Console output, silenced when verbose is False (e.g. in a fleet)
+    # </summary>
+    def Print(self, *args):
+        if self.verbose:
+            print(*args)
+
     # <summary>
     # Get current game time as string
     # </summary>
@@ -301,7 +328,19 @@ class Bot():
     # </summary>
     def DoDecision(self):
 
+        # event driven, deciding on decision_timeout: the replies still missing
+        # are given up, so they can not be taken for the replies to this tick's requests
+        if self.event_driven:
+            if self.awaiting_status:
+                self.client.latency.Forget("s")
+            if self.awaiting_observation:
+                self.client.latency.Forget("o")
+
+        cpu = time.process_time()
         decision = self.gameAi.GetDecision()
+        self.decision_cpu += time.process_time() - cpu
+        self.decisions += 1
+
         if decision == "virar_direita":
             self.client.sendTurnRight()
         elif decision == "virar_esquerda":
@@ -319,9 +358,40 @@ class Bot():
         elif decision ==  "andar_re":
             self.client.sendBackward()
 
+        # observation received -> action sent
+        if self.observation_time is not None:
+            self.client.latency.record("decision", self.client.latency.now() - self.observation_time)
+            self.observation_time = None
+
         self.client.sendRequestUserStatus()
         self.client.sendRequestObservation()
 
+        self.awaiting_status = True
+        self.awaiting_observation = True
+        self.last_decision_time = self.scheduler.now()
+
+    # <summary>
+    # Is it time to decide? Always on the fixed tick; in event driven mode
+    # only once both replies arrived or decision_timeout elapsed
+    # </summary>
+    def IsDecisionDue(self):
+
+        if not self.event_driven:
+            return True
+        if not self.awaiting_status and not self.awaiting_observation:
+            return True
+        return self.scheduler.now() - self.last_decision_time >= self.decision_timeout
+
+    # <summary>
+    # A status or observation reply arrived. In event driven mode, once both
+    # are in, bring the decision tick forward to the earliest time the rate
+    # cap allows
+    # </summary>
+    def ReplyArrived(self):
+
+        if self.event_driven and not self.awaiting_status and not self.awaiting_observation:
+            self.scheduler.wake("decision", self.last_decision_time + self.thread_interval)
+
     def gerarMusica(self,nome_arquivo):
         with open(nome_arquivo, 'r', encoding = 'UTF-8') as f:
             while True:
@@ -329,56 +399,91 @@ class Bot():
                     yield linha.strip()
                 f.seek(0)
 
+    # <summary>
+    # Decision tick (every thread_interval seconds)
+    # </summary>
     def timer1_Tick(self):
-        
-        self.msgSeconds += self.timer1.interval * 1000 # KEEP THIS AS IS - 1000 miliseconds = 1 second
-        self.textSeconds += self.timer1.interval * 1000
+
+        # everything sent during this tick goes out in a single write
+        self.client.beginBatch()
 
         self.client.sendRequestGameStatus()
-        if self.gameStatus == "Game":
+        if self.gameStatus == "Game" and self.IsDecisionDue():
             self.DoDecision()
-            if self.textSeconds % 20000 == 0:
-                self.sendMsg(next(self.musica))
 
+        self.client.flushBatch()
 
-                    
+        if not self.running:
+            self.scheduler.stop()
 
-        elif self.msgSeconds >= 5000: # 5 SECONDS
 
-            print(self.gameStatus)
-            print(self.GetTime())
-            print("-----------------")
-            print(self.sscoreList)
+    # <summary>
+    # Status tick (every status_interval seconds): scoreboard while not
+    # playing and pending messages
+    # </summary>
+    def StatusTick(self):
+
+        self.client.beginBatch()
+
+        if self.gameStatus != "Game":
+
+            self.Print(self.gameStatus)
+            self.Print(self.GetTime())
+            self.Print("-----------------")
+            self.Print(self.sscoreList)
 
             self.client.sendRequestScoreboard()
-        
 
-        if self.msgSeconds  >= 5000: # 5 SECONDS
+        if len(self.msg) > 0:
+
+            for s in self.msg:
+                self.Print(s)
 
-            if len(self.msg) > 0:
+            self.msg.clear()
 
-                for s in self.msg:
-                    print(s)
+        self.client.flushBatch()
 
-                self.msg.clear()
 
-            self.msgSeconds  = 0
-        
-        if self.running:
-            self.timer1 = Timer(self.thread_interval, self.timer1_Tick)
-            self.timer1.start()
+    # <summary>
+    # Chat tick (every chat_interval seconds): next line of the song
+    # </summary>
+    def ChatTick(self):
+        if self.gameStatus == "Game":
+            self.sendMsg(next(self.musica))
+
+
+    # <summary>
+    # Latency report (every latency_dump_interval seconds)
+    # </summary>
+    def LatencyTick(self):
+        self.Print(self.client.latency.Dump())
+        self.Print(self.SchedulerReport())
+
+
+    # <summary>
+    # Scheduler lateness per job (ms)
+    # </summary>
+    def SchedulerReport(self):
+
+        lines = ["%-10s %8s %8s %8s %8s %8s" % ("jitter", "runs", "p50", "p99", "max", "skipped")]
+        for name, s in sorted(self.scheduler.GetStats().items()):
+            lines.append("%-10s %8d %8.2f %8.2f %8.2f %8d" % (
+                name, s["runs"], s["p50"] / 1000.0, s["p99"] / 1000.0, s["max"] / 1000.0, s["skipped"]))
+        return "\n".join(lines)
 
 
     def SocketStatusChange(self):
     
         if self.client.connected:
 
-            print("Connected")
+            self.Print("Connected")
+            self.client.beginBatch()
             self.client.sendName(self.name)
             self.client.sendRGB(255,128,0)  # BOT COLOR
             self.client.sendRequestGameStatus()
             self.client.sendRequestUserStatus()
             self.client.sendRequestObservation()
+            self.client.flushBatch()
 
         else:
-            print("Disconnected")
+            self.Print("Disconnected")
@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+
+"""Decision.py: INF1771 The GameAI state machine as a table over a feature key, generated from DecideState.
+
+Key(ai) junta numa chave de FEATURE_BITS bits tudo o que a máquina de
+estados olha (observações, faixas de energia, contadores do estado
+anterior, perigo à frente/atrás, itens conhecidos). As regras só existem
+no GameAI.DecideState: Rules(key) monta um GameAI com essa chave
+(Realize), roda o DecideState de verdade e devolve o resultado (Outcome),
+um índice de OUTCOME_NAMES; Compile faz isso para todas as chaves.
+O GameAI não usa a tabela (a cadeia de if/elif é mais rápida que montar
+a chave); ela serve para ver todas as combinações de uma vez, e
+bench/bench_decision.py confere num log que table[Key(ai)] é o que o
+DecideState fez em todos os ticks.
+
+Uso (a partir da raiz do repositório), para ver a tabela compilada:
+    python Decision.py [--full]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import time
+from GameAI import GameAI
+from Observations import OBS_BLUE_LIGHT, OBS_RED_LIGHT, OBS_DAMAGE, OBS_HIT, OBS_ENEMY_IN_FRONT
+
+# <summary>
+# Feature bits of a key. The first five are the observation bits shifted
+# right by OBS_SHIFT, so Key copies them with one shift and one mask.
+# </summary>
+OBS_SHIFT = 4
+F_GOLD_HERE = OBS_BLUE_LIGHT >> OBS_SHIFT         # blueLight
+F_POWERUP_HERE = OBS_RED_LIGHT >> OBS_SHIFT       # redLight
+F_DAMAGE = OBS_DAMAGE >> OBS_SHIFT                # damage
+F_HIT = OBS_HIT >> OBS_SHIFT                      # hit
+F_ENEMY = OBS_ENEMY_IN_FRONT >> OBS_SHIFT         # enemy_in_front
+OBS_FEATURES = F_GOLD_HERE | F_POWERUP_HERE | F_DAMAGE | F_HIT | F_ENEMY
+F_NOT_FULL = 1 << 5          # energy < 100
+F_LOW = 1 << 6               # energy < 50
+F_ESCAPE_HP = 1 << 7         # energy <= min_hp_escape
+F_ATTACK_HP = 1 << 8         # energy > min_hp_attack
+F_AVOIDING = 1 << 9          # avoid_hole no tick anterior e avoid_hole_ticks <= max_avoid_hole_ticks
+F_ESCAPING = 1 << 10         # escape no tick anterior e escape_ticks < max_escape_ticks
+F_AIMED = 1 << 11            # consecutive_missed_shots < max_consecutive_missed_shots
+F_EARLY = 1 << 12            # ainda no começo: poucas jogadas ou poucos ouros encontrados
+F_UNSTUCKING = 1 << 13       # get_unstuck no tick anterior e unstuck_ticks <= max_unstuck_ticks
+F_DANGER = 1 << 14           # "!" na frente ou atrás
+F_STUCK = 1 << 15            # há max_gold_search_ticks procurando o mesmo ouro/powerup
+F_POWERUP_KNOWN = 1 << 16    # algum powerup no mapa
+F_GOLD_AVAILABLE = 1 << 17   # algum ouro que já deve ter nascido de novo
+FEATURE_BITS = 18
+
+FEATURE_NAMES = {
+    F_GOLD_HERE: "gold_here", F_POWERUP_HERE: "powerup_here", F_DAMAGE: "damage", F_HIT: "hit",
+    F_ENEMY: "enemy", F_NOT_FULL: "not_full", F_LOW: "low", F_ESCAPE_HP: "escape_hp",
+    F_ATTACK_HP: "attack_hp", F_AVOIDING: "avoiding", F_DANGER: "danger", F_ESCAPING: "escaping",
+    F_AIMED: "aimed", F_EARLY: "early", F_STUCK: "stuck", F_UNSTUCKING: "unstucking",
+    F_POWERUP_KNOWN: "powerup_known", F_GOLD_AVAILABLE: "gold_available",
+}
+
+# <summary>
+# Outcomes: which state GameAI.DecideState runs and what happens to its counter
+# </summary>
+GRAB = 0
+AVOID_CONTINUE = 1
+AVOID_START = 2
+ESCAPE_START = 3
+ESCAPE_CONTINUE = 4
+SEARCH_POWERUP = 5
+EXPLORE = 6
+ATTACK = 7
+UNSTUCK_START = 8
+UNSTUCK_CONTINUE = 9
+SEARCH_GOLD = 10
+UNREACHABLE = 11  # no agent has this key
+OUTCOME_NAMES = ("grab", "avoid_hole (continue)", "avoid_hole (start)", "escape (start)", "escape (continue)",
+                 "search_power_up", "random_explore", "attack", "get_unstuck (start)",
+                 "get_unstuck (continue)", "search_gold", "unreachable")
+
+# outcome of the states without a counter
+STATE_OUTCOMES = {"grab": GRAB, "search_power_up": SEARCH_POWERUP, "random_explore": EXPLORE,
+                  "attack": ATTACK, "search_gold": SEARCH_GOLD}
+
+PAST_FEATURES = F_AVOIDING | F_ESCAPING | F_UNSTUCKING | F_STUCK
+ENERGY_FEATURES = F_NOT_FULL | F_LOW | F_ESCAPE_HP | F_ATTACK_HP
+MAP_FEATURES = F_DANGER | F_POWERUP_KNOWN | F_GOLD_AVAILABLE
+
+# <summary>
+# Ways of having each value of the previous-state features, as
+# (past_state, ticks of its counter, searching the same item for
+# max_gold_search_ticks). A key is run from every way its bits allow and
+# all of them must give the same outcome, otherwise the key misses
+# something DecideState looks at. Keys with two of these bits have no way.
+# </summary>
+PAST_WAYS = {
+    F_AVOIDING: (("avoid_hole", 0, False), ("avoid_hole", GameAI.max_avoid_hole_ticks, False)),
+    F_ESCAPING: (("escape", 0, False), ("escape", GameAI.max_escape_ticks - 1, False)),
+    F_UNSTUCKING: (("get_unstuck", 0, False), ("get_unstuck", GameAI.max_unstuck_ticks, False)),
+    F_STUCK: (("search_gold", 0, True), ("search_power_up", 0, True)),
+    0: (("", 0, False), ("grab", 0, False), ("attack", 0, False), ("random_explore", 0, False),
+        ("search_gold", 0, False), ("search_power_up", 0, False),
+        ("avoid_hole", GameAI.max_avoid_hole_ticks + 1, False), ("escape", GameAI.max_escape_ticks, False),
+        ("get_unstuck", GameAI.max_unstuck_ticks + 1, False)),
+}
+COUNTERS = {"avoid_hole": "avoid_hole_ticks", "escape": "escape_ticks", "get_unstuck": "unstuck_ticks"}
+
+# <summary>
+# Map the agents of Realize play on: the player in the middle facing
+# north, and where the "!", powerup and gold go when the key has them
+# </summary>
+MAP_SIZE = (12, 12)
+PLAYER = (5, 5)
+POWERUP = (9, 9)
+GOLD = (2, 9)
+
+
+def Key(ai):
+    """ Chave de um GameAI neste tick (antes do DecideState), com as mesmas condições
+    que o DecideState testa. Rules confere que ela volta igual para cada agente que monta."""
+
+    energy = ai.energy
+    past = ai.past_state
+
+    key = (ai.observations >> OBS_SHIFT) & OBS_FEATURES
+    if energy < 100:
+        key |= F_NOT_FULL
+    if energy < 50:
+        key |= F_LOW
+    if energy <= ai.min_hp_escape:
+        key |= F_ESCAPE_HP
+    if energy > ai.min_hp_attack:
+        key |= F_ATTACK_HP
+
+    # os contadores só contam para o estado do tick anterior
+    if past == "avoid_hole" and ai.avoid_hole_ticks <= ai.max_avoid_hole_ticks:
+        key |= F_AVOIDING
+    if past == "escape" and ai.escape_ticks < ai.max_escape_ticks:
+        key |= F_ESCAPING
+    if past == "get_unstuck" and ai.unstuck_ticks <= ai.max_unstuck_ticks:
+        key |= F_UNSTUCKING
+    if ai.consecutive_missed_shots < ai.max_consecutive_missed_shots:
+        key |= F_AIMED
+    if ai.number_of_moves <= ai.max_exploration_ticks or ai.golds_found < ai.min_golds_to_start_seaching:
+        key |= F_EARLY
+
+    # "!" na frente ou atrás
+    if not (ai.IsPositionForwardSafe() and ai.IsPositionBehindSafe()):
+        key |= F_DANGER
+    if ((past == "search_gold" and ai.GetTimeDeltaGoldBeingSearched() >= ai.max_gold_search_ticks) or
+            past == "search_power_up" and ai.GetTimeDeltaPowerupBeingSearched() >= ai.max_gold_search_ticks):
+        key |= F_STUCK
+    if ai.IsAnyPowerup():
+        key |= F_POWERUP_KNOWN
+    if ai.IsAnyAvailableGold():
+        key |= F_GOLD_AVAILABLE
+    return key
+
+
+def Outcome(ai):
+    """ Resultado do DecideState que acabou de rodar em ai, pelo estado escolhido e
+    pelo contador dele (0 ao começar, >= 1 ao continuar)"""
+
+    state = ai.current_state
+    if state == "avoid_hole":
+        return AVOID_START if ai.avoid_hole_ticks == 0 else AVOID_CONTINUE
+    if state == "escape":
+        return ESCAPE_START if ai.escape_ticks == 0 else ESCAPE_CONTINUE
+    if state == "get_unstuck":
+        return UNSTUCK_START if ai.unstuck_ticks == 0 else UNSTUCK_CONTINUE
+    return STATE_OUTCOMES[state]
+
+
+def Energy(key):
+    """ Uma energia com as faixas de energia de key, ou None se nenhuma tem (com os
+    min_hp_escape e min_hp_attack do GameAI; baixa sem estar abaixo de 100, por exemplo)"""
+
+    for energy in sorted({0, 49, 50, 99, 100, GameAI.min_hp_escape, GameAI.min_hp_escape + 1,
+                          GameAI.min_hp_attack, GameAI.min_hp_attack + 1}):
+        bands = 0
+        if energy < 100:
+            bands |= F_NOT_FULL
+        if energy < 50:
+            bands |= F_LOW
+        if energy <= GameAI.min_hp_escape:
+            bands |= F_ESCAPE_HP
+        if energy > GameAI.min_hp_attack:
+            bands |= F_ATTACK_HP
+        if bands == key & ENERGY_FEATURES:
+            return energy
+    return None
+
+
+def Ways(key):
+    """ Os PAST_WAYS de key, [] se nenhum agente tem key"""
+
+    if Energy(key) is None:
+        return ()
+    return PAST_WAYS.get(key & PAST_FEATURES, ())
+
+
+def MapAgent(features, danger_behind=False):
+    """ GameAI no mapa de MAP_SIZE com as features de mapa pedidas: "!" na frente
+    (ou atrás), um powerup, um ouro que já nasceu"""
+
+    ai = GameAI(*MAP_SIZE, seed=0)
+    ai.SetStatus(PLAYER[0], PLAYER[1], "north", "game", 0, 100)
+    ai.SetCell(PLAYER[0], PLAYER[1], ".")
+    if features & F_DANGER:
+        cell = ai.GetPositionBehind() if danger_behind else ai.GetPositionForward()
+        ai.SetCell(cell.x, cell.y, "!")
+    if features & F_POWERUP_KNOWN:
+        ai.SetCell(POWERUP[0], POWERUP[1], "L")
+    if features & F_GOLD_AVAILABLE:
+        ai.SetCell(GOLD[0], GOLD[1], "T")
+    return ai
+
+
+def Realize(ai, key, way):
+    """ Deixa ai (um MapAgent com as features de mapa de key) com o resto de key, vindo
+    do estado anterior way (um dos Ways(key))"""
+
+    past, ticks, stuck = way
+
+    ai.observations = (key & OBS_FEATURES) << OBS_SHIFT
+    ai.energy = Energy(key)
+    ai.past_state = ai.current_state = past
+    ai.avoid_hole_ticks = ai.escape_ticks = ai.unstuck_ticks = 0
+    if past in COUNTERS:
+        setattr(ai, COUNTERS[past], ticks)
+    ai.consecutive_missed_shots = 0 if key & F_AIMED else ai.max_consecutive_missed_shots
+    if key & F_EARLY:
+        ai.number_of_moves = 1
+        ai.golds_found = 0
+    else:
+        ai.number_of_moves = ai.max_exploration_ticks + 1
+        ai.golds_found = ai.min_golds_to_start_seaching
+    start = ai.number_of_moves - (ai.max_gold_search_ticks if stuck else 0)
+    ai.gold_position_being_searched = {"position": None, "start_time": start}
+    ai.powerup_position_being_searched = {"position": None, "start_time": start}
+
+
+def Rules(key, agents=None):
+    """ Resultado do GameAI.DecideState para key: roda o DecideState num agente com
+    key de cada jeito possível (Ways, e "!" na frente ou atrás), UNREACHABLE se não
+    há nenhum. ValueError se Key não dá key para o agente montado ou se os jeitos
+    dão resultados diferentes: aí Key ou Realize ficou diferente do DecideState.
+
+    agents: dicionário (features de mapa, "!" atrás) => MapAgent, para reaproveitar
+    """
+
+    if agents is None:
+        agents = {}
+    outcome = UNREACHABLE
+    for danger_behind in ((False, True) if key & F_DANGER else (False,)):
+        label = (key & MAP_FEATURES, danger_behind)
+        ai = agents.get(label)
+        if ai is None:
+            ai = agents[label] = MapAgent(key & MAP_FEATURES, danger_behind)
+        for way in Ways(key):
+            Realize(ai, key, way)
+            found = Key(ai)
+            if found != key:
+                raise ValueError("agent set up for key %06x from %r has key %06x" % (key, way, found))
+            ai.DecideState()
+            result = Outcome(ai)
+            if outcome != UNREACHABLE and result != outcome:
+                raise ValueError("key %06x: DecideState gives %s and %s (from %r)" % (
+                    key, OUTCOME_NAMES[outcome], OUTCOME_NAMES[result], way))
+            outcome = result
+    return outcome
+
+
+def Compile():
+    """ Rules de todas as chaves, em bytes (chave => resultado): 256 KiB"""
+
+    agents = {}
+    return bytes(Rules(key, agents) for key in range(1 << FEATURE_BITS))
+
+
+# features in the order DecideState tests them, to print the table as a tree
+TREE_ORDER = (F_GOLD_HERE, F_POWERUP_HERE, F_NOT_FULL, F_AVOIDING, F_DANGER, F_DAMAGE, F_HIT, F_ESCAPE_HP,
+              F_ESCAPING, F_LOW, F_POWERUP_KNOWN, F_ENEMY, F_ATTACK_HP, F_AIMED, F_EARLY, F_STUCK,
+              F_UNSTUCKING, F_GOLD_AVAILABLE)
+
+
+def Tree(lines, keys, seen, depth=0):
+    """ Árvore de decisão equivalente à tabela, só com os testes que mudam o resultado.
+    Chaves UNREACHABLE valem qualquer resultado. Uma subárvore igual a uma já mostrada
+    vira uma referência a ela ([n]).
+    keys: array NumPy com uma dimensão de tamanho 2 por feature (ver PrintTable)
+    seen: dicionário (features, bytes) da subárvore => n"""
+
+    reachable = keys[keys != UNREACHABLE]
+    if len(reachable) == 0 or (reachable == reachable[0]).all():
+        lines.append("    " * depth + "=> " + OUTCOME_NAMES[reachable[0] if len(reachable) else UNREACHABLE])
+        return
+    # the same subtree for other values of the features above it: compare
+    # them only over the features the result still depends on
+    label = Reduce(keys)
+    if label in seen:
+        lines.append("    " * depth + "=> [%d]" % seen[label])
+        return
+    seen[label] = len(seen) + 1
+    lines.append("    " * depth + "[%d]" % seen[label])
+
+    # the first feature that changes the outcome of some key with both values
+    # reachable; without one, the first that splits the reachable keys at all
+    halves = []
+    for feature in TREE_ORDER:
+        axis = FEATURE_BITS - feature.bit_length()
+        before = (slice(None),) * axis
+        on = keys[before + (slice(1, 2),)]
+        off = keys[before + (slice(0, 1),)]
+        if ((on != off) & (on != UNREACHABLE) & (off != UNREACHABLE)).any():
+            halves.insert(0, (feature, on, off))
+            break
+        if (on != UNREACHABLE).any() and (off != UNREACHABLE).any():
+            halves.append((feature, on, off))
+    feature, on, off = halves[0]
+    lines.append("    " * depth + "if " + FEATURE_NAMES[feature] + ":")
+    Tree(lines, on, seen, depth + 1)
+    lines.append("    " * depth + "else:")
+    Tree(lines, off, seen, depth + 1)
+
+
+def Reduce(keys):
+    """ (features, bytes) de keys sem as dimensões de que o resultado não depende"""
+
+    features = []
+    for axis in range(FEATURE_BITS):
+        before = (slice(None),) * axis
+        if keys.shape[axis] == 2 and (keys[before + (slice(1, 2),)] != keys[before + (slice(0, 1),)]).any():
+            features.append(axis)
+        else:
+            keys = keys[before + (slice(0, 1),)]
+    return tuple(features), keys.tobytes()
+
+
+def PrintTable(full=False):
+    """ Mostra a tabela como árvore, com quantas chaves vão para cada resultado"""
+
+    import numpy
+
+    start = time.perf_counter()
+    table = Compile()
+    elapsed = time.perf_counter() - start
+
+    keys = numpy.frombuffer(table, dtype=numpy.uint8)
+    print("%d keys (%d feature bits), compiled in %.3f s" % (len(table), FEATURE_BITS, elapsed))
+    counts = numpy.bincount(keys, minlength=len(OUTCOME_NAMES))
+    for outcome, name in enumerate(OUTCOME_NAMES):
+        print("  %-24s %8d keys" % (name, counts[outcome]))
+    print("")
+
+    # axis 0 is the highest bit, the last axis bit 0
+    lines = []
+    Tree(lines, keys.reshape((2,) * FEATURE_BITS), {})
+    print("\n".join(lines))
+
+    if full:
+        print("")
+        for key in range(len(table)):
+            names = [FEATURE_NAMES[1 << bit] for bit in range(FEATURE_BITS) if key >> bit & 1]
+            print("%06x %-24s %s" % (key, OUTCOME_NAMES[table[key]], " ".join(names)))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 compiled decision table")
+    parser.add_argument("--full", action="store_true", help="also list every key")
+    args = parser.parse_args()
+
+    PrintTable(args.full)
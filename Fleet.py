@@ -0,0 +1,138 @@
+﻿#!/usr/bin/env python
+
+"""Fleet.py: INF1771 Runs many independent bots in one process.
+
+Todos os bots compartilham um único event loop do asyncio, mas cada um tem
+seu próprio cliente, mapa e estado de IA.
+
+Uso (a partir da raiz do repositório):
+    python Fleet.py --count 200 --host 127.0.0.1 [--duration 60] [--report 5]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import asyncio
+import os
+import resource
+import time
+from Bot import Bot
+from Map.Grid import MapSize
+
+
+def CurrentRSS():
+    """ Memória residente do processo em bytes (Linux: /proc, outros: pico do getrusage)"""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# <summary>
+# N bots on one event loop
+# </summary>
+class Fleet():
+
+    loop = None
+    bots = None
+    base_rss = 0
+    rss_per_bot = 0
+
+    last_report = 0.0
+    last_decisions = 0
+    last_cpu = 0.0
+
+
+    def __init__(self, loop, count, host, name, event_driven=False, map_size=None, seed=None):
+
+        self.loop = loop
+        self.bots = []
+
+        self.base_rss = CurrentRSS()
+        for i in range(count):
+            bot = Bot(loop, host, start=False, event_driven=event_driven, name="%s %d" % (name, i + 1),
+                      map_size=map_size, seed=None if seed is None else seed + i)
+            bot.verbose = False
+            self.bots.append(bot)
+        self.rss_per_bot = (CurrentRSS() - self.base_rss) / max(1, count)
+
+
+    def Start(self):
+
+        for bot in self.bots:
+            bot.Start()
+
+        self.last_report = time.monotonic()
+        self.last_cpu = time.process_time()
+
+
+    def Stop(self):
+        for bot in self.bots:
+            bot.Stop()
+
+
+    def Report(self):
+        """ Ticks/s somados, CPU por decisão e memória por bot desde o último relatório"""
+
+        now = time.monotonic()
+        cpu = time.process_time()
+        decisions = sum(bot.decisions for bot in self.bots)
+        decision_cpu = sum(bot.decision_cpu for bot in self.bots)
+        connected = sum(1 for bot in self.bots if bot.client.connected)
+
+        elapsed = now - self.last_report
+        ticks = decisions - self.last_decisions
+        rss = CurrentRSS()
+
+        print("bots %4d/%-4d  ticks/s %8.1f  cpu/decision %7.1f us  process cpu %5.1f %%  "
+              "rss/bot %6.1f KiB (start %6.1f KiB)" % (
+                  connected, len(self.bots),
+                  ticks / elapsed if elapsed > 0 else 0,
+                  decision_cpu * 1e6 / decisions if decisions > 0 else 0,
+                  (cpu - self.last_cpu) * 100.0 / elapsed if elapsed > 0 else 0,
+                  (rss - self.base_rss) / 1024.0 / max(1, len(self.bots)),
+                  self.rss_per_bot / 1024.0))
+
+        self.last_report = now
+        self.last_decisions = decisions
+        self.last_cpu = cpu
+
+
+async def Run(fleet, duration, report):
+
+    start = time.monotonic()
+    while duration <= 0 or time.monotonic() - start < duration:
+        await asyncio.sleep(report)
+        fleet.Report()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 bot fleet")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--host", default=Bot.host)
+    parser.add_argument("--name", default=Bot.name)
+    parser.add_argument("--duration", type=float, default=0, help="seconds, 0 = forever")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between reports")
+    parser.add_argument("--event-driven", action="store_true")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the first bot, bot i uses seed + i")
+    parser.add_argument("--map-size", type=MapSize, default=None, metavar="WxH")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    fleet = Fleet(loop, args.count, args.host, args.name, args.event_driven, args.map_size, args.seed)
+    fleet.Start()
+    try:
+        loop.run_until_complete(Run(fleet, args.duration, args.report))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fleet.Stop()
@@ -10,17 +10,24 @@
 
 
 from datetime import time
-import random
 from Map.Position import Position
-from queue import PriorityQueue
+from Map.Grid import DANGER, WALL
+from Map.Planner import DIRECTIONS, NORTH, BLOCKED
+from Map.DistanceField import INF
+from AgentState import AgentState
+from Observations import (Encode, OBS_BLOCKED, OBS_BREEZE, OBS_FLASH, OBS_BLUE_LIGHT, OBS_RED_LIGHT,
+                          OBS_DAMAGE, OBS_HIT, OBS_ENEMY_IN_FRONT)
+from Patterns import Pattern, OUT, walk, explore
 
 # <summary>
 # Game AI Example
 # </summary>
-class GameAI():
+class GameAI(AgentState):
     """
     Variáveis da classe:
         (obs: para acessar qualquer uma dessas dentro das funções, usar self.<nome_da_variavel>)
+        (o estado de cada agente fica nos slots de AgentState, criados por AgentState.Reset; aqui
+        ficam só as constantes de comportamento, iguais para todos os agentes)
 
         player: player.x indica posicao x atual, player.y indica posicao y atual
         state: não usamos
@@ -68,8 +75,9 @@ class GameAI():
         max_unstuck_ticks: número de ações que ele fica no estado unstuck      
         min_golds_to_start_seaching: mínimo número de ouros encontrados para ir do estado de exploração
             para começar a procurar ouro
-        thread_sleep: somente usado para calculo abaixo, representa thread_sleep do bot.py
-        item_spawn_interval: intervalo de spawn dos itens considerando que nascem a cada 15s
+        thread_sleep: representa thread_sleep do bot.py. Só é usado para estimar o tempo de jogo
+            (number_of_moves * thread_sleep) enquanto não chegou nenhuma mensagem "g"
+        item_spawn_seconds: segundos até um item pego nascer de novo
         max_consecutive_missed_shots: serve para não ficar atirando na parede. O nome é meio misleading,
             na verdade é o máximo de vezes que pode dar um tiro e no tick seguinte não receber observação
             de que atingiu o adversário
@@ -77,8 +85,9 @@ class GameAI():
         min_hp_attack: se vir inimigo à frente & vida tiver maior que isso & não errou muito
             tiro recentemente, ataca
         
-        current_observations: dicionário que é atualizado a cada "jogada" com as observações atuais
-            Chaves deste dicionário (todas booleanas):
+        observations: int, máscara com um bit por observação atual (Observations.OBS_BLOCKED,
+            OBS_BREEZE, ...), atualizada a cada "jogada". current_observations é a mesma coisa
+            vista como dicionário (só leitura), com as chaves (todas booleanas):
                 {
                 blocked         => casa para onde tentou andar está bloqueada (tem parede ou fim do mapa)
                 steps           => inimigo em até manhattan = 2
@@ -95,9 +104,36 @@ class GameAI():
             significa qual o powerup que está sendo procurado e desde quando ele o está (inicialmente são None)
         gold_position_being_searched: dicionário da forma {"position": pos, "start_time": int}, que
             significa qual o ouro que está sendo procurado e desde quando ele o está (inicialmente são None)
-        timed_out_gold_positions: dicionário da forma {(x,y): int}, representa última vez (que sabemos) que
-            ouro na posicao x,y foi pego
-        map: lista de listas 59 x 34, cada posição é um caractere. Inicialmente tudo "#", que significa
+        game_time: int. tempo de jogo (segundos) da última mensagem "g", None enquanto não chegou nenhuma
+        respawns: Map.RespawnScheduler com as casas de ouro pegas e até quando (GetClock, em ms) o ouro
+            continua sumido. A cada tick só saem do heap os que já voltaram
+        golds, powerups: Map.ItemIndex com as posições "T" e "L" do mapa, atualizados por SetCell
+            a cada mudança, para não varrer o mapa inteiro a cada jogada
+        planner: Map.Planner, A* sobre (x, y, direção) usado para ir até ouros e powerups
+        paths: Map.PathCache, guarda o caminho até cada alvo enquanto o bot o segue
+        map_version: int. incrementado a cada casa do mapa que muda (SetCell)
+        cell_versions: lista com o map_version da última mudança de cada casa (índice x * map.height + y)
+        gold_fields, powerup_fields: dicionários (x, y) => Map.DistanceField, com o número de ações
+            até cada ouro/powerup a partir de qualquer (x, y, direção) por casas conhecidas e seguras.
+            Consertados a cada casa que muda, em vez de recalculados
+        frontier: Map.Frontier, casas seguras ainda não visitadas ou que encostam em "#"
+        explore_target: (x, y) da casa da fronteira para onde o bot está indo ao explorar
+        hazards: Map.HazardBelief, probabilidade de buraco/teletransporte de cada casa, combinando
+            todas as brisas e flashes já sentidos. Casas com probabilidade >= max_hazard_probability
+            ficam "!" no mapa e as outras vizinhas de alguma leitura ficam "?"
+        rng: random.Random do agente (semente de GameAI(..., seed)), usado nos sorteios da
+            caminhada e da exploração aleatórias (Patterns.walk e Patterns.explore)
+        facing: int com a direção de self.dir (Map.Planner: NORTH = 0, EAST, SOUTH, WEST)
+        neighbors: Map.NeighborTable, casa da frente/trás/direita/esquerda de cada (casa, direção),
+            -1 se estiver fora do mapa. As funções de cada tick olham as casas vizinhas por ela,
+            pelo código da casa em map.view, sem criar objetos Position
+        positions: Map.Position.Cells, um Position compartilhado (só leitura) para cada casa do mapa,
+            devolvido pelas funções auxiliares em vez de criar um novo a cada chamada
+        map: Map.Grid (uint8 do NumPy) de 59 x 34, ou do tamanho passado ao GameAI. Mapas grandes
+            usam Map.ChunkedGrid, que só guarda os blocos já explorados (ver Map.Grid.NewGrid).
+            Se o servidor manda uma posição fora dele, o mapa cresce (Resize).
+            map.Get(x, y) retorna o caractere da posição e
+            map[x][y] continua funcionando como na antiga lista de listas. Inicialmente tudo "#", que significa
             pos. desconhecida. Cada tipo de posição diferente tem o seu caractere, abaixo a lista:
             "#" => Posição totalmente desconhecida
             "." => Posição já descoberta sem nenhum item
@@ -108,26 +144,7 @@ class GameAI():
             "W" => Parede
     """
     
-    player = Position()
-    state = "ready"
-    dir = "north"
-    score = 0
-    energy = 0
-
-    current_action = ""
-    current_state = "random_explore"
-    past_state = ""
-    consecutive_missed_shots = 0
-
-    golds_found = 0
-    powerups_found = 0
-    number_of_moves = 0
-
-    escape_ticks = 0
-    avoid_hole_ticks = 0
-    unstuck_ticks = 0
-
-    # as 9 variávies abaixo alteram o comportamento do bot no jogo
+    # as 10 variávies abaixo alteram o comportamento do bot no jogo
     max_escape_ticks = 8                # standard = 8
     max_avoid_hole_ticks = 3            # standard = 8
     max_exploration_ticks = 500         # standard = 300 - 500
@@ -137,28 +154,12 @@ class GameAI():
     max_consecutive_missed_shots = 10   # standard = 5 - 15
     min_hp_escape = 70                  # standard = 50 - 80
     min_hp_attack = 50                  # standard = 40-70
+    max_hazard_probability = 0.2        # standard = 0.15 - 0.3
 
-    thread_sleep = 200      # somente usado para o calculo abaixo
-    item_spawn_interval = int((1000/thread_sleep) * 15)
-
-    current_observations = {
-                            "blocked": False,
-                            "steps": False,
-                            "breeze": False,
-                            "flash": False,
-                            "blueLight": False,
-                            "redLight": False,
-                            "damage": False,
-                            "hit": False,
-                            "enemy_in_front": False
-    }
-
-    powerup_position_being_searched = {"position": None, "start_time": None}
-    gold_position_being_searched = {"position": None, "start_time": None}
-    timed_out_gold_positions = {}
-
-    map = [["#"] * 34 for _ in range(59)]
+    thread_sleep = 200      # só para estimar o tempo enquanto não há game_time
+    item_spawn_seconds = 15
 
+    __slots__ = ()
 
 
     ###########################################################################
@@ -180,15 +181,41 @@ class GameAI():
             energy: player energy
         """
     
+        if not self.map.InBounds(x, y):
+            # the server map is larger than ours: grow it, at least doubling the side that overflowed
+            width = self.map.width
+            height = self.map.height
+            if x >= width:
+                width = max(x + 1, width * 2)
+            if y >= height:
+                height = max(y + 1, height * 2)
+            self.Resize(width, height)
+
         self.player.x = x
         self.player.y = y
         self.dir = dir.lower()
+        self.facing = DIRECTIONS.get(self.dir, NORTH)
 
         self.state = state
         self.score = score
         self.energy = energy
 
 
+    def SetGameTime(self, time):
+        """ Atualiza o tempo de jogo com o da mensagem "g" (em segundos). Se é o primeiro
+        recebido, os prazos antigos (estimados por GetClock) não valem mais. O tempo pode
+        voltar um pouco sem mudar nada; jogo novo é o Bot que avisa, chamando Reset quando
+        o status passa a "Game".
+
+        Args:
+            time: tempo de jogo
+        """
+
+        if self.game_time is None:
+            self.respawns.Clear()
+        self.game_time = time
+
+
     def GetObservations(self, o):
         """ Função chamada pelo Bot.py para atualizar as observações a cada jogada. 
         Só é chamada se algo foi observado.
@@ -196,31 +223,14 @@ class GameAI():
         Args:
             o: lista de observações
         """
-        
-        possible_observations = [
-                                 "blocked",
-                                 "steps",
-                                 "breeze",
-                                 "flash",
-                                 "blueLight",
-                                 "redLight",
-                                 "damage",
-                                 "hit",
-                                 "enemy_in_front",
-        ]
-        
-        # Isso aqui é pq a string da observação que recebemos de q tem inimigo na sua frente
-        #  varia de acordo com qual o inimigo, mas todas começam com "enemy"
-        is_enemy_in_front = [i for i in o if i.startswith('enemy')]
-        if is_enemy_in_front:
-            o.append("enemy_in_front")
-
-        # se observação foi recebida, seta como true, senão, seta como false
-        for possible_obs in possible_observations:
-            if possible_obs in o:
-                self.current_observations[possible_obs] = True
-            else:
-                self.current_observations[possible_obs] = False
+
+        # as que não vieram ficam 0 (ver Observations.Encode)
+        self.observations = Encode(o)
+
+
+    def SetObservations(self, mask):
+        """ Igual a GetObservations, com as observações já em máscara (Observations.Encode)"""
+        self.observations = mask
 
 
     def GetObservationsClean(self):
@@ -229,21 +239,7 @@ class GameAI():
             e também não tem buraco, teletransporte nem inimigo ao redor).
         """
 
-        possible_observations = [
-                                 "blocked",
-                                 "steps",
-                                 "breeze",
-                                 "flash",
-                                 "blueLight",
-                                 "redLight",
-                                 "damage",
-                                 "hit",
-                                 "enemy_in_front",
-        ]
-
-        # seta todas as observações como false
-        for possible_obs in possible_observations:
-            self.current_observations[possible_obs] = False
+        self.observations = 0
 
 
     ###########################################################################
@@ -272,7 +268,7 @@ class GameAI():
         """
 
         if self.CheckNotOutOfBounds(pos.x, pos.y):
-            return self.map[pos.x][pos.y]
+            return self.map.Get(pos.x, pos.y)
         return None
 
 
@@ -302,9 +298,7 @@ class GameAI():
                 Bool, True se posição está dentro do mapa
         """
         
-        if x>58 or x<0 or y<0 or y>33:
-            return False
-        return True
+        return self.map.InBounds(x, y)
 
 
     def GetObservableAdjacentPositions(self):
@@ -315,18 +309,8 @@ class GameAI():
             Lista de objetos Position correspondentes 
         """
 
-        ret = []
-
-        if self.CheckNotOutOfBounds(self.player.x - 1, self.player.y):
-            ret.append(Position(self.player.x - 1, self.player.y))
-        if self.CheckNotOutOfBounds(self.player.x + 1, self.player.y):
-            ret.append(Position(self.player.x + 1, self.player.y))
-        if self.CheckNotOutOfBounds(self.player.x, self.player.y - 1):
-            ret.append(Position(self.player.x, self.player.y - 1))
-        if self.CheckNotOutOfBounds(self.player.x, self.player.y + 1):
-            ret.append(Position(self.player.x, self.player.y + 1))
-
-        return ret
+        cell = self.player.x * self.map.height + self.player.y
+        return [self.CellPosition(c) for c in self.neighbors.adjacent[cell]]
 
 
     def GetAllAdjacentPositions(self):
@@ -361,6 +345,19 @@ class GameAI():
         return ret
     
 
+    def PlayerState(self):
+        """ Função auxiliar. Índice (casa * 4 + direção) do jogador nas tabelas de self.neighbors"""
+        return (self.player.x * self.map.height + self.player.y) * 4 + self.facing
+
+
+    def CellPosition(self, cell):
+        """ Função auxiliar. Position da casa de índice cell, None se cell for -1"""
+
+        if cell < 0:
+            return None
+        return self.positions[cell]
+
+
     def GetPositionTurningRight(self):
         """ Função auxiliar. Retorna posição à direita (em relação a onde o bote ta olhando).
         Caso não haja posição à sua direita (por ser fora do mapa), retorna None
@@ -369,19 +366,7 @@ class GameAI():
             objeto Position correspondente
             None se posição não existir
         """
-
-        ret = None
-
-        if self.dir == "north" and self.CheckNotOutOfBounds(self.player.x + 1, self.player.y):
-            ret = Position(self.player.x + 1, self.player.y)      
-        elif self.dir == "east" and self.CheckNotOutOfBounds(self.player.x, self.player.y + 1):
-                ret = Position(self.player.x, self.player.y + 1)     
-        elif self.dir == "south" and self.CheckNotOutOfBounds(self.player.x - 1, self.player.y):
-                ret = Position(self.player.x - 1, self.player.y)    
-        elif self.dir == "west" and self.CheckNotOutOfBounds(self.player.x, self.player.y - 1):
-                ret = Position(self.player.x, self.player.y - 1)
-
-        return ret
+        return self.CellPosition(self.neighbors.right[self.PlayerState()])
 
 
     def GetPositionTurningLeft(self):
@@ -392,19 +377,7 @@ class GameAI():
             objeto Position correspondente
             None se posição não existir
         """
-
-        ret = None
-
-        if self.dir == "north" and self.CheckNotOutOfBounds(self.player.x - 1, self.player.y):
-            ret = Position(self.player.x - 1, self.player.y)      
-        elif self.dir == "east" and self.CheckNotOutOfBounds(self.player.x, self.player.y - 1):
-                ret = Position(self.player.x, self.player.y - 1)     
-        elif self.dir == "south" and self.CheckNotOutOfBounds(self.player.x + 1, self.player.y):
-                ret = Position(self.player.x + 1, self.player.y)    
-        elif self.dir == "west" and self.CheckNotOutOfBounds(self.player.x, self.player.y + 1):
-                ret = Position(self.player.x, self.player.y + 1)
-
-        return ret
+        return self.CellPosition(self.neighbors.left[self.PlayerState()])
 
 
     def GetPositionBehind(self):
@@ -415,21 +388,9 @@ class GameAI():
             objeto Position correspondente
             None se posição não existir
         """
+        return self.CellPosition(self.neighbors.behind[self.PlayerState()])
 
-        ret = None
-
-        if self.dir == "north" and self.CheckNotOutOfBounds(self.player.x, self.player.y + 1):
-            ret = Position(self.player.x, self.player.y + 1)      
-        elif self.dir == "east" and self.CheckNotOutOfBounds(self.player.x - 1, self.player.y):
-                ret = Position(self.player.x - 1, self.player.y)     
-        elif self.dir == "south" and self.CheckNotOutOfBounds(self.player.x, self.player.y - 1):
-                ret = Position(self.player.x, self.player.y - 1)    
-        elif self.dir == "west" and self.CheckNotOutOfBounds(self.player.x + 1, self.player.y):
-                ret = Position(self.player.x + 1, self.player.y)
 
-        return ret
-    
-    
     def GetPositionForward(self):
         """ Função auxiliar. Retorna posição em frente. Caso não haja posição a frente, retorna None.
 
@@ -437,91 +398,91 @@ class GameAI():
             objeto Position correspondente
             None se posição não existir
         """
-
-        ret = None
-        
-        if self.dir == "north" and self.CheckNotOutOfBounds(self.player.x, self.player.y - 1):
-            ret = Position(self.player.x, self.player.y - 1)      
-        elif self.dir == "east" and self.CheckNotOutOfBounds(self.player.x + 1, self.player.y):
-            ret = Position(self.player.x + 1, self.player.y)     
-        elif self.dir == "south" and self.CheckNotOutOfBounds(self.player.x, self.player.y + 1):
-            ret = Position(self.player.x, self.player.y + 1)    
-        elif self.dir == "west" and self.CheckNotOutOfBounds(self.player.x - 1, self.player.y):
-            ret = Position(self.player.x - 1, self.player.y)
-
-        return ret
+        return self.CellPosition(self.neighbors.forward[self.PlayerState()])
 
 
     def IsPositionForwardSafe(self):
         """ Função auxiliar. True se posição à frente não é possível buraco"""
-        position_forward = self.GetPositionForward()
-        if position_forward:
-            return self.GetCharPosition(position_forward) != "!"
+        cell = self.neighbors.forward[self.PlayerState()]
+        return cell < 0 or self.map.view[cell] != DANGER
 
 
     def IsPositionBehindSafe(self):
         """ Função auxiliar. True se posição atrás não é possível buraco"""
-        position_behind = self.GetPositionBehind()
-        if position_behind:
-            return self.GetCharPosition(position_behind) != "!"
-        return True
+        cell = self.neighbors.behind[self.PlayerState()]
+        return cell < 0 or self.map.view[cell] != DANGER
 
 
     def print_map(self):
         """ Função auxiliar. Printa mapa no terminal"""
 
-        for a in range(34):
-            for b in self.map:
-                print (b[a], end = "")
-            print("")
+        print(self.map.ToString())
         print("")
     
 
+    def GetClock(self):
+        """ Função auxiliar. Tempo atual em ms: o tempo de jogo da última mensagem "g" ou,
+        enquanto não chegou nenhuma, number_of_moves * thread_sleep"""
+
+        if self.game_time is not None:
+            return self.game_time * 1000
+        return self.number_of_moves * self.thread_sleep
+
+
     def SetTimedOutGoldPosition(self, pos):
-        """ Função auxiliar. Adiciona pos e tempo atual ao dicionario de posicoes de 
-        ouro sem ouro no momento"""
+        """ Função auxiliar. Marca que o ouro de pos foi pego agora e só volta daqui a
+        item_spawn_seconds"""
 
-        self.timed_out_gold_positions[pos.x, pos.y] = self.number_of_moves
+        self.respawns.Schedule(pos.x * self.map.height + pos.y,
+                               self.GetClock() + self.item_spawn_seconds * 1000)
 
 
     def IsGoldPositionTimedOut(self, pos):
         """ Função auxiliar. Retorna true se pos spawna ouro mas no momento não tem"""
-
-        if (pos.x, pos.y) in self.timed_out_gold_positions:
-            time = self.timed_out_gold_positions[pos.x, pos.y]
-            if self.number_of_moves - time <= self.item_spawn_interval:
-                return True
-        return False
+        return self.respawns.IsPending(pos.x * self.map.height + pos.y, self.GetClock())
     
 
+    def IsGoldAvailable(self, pos):
+        """ Função auxiliar. Retorna true se o ouro em pos já deve ter spawnado de novo"""
+        return not self.IsGoldPositionTimedOut(pos)
+
+
+    def UpdateHazardCells(self, cells):
+        """ Função auxiliar. Reescreve no mapa as casas cuja probabilidade de perigo
+        mudou: "!" se chegou ao limite, "?" se não. Casas já visitadas, paredes, ouros
+        e powerups não mudam."""
+
+        height = self.map.height
+        for cell in cells:
+            x = cell // height
+            y = cell - x * height
+            c = self.map.Get(x, y)
+            if c != "#" and c != "?" and c != "!":
+                continue
+            if self.hazards.IsSafe(x, y, self.max_hazard_probability):
+                self.SetCell(x, y, "?")
+            else:
+                self.SetCell(x, y, "!")
+
+
     def EraseTimedOutGoldPosition(self, position):
-        """ Função auxiliar. "Tira" posição dada do dicionario de posicoes de ouro sem ouro no momento"""
+        """ Função auxiliar. Considera que o ouro de position já voltou"""
 
-        self.timed_out_gold_positions[(position.x, position.y)] = -1000000
+        self.respawns.Cancel(position.x * self.map.height + position.y)
 
 
     def GetAllPowerupsPositions(self):
         """Função auxiliar. Retorna lista com posições (no formato objeto Position) de todos 
         ouros encontrados"""
 
-        powerups_positions = []
-        for y in range(34):
-            for x in range(59):
-                if self.map[x][y] == "L":
-                    powerups_positions.append(Position(x,y))
-        return powerups_positions
+        return self.powerups.All()
 
 
     def GetAllGoldsPositions(self):
         """Função auxiliar. Retorna lista com posições (no formato objeto Position) de todos 
         ouros encontrados"""
 
-        golds_positions = []
-        for y in range(34):
-            for x in range(59):
-                if self.map[x][y] == "T":
-                    golds_positions.append(Position(x,y))
-        return golds_positions
+        return self.golds.All()
 
 
     def GetPowerupPositionBeingSearched(self):
@@ -566,16 +527,10 @@ class GameAI():
             None se não tiver nenhum powerpoint descoberto ainda
         """
 
-        powerups_positions = self.GetAllPowerupsPositions()
-
-        nearest_powerup = None
-        min_distance = 1000000
         current_position = self.GetPlayerPosition()
-        for powerup_position in powerups_positions:
-            dist_to_powerup = self.manhattan(powerup_position, current_position)
-            if dist_to_powerup < min_distance:
-                nearest_powerup = powerup_position
-                min_distance = dist_to_powerup
+        nearest_powerup = self.NearestByPath(self.powerups, self.powerup_fields)
+        if nearest_powerup is None:
+            nearest_powerup = self.powerups.Nearest(current_position.x, current_position.y)
         if not self.EqualPositions(nearest_powerup, self.GetPowerupPositionBeingSearched()):
             self.SetPowerupPositionBeingSearched(nearest_powerup)
         return nearest_powerup
@@ -589,16 +544,10 @@ class GameAI():
             None se não tiver nenhum ouro descoberto ainda
         """
         
-        golds_positions = self.GetAllGoldsPositions()
-       
-        nearest_gold = None
-        min_distance = 1000000
         current_position = self.GetPlayerPosition()
-        for gold_position in golds_positions:
-            dist_to_gold = self.manhattan(gold_position, current_position)
-            if dist_to_gold < min_distance and not self.IsGoldPositionTimedOut(gold_position):
-                nearest_gold = gold_position
-                min_distance = dist_to_gold
+        nearest_gold = self.NearestByPath(self.golds, self.gold_fields, self.IsGoldAvailable)
+        if nearest_gold is None:
+            nearest_gold = self.golds.Nearest(current_position.x, current_position.y, self.IsGoldAvailable)
         if not self.EqualPositions(nearest_gold, self.GetGoldPositionBeingSearched()):
             self.SetGoldPositionBeingSearched(nearest_gold)
         return nearest_gold
@@ -606,18 +555,16 @@ class GameAI():
 
     def IsAnyPowerup(self):
         """ Retorna true se algum powerup foi encontrado no mapa"""
-        all_powerups_positions = self.GetAllPowerupsPositions()
-        return bool(all_powerups_positions)
+        return self.powerups.Any()
 
 
     def IsAnyAvailableGold(self):
         " Retorna true se tem algum ouro spawnado (a menos que outra pessoa tenha pegado) no mapa"
 
-        all_golds_positions = self.GetAllGoldsPositions()
-        for gold_position in all_golds_positions:
-            if not self.IsGoldPositionTimedOut(gold_position):
-                return True
-        return False
+        # more golds than cells waiting for a respawn: one of them is there for sure
+        if len(self.golds) > len(self.respawns):
+            return True
+        return self.golds.Any(self.IsGoldAvailable)
 
 
     def GetTimeDeltaPowerupBeingSearched(self):
@@ -640,65 +587,130 @@ class GameAI():
         self.consecutive_missed_shots = 0
 
 
+    def NearestByPath(self, items, fields, available=None):
+        """ Função auxiliar. Item com menos ações até ele por caminho conhecido (campo de
+        distância), empates com a menor (y, x). None se nenhum tiver caminho conhecido.
+
+        Args:
+            items: self.golds ou self.powerups
+            fields: self.gold_fields ou self.powerup_fields
+            available: função opcional Position => bool, para pular posições
+        """
+
+        facing = self.facing
+        best = None
+        best_key = None
+        for (x, y), field in fields.items():
+            distance = field.Distance(self.player.x, self.player.y, facing)
+            if distance >= INF:
+                continue
+            key = (distance, y, x)
+            if best_key is None or key < best_key:
+                pos = items.positions[x, y]
+                if available is None or available(pos):
+                    best = pos
+                    best_key = key
+        return best
+
+
+    def ItemStep(self, target, fields):
+        """ Função auxiliar. Próxima ação até target: pelo campo de distância se já houver
+        caminho conhecido (consulta O(1)), senão pelo planner (que passa por casas "#")"""
+
+        if target is None:
+            return None
+
+        field = fields.get((target.x, target.y))
+        if field is not None:
+            action = field.NextAction(self.player.x, self.player.y, self.facing)
+            if action is not None:
+                return action
+        return self.PlanStep(target)
+
+
+    def ExploreStep(self):
+        """ Função auxiliar. Próxima ação até a casa da fronteira escolhida. Escolhe outra
+        (a mais barata a partir de onde o bot está) quando a atual deixa de ser fronteira.
+
+        Returns:
+            string com a ação
+            None se não houver fronteira alcançável
+        """
+
+        height = self.map.height
+        facing = self.facing
+
+        for _ in range(2):
+
+            target = self.explore_target
+            if target is None or target[0] * height + target[1] not in self.frontier:
+                if target is not None:
+                    self.paths.Forget(*target)
+                target = self.frontier.Nearest(self.player.x, self.player.y, facing)
+                self.explore_target = target
+                if target is None:
+                    return None
+
+            action = self.paths.Next(self.player.x, self.player.y, facing,
+                                     target[0], target[1], self.map_version, self.cell_versions)
+            if action is not None:
+                return action
+
+            # já está nela ou ficou inalcançável: escolhe outra uma vez
+            self.paths.Forget(*target)
+            self.explore_target = None
+
+        return None
+
+
+    def GetExplorationStats(self):
+        """ Fronteira, casas conhecidas, ações e casas descobertas por ação"""
+
+        stats = self.frontier.GetStats()
+        stats["moves"] = self.number_of_moves
+        stats["coverage_per_action"] = stats["known"] / self.number_of_moves if self.number_of_moves else 0.0
+        return stats
+
+
+    def PlanStep(self, target):
+        """ Função auxiliar. Primeira ação do menor caminho (em ações) até target,
+        contando viradas e desviando de paredes e possíveis buracos.
+
+        Returns:
+            string com a ação
+            None se não houver caminho ou se já estiver em target
+        """
+
+        if target is None:
+            return None
+
+        return self.paths.Next(self.player.x, self.player.y, self.facing,
+                               target.x, target.y, self.map_version, self.cell_versions)
+
+
+    def GetPlanStats(self):
+        """ Contadores do cache de caminhos: hits, misses, replans e estados expandidos pelo A*"""
+        return self.paths.GetStats()
+
+
     def RandomWalkAvoidingWall(self):
         """ Retorna próxima ação a ser tomada em uma caminhada aleatória, evitando
         colisões com a parede. Dá probabilidades maiores para andar para a frente"""
 
-        forward_position = self.GetPositionForward()
-        if forward_position:
-            forward_position_char = self.GetCharPosition(forward_position)
-        turning_left_position = self.GetPositionTurningLeft()
-        if turning_left_position:
-            turning_left_position_char = self.GetCharPosition(turning_left_position)
-        turning_right_position = self.GetPositionTurningRight()
-        if turning_right_position:
-            turning_right_position_char = self.GetCharPosition(turning_right_position)
-        n = random.randint(0,7)
-
-        if (forward_position and forward_position_char not in ["W", "!"] and
-            turning_left_position and turning_left_position_char not in ["W", "!"] and
-            turning_right_position and turning_right_position_char not in ["W", "!"]):
-            if n == 0:
-                return "virar_direita"
-            elif n == 1:
-                return "virar_esquerda"
-            else:
-                return "andar"
-            
-        if (forward_position and forward_position_char not in ["W", "!"] and
-            turning_left_position and turning_left_position_char not in ["W", "!"]):
-            if n <= 1:
-                return "virar_esquerda"
-            else:
-                return "andar"
+        return self.rng.choice(walk[self.NeighborhoodPattern()])
 
-        if (forward_position and forward_position_char not in ["W", "!"] and
-            turning_right_position and turning_right_position_char not in ["W", "!"]):
-            if n <= 1:
-                return "virar_direita"
-            else:
-                return "andar"
-        
-        if (turning_left_position and turning_left_position_char not in ["W", "!"] and
-            turning_right_position and turning_right_position_char not in ["W", "!"]):
-            if n <= 3:
-                return "virar_direita"
-            else:
-                return "virar_esquerda"
-        
-        if forward_position and forward_position_char not in ["W", "!"]:
-            return "andar"
-        if turning_left_position and turning_left_position_char not in ["W", "!"]:
-            return "virar_esquerda"
-        if turning_right_position and turning_right_position_char not in ["W", "!"]:
-            return "virar_esquerda"
-        
-        if n == 0:
-            return "virar_direita"
-        elif n == 1:
-            return "virar_esquerda"
-        else:
-            return "andar"
+
+    def NeighborhoodPattern(self):
+        """ Função auxiliar. Patterns.Pattern das casas da frente, da esquerda e da direita"""
+
+        state = self.PlayerState()
+        view = self.map.view
+        forward = self.neighbors.forward[state]
+        left = self.neighbors.left[state]
+        right = self.neighbors.right[state]
+        return Pattern(view[forward] if forward >= 0 else OUT,
+                       view[left] if left >= 0 else OUT,
+                       view[right] if right >= 0 else OUT)
 
 
     ###########################################################################
@@ -733,201 +745,98 @@ class GameAI():
     def StateSearchPowerUp(self):
         
         nearest_powerup = self.FindNearestPowerup()
-        current_position = self.GetPlayerPosition()
-        dist_to_powerup_now = self.manhattan(current_position, nearest_powerup)
-        forward_position = self.GetPositionForward()
-
-        # se andar pra frente te deixa mais perto do ouro mais próximo, anda pra frente
-        if forward_position:
-            dist_to_powerup_going_forward = self.manhattan(nearest_powerup, forward_position)
-            forward_position_char = self.GetCharPosition(forward_position)
-            if dist_to_powerup_going_forward < dist_to_powerup_now and forward_position_char != "W":
-                self.current_action = "andar"
-                return
-        
-        turning_left_position = self.GetPositionTurningLeft()
-        if turning_left_position:
-            turning_left_position_char = self.GetCharPosition(turning_left_position)
-        turning_right_position = self.GetPositionTurningRight()
-        if turning_right_position:
-            turning_right_position_char = self.GetCharPosition(turning_right_position)
-        backwards_position = self.GetPositionBehind()
-        if backwards_position:
-            backwards_position_char = self.GetCharPosition(backwards_position)
-
-        if turning_left_position:
-            dist_to_powerup_going_left = self.manhattan(nearest_powerup, turning_left_position)
-            if dist_to_powerup_going_left < dist_to_powerup_now and turning_left_position_char != "W":
-                self.current_action = "virar_esquerda"
-                return
-        
-        if turning_right_position:
-            dist_to_powerup_going_right = self.manhattan(nearest_powerup, turning_right_position)
-            if dist_to_powerup_going_right < dist_to_powerup_now and turning_right_position_char != "W":
-                self.current_action = "virar_direita"
-                return
-        
-        if backwards_position:
-            dist_to_powerup_going_backwards = self.manhattan(nearest_powerup, backwards_position)
-            if dist_to_powerup_going_backwards < dist_to_powerup_now and backwards_position_char not in ["W", "!"]:
-                self.current_action = "andar_re"
-                return
-        
-        ######
 
-        if forward_position:
-            if dist_to_powerup_going_forward == dist_to_powerup_now and forward_position_char != "W":
-                self.current_action = "andar"
-                return
-        
-        if turning_left_position:
-            if dist_to_powerup_going_left == dist_to_powerup_now and turning_left_position_char != "W":
-                self.current_action = "virar_esquerda"
-                return
-        
-        if turning_right_position:
-            if dist_to_powerup_going_right == dist_to_powerup_now and turning_right_position_char != "W":
-                self.current_action = "virar_direita"
-                return
-        
-        if backwards_position:
-            if dist_to_powerup_going_backwards == dist_to_powerup_now and backwards_position_char not in ["W", "!"]:
-                self.current_action = "andar_re"
-                return
-        
-        ####
-
-        if forward_position and forward_position_char != "W":
-            self.current_action = "andar"
-        elif turning_left_position and turning_left_position_char != "W":
-            self.current_action = "virar_esquerda"
-        elif turning_right_position and turning_right_position_char != "W":
-            self.current_action = "virar_direita"
-        else:
-            self.current_action = "andar_re"
+        # caminho de verdade (desviando de "W" e "!") se existir; senão, a aproximação gulosa
+        action = self.ItemStep(nearest_powerup, self.powerup_fields)
+        if action is None:
+            action = self.GreedyStep(nearest_powerup)
+        self.current_action = action
 
 
     def StateSearchGold(self):
         nearest_gold = self.FindNearestGold()
-        current_position = self.GetPlayerPosition()
-        dist_to_gold_now = self.manhattan(current_position, nearest_gold)
-        forward_position = self.GetPositionForward()
-
-        # se andar pra frente te deixa mais perto do ouro mais próximo, anda pra frente
-        if forward_position:
-            dist_to_gold_going_forward = self.manhattan(nearest_gold, forward_position)
-            forward_position_char = self.GetCharPosition(forward_position)
-            if dist_to_gold_going_forward < dist_to_gold_now and forward_position_char != "W":
-                self.current_action = "andar"
-                return
-        
-        turning_left_position = self.GetPositionTurningLeft()
-        if turning_left_position:
-            turning_left_position_char = self.GetCharPosition(turning_left_position)
-        turning_right_position = self.GetPositionTurningRight()
-        if turning_right_position:
-            turning_right_position_char = self.GetCharPosition(turning_right_position)
-        backwards_position = self.GetPositionBehind()
-        if backwards_position:
-            backwards_position_char = self.GetCharPosition(backwards_position)
-
-        if turning_left_position:
-            dist_to_gold_going_left = self.manhattan(nearest_gold, turning_left_position)
-            if dist_to_gold_going_left < dist_to_gold_now and turning_left_position_char != "W":
-                self.current_action = "virar_esquerda"
-                return
-        
-        if turning_right_position:
-            dist_to_gold_going_right = self.manhattan(nearest_gold, turning_right_position)
-            if dist_to_gold_going_right < dist_to_gold_now and turning_right_position_char != "W":
-                self.current_action = "virar_direita"
-                return
-        
-        if backwards_position:
-            dist_to_gold_going_backwards = self.manhattan(nearest_gold, backwards_position)
-            if dist_to_gold_going_backwards < dist_to_gold_now and backwards_position_char not in ["W", "!"]:
-                self.current_action = "andar_re"
-                return
-        
-        ######
 
-        if forward_position:
-            if dist_to_gold_going_forward == dist_to_gold_now and forward_position_char != "W":
-                self.current_action = "andar"
-                return
-        
-        if turning_left_position:
-            if dist_to_gold_going_left == dist_to_gold_now and turning_left_position_char != "W":
-                self.current_action = "virar_esquerda"
-                return
-        
-        if turning_right_position:
-            if dist_to_gold_going_right == dist_to_gold_now and turning_right_position_char != "W":
-                self.current_action = "virar_direita"
-                return
-        
-        if backwards_position:
-            if dist_to_gold_going_backwards == dist_to_gold_now and backwards_position_char not in ["W", "!"]:
-                self.current_action = "andar_re"
-                return
-        
-        ####
+        # caminho de verdade (desviando de "W" e "!") se existir; senão, a aproximação gulosa
+        action = self.ItemStep(nearest_gold, self.gold_fields)
+        if action is None:
+            action = self.GreedyStep(nearest_gold)
+        self.current_action = action
 
-        if forward_position and forward_position_char != "W":
-            self.current_action = "andar"
-        elif turning_left_position and turning_left_position_char != "W":
-            self.current_action = "virar_esquerda"
-        elif turning_right_position and turning_right_position_char != "W":
-            self.current_action = "virar_direita"
-        else:
-            self.current_action = "andar_re"
+
+    def GreedyStep(self, target):
+        """ Função auxiliar. Aproximação gulosa de target quando não há caminho: primeiro a
+        ação cuja casa (frente, esquerda, direita, trás) diminui a distância de manhattan,
+        depois a que a mantém, senão qualquer uma que não bata na parede. Andar de ré
+        também evita "!".
+
+        Returns:
+            string com a ação
+        """
+
+        state = self.PlayerState()
+        view = self.map.view
+        height = self.map.height
+        forward = self.neighbors.forward[state]
+        left = self.neighbors.left[state]
+        right = self.neighbors.right[state]
+        behind = self.neighbors.behind[state]
+
+        now = abs(self.player.x - target.x) + abs(self.player.y - target.y)
+        dist_forward = dist_left = dist_right = dist_behind = INF
+        if forward >= 0 and view[forward] != WALL:
+            dist_forward = abs(forward // height - target.x) + abs(forward % height - target.y)
+        if left >= 0 and view[left] != WALL:
+            dist_left = abs(left // height - target.x) + abs(left % height - target.y)
+        if right >= 0 and view[right] != WALL:
+            dist_right = abs(right // height - target.x) + abs(right % height - target.y)
+        if behind >= 0 and not BLOCKED[view[behind]]:
+            dist_behind = abs(behind // height - target.x) + abs(behind % height - target.y)
+
+        # se andar pra frente te deixa mais perto do alvo, anda pra frente
+        if dist_forward < now:
+            return "andar"
+        if dist_left < now:
+            return "virar_esquerda"
+        if dist_right < now:
+            return "virar_direita"
+        if dist_behind < now:
+            return "andar_re"
+
+        if dist_forward == now:
+            return "andar"
+        if dist_left == now:
+            return "virar_esquerda"
+        if dist_right == now:
+            return "virar_direita"
+        if dist_behind == now:
+            return "andar_re"
+
+        if dist_forward < INF:
+            return "andar"
+        if dist_left < INF:
+            return "virar_esquerda"
+        if dist_right < INF:
+            return "virar_direita"
+        return "andar_re"
 
 
     def StateRandomExplore(self):
 
+        # vai até a casa da fronteira mais barata (em ações); a lógica aleatória
+        # abaixo só é usada quando não há fronteira alcançável por casas conhecidas
+        action = self.ExploreStep()
+        if action is not None:
+            self.current_action = action
+            return
+
         # Basicamente, a lógica que usei nessa função foi a seguinte: na fase de explorar,
         # é melhor dar prioridade para ir para posições ainda desconhecidas (ou seja,
         # marcadas com "?"). E também, é melhor ir pra frente do que virar e ir para
         # outro lado porque indo para frente você gasta apenas uma ação, e não duas.
         # se a da frente já é conhecida, vê as duas do lado. para ficar equilibrado,
         # faço um sorteio para ver se a esquerda terá prioridade sobre a direita dessa vez
-        
-        forward_position = self.GetPositionForward()
-        if forward_position:
-            forward_position_char = self.GetCharPosition(forward_position)
-        turning_left_position = self.GetPositionTurningLeft()
-        if turning_left_position:
-            turning_left_position_char = self.GetCharPosition(turning_left_position)
-        turning_right_position = self.GetPositionTurningRight()
-        if turning_right_position:
-            turning_right_position_char = self.GetCharPosition(turning_right_position)
-        
-        random_decider = random.randint(0,1)
-        if forward_position and forward_position_char == "?":
-            self.current_action = "andar"
-
-        elif random_decider == 0:
-            if turning_left_position and turning_left_position_char == "?":
-                self.current_action = "virar_esquerda"
-            elif turning_right_position and turning_right_position_char == "?":
-                self.current_action = "virar_direita"
-            elif forward_position and forward_position_char != "W":
-                self.current_action = "andar"
-            elif turning_left_position and turning_left_position_char != "W":
-                self.current_action = "virar_esquerda"
-            else:
-                self.current_action = "virar_direita"
-        else:
-            if turning_right_position and turning_right_position_char == "?":
-                self.current_action = "virar_direita"
-            elif turning_left_position and turning_left_position_char == "?":
-                self.current_action = "virar_esquerda"
-            elif forward_position and forward_position_char != "W":
-                self.current_action = "andar"
-            elif turning_right_position and turning_right_position_char != "W":
-                self.current_action = "virar_direita"
-            else:
-                self.current_action = "virar_esquerda"
+        # (já calculado para cada padrão em Patterns.ExploreActions)
+        self.current_action = self.rng.choice(explore[self.NeighborhoodPattern()])
 
 
     def StateAvoidHole(self):
@@ -950,20 +859,19 @@ class GameAI():
 
 
     def UpdateGoldTimeout(self):
-        """ Chamado a cada tick para atualizar tempo de spawn dos ouros"""
+        """ Chamado a cada tick para atualizar tempo de spawn dos ouros: só os ouros
+        cujo prazo já passou saem de self.respawns"""
 
         posicao_player = self.GetPlayerPosition()
         if self.GetCharPosition(posicao_player) == "T":
             self.SetTimedOutGoldPosition(posicao_player)
-        for pos, time in self.timed_out_gold_positions.items():
-            if not self.IsGoldPositionTimedOut(Position(pos[0], pos[1])):
-                self.EraseTimedOutGoldPosition(Position(pos[0], pos[1]))
+        self.respawns.Advance(self.GetClock())
 
 
     def UpdateMissedShots(self):
         """ Chamado a cada tick para atualizar variável missed_shots"""
 
-        if self.past_state == "attack" and not self.current_observations["hit"]:
+        if self.past_state == "attack" and not self.observations & OBS_HIT:
             self.AddMissedShot()
         else:
             self.CleanMissedShots()
@@ -972,41 +880,43 @@ class GameAI():
     def UpdateMap(self):
         """ Atualiza o mapa a cada jogada com as informações disponíveis no momento.
 
-        Se não sente brisa ou flash, marca posições adjacentes como seguras. Se sentir
-        um dos dois, marca posições adjacentes ainda não marcadas como perigosas
+        Brisa e flash vão para self.hazards, que junta todas as leituras já feitas:
+        as casas vizinhas cuja probabilidade de perigo mudou são marcadas como
+        perigosas ("!") ou seguras ("?") conforme max_hazard_probability
         """
 
         posicao_player = self.GetPlayerPosition()
 
-        if self.current_observations["blueLight"]:
+        if self.observations & OBS_BLUE_LIGHT:
             self.SetTimedOutGoldPosition(posicao_player)
-            if self.map[posicao_player.x][posicao_player.y] != "T":
+            if self.map.Get(posicao_player.x, posicao_player.y) != "T":
                 self.golds_found += 1
-                self.map[posicao_player.x][posicao_player.y] = "T"
+                self.SetCell(posicao_player.x, posicao_player.y, "T")
         
-        elif self.current_observations["redLight"]:
-            if self.map[posicao_player.x][posicao_player.y] != "L":
+        elif self.observations & OBS_RED_LIGHT:
+            if self.map.Get(posicao_player.x, posicao_player.y) != "L":
                 self.powerups_found += 1
-                self.map[posicao_player.x][posicao_player.y] = "L"
+                self.SetCell(posicao_player.x, posicao_player.y, "L")
         
-        if self.current_observations["breeze"] or self.current_observations["flash"]:
-            for adjacent_position in self.GetObservableAdjacentPositions():
-                if self.map[adjacent_position.x][adjacent_position.y] == "#":
-                    self.map[adjacent_position.x][adjacent_position.y] = "!"
-        else:
-            for adjacent_position in self.GetObservableAdjacentPositions():
-                adjacent_position_char = self.map[adjacent_position.x][adjacent_position.y]
-                if adjacent_position_char == "!" or adjacent_position_char == "#":
-                    self.map[adjacent_position.x][adjacent_position.y] = "?"
-
-        if self.current_observations["blocked"]:
-            position_forward = self.GetPositionForward()
-            if position_forward:
-                self.map[position_forward.x][position_forward.y] = "W"
+        self.UpdateHazardCells(self.hazards.Observe(posicao_player.x, posicao_player.y,
+                                                    self.observations & OBS_BREEZE,
+                                                    self.observations & OBS_FLASH))
+
+        # current_action ainda é a última ação enviada: se foi andar de ré, a parede está atrás
+        if self.observations & OBS_BLOCKED:
+            if self.current_action == "andar_re":
+                blocked = self.neighbors.behind[self.PlayerState()]
+            else:
+                blocked = self.neighbors.forward[self.PlayerState()]
+            if blocked >= 0:
+                x = blocked // self.map.height
+                y = blocked - x * self.map.height
+                self.SetCell(x, y, "W")
+                self.UpdateHazardCells(self.hazards.MarkSafe(x, y))
 
-        current_position_char = self.map[posicao_player.x][posicao_player.y]
-        if current_position_char == "#" or current_position_char == "?":
-            self.map[posicao_player.x][posicao_player.y] = "."
+        current_position_char = self.map.Get(posicao_player.x, posicao_player.y)
+        if current_position_char == "#" or current_position_char == "?" or current_position_char == "!":
+            self.SetCell(posicao_player.x, posicao_player.y, ".")
 
 
     def DecideState(self):
@@ -1015,12 +925,12 @@ class GameAI():
         """
 
         # de qq jeito, se passar por cima de um ouro consideramos que sempre vale a pena pegar
-        if self.current_observations["blueLight"]:
+        if self.observations & OBS_BLUE_LIGHT:
             self.current_state = "grab"
             self.StateGrab()
 
         # analogamente, se passar por cima de poção e não tiver com vida cheia,vale também
-        elif self.current_observations["redLight"] and self.energy < 100:
+        elif self.observations & OBS_RED_LIGHT and self.energy < 100:
             self.current_state = "grab"
             self.StateGrab()
 
@@ -1031,15 +941,14 @@ class GameAI():
             self.StateAvoidHole()
 
         # se posição à frente ou atrás está marcada como perigosa, entra no estado de evitar buraco
-        elif ((self.GetPositionForward() and self.GetCharPosition(self.GetPositionForward()) == "!") or
-              (self.GetPositionBehind() and self.GetCharPosition(self.GetPositionBehind())== "!")):
+        elif not (self.IsPositionForwardSafe() and self.IsPositionBehindSafe()):
             self.current_state = "avoid_hole"
             self.avoid_hole_ticks = 0
             self.StateAvoidHole()
         
         # se sofreu dano & (não deu dano | não ta com vida alta), entra no estado de fugir
-        elif (self.current_observations["damage"] and 
-              (not self.current_observations["hit"] or self.energy <= self.min_hp_escape)):
+        elif (self.observations & OBS_DAMAGE and 
+              (not self.observations & OBS_HIT or self.energy <= self.min_hp_escape)):
             self.current_state = "escape"
             self.escape_ticks = 0
             self.StateEscape()
@@ -1063,7 +972,7 @@ class GameAI():
         # se tem inimigo na frente & a vida ta razoavelmente alta & não errou muito
         # tiro recentemente, atira. Isso do tiro que errou é pra tentar evitar
         # de ficar atirando na parede se tiver inimigo atrás dela.
-        elif (self.current_observations["enemy_in_front"] and self.energy > self.min_hp_attack and
+        elif (self.observations & OBS_ENEMY_IN_FRONT and self.energy > self.min_hp_attack and
               self.consecutive_missed_shots < self.max_consecutive_missed_shots):
             self.current_state = "attack"
             self.StateAttack()
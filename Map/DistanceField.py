@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+
+"""DistanceField.py: INF1771 Actions-to-target from every (x, y, facing), repaired as the map changes."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import heapq
+from collections import deque
+from Map.Grid import CELL_CHARS
+from Map.Planner import DX, DY, FORWARD, BACKWARD, TURN_RIGHT, TURN_LEFT
+
+INF = 1 << 30
+
+# <summary>
+# Cells a field spreads over: known and safe ("." "?" "T" "L"). Unlike
+# the planner, fields never go through unknown cells, so a distance is a
+# route the bot has already seen.
+# </summary>
+KNOWN_SAFE = bytes(1 if c in ".?TL" else 0 for c in CELL_CHARS) + bytes(256 - len(CELL_CHARS))
+
+
+# <summary>
+# Distance, in actions, from every (cell, facing) state to one target cell
+# (any facing). States are cell * 4 + facing, cell = x * height + y, as
+# in Map.Planner. Forward/backward and left/right turns undo each other,
+# so the state graph is undirected and one BFS from the target fills it.
+#
+# When a cell becomes safe, the shorter distances it opens are pushed
+# out from it. When a cell stops being safe (a wall is found), only the
+# states whose every shortest route went through it are reset and then
+# refilled from their still valid neighbours (dynamic BFS repair).
+# </summary>
+class DistanceField():
+
+    grid = None
+    target = 0   # target cell
+    dist = None  # state => actions to the target, INF if unreachable
+    inside = None # cell => 1 if it was safe at the last update
+
+    rebuilds = 0
+    repairs = 0
+    touched = 0 # states lowered while repairing
+
+
+    def __init__(self, grid, x, y):
+        self.grid = grid
+        self.target = x * grid.height + y
+        self.rebuilds = 0
+        self.repairs = 0
+        self.touched = 0
+        self.Rebuild()
+
+
+    def Neighbors(self, state):
+        """ Estados a uma ação de distância (nos dois sentidos) que estão dentro do campo"""
+
+        height = self.grid.height
+        inside = self.inside
+        cell = state >> 2
+        d = state & 3
+        x = cell // height
+        y = cell - x * height
+
+        result = [(state & ~3) | ((d + 1) & 3), (state & ~3) | ((d - 1) & 3)]
+        nx = x + DX[d]
+        ny = y + DY[d]
+        if 0 <= nx < self.grid.width and 0 <= ny < height and inside[nx * height + ny]:
+            result.append((nx * height + ny) * 4 + d)
+        nx = x - DX[d]
+        ny = y - DY[d]
+        if 0 <= nx < self.grid.width and 0 <= ny < height and inside[nx * height + ny]:
+            result.append((nx * height + ny) * 4 + d)
+        return result
+
+
+    def Rebuild(self):
+        """ BFS completo a partir do alvo"""
+
+        self.inside = self.grid.CellBytes()
+        for cell in self.grid.CellsWhere(KNOWN_SAFE):
+            self.inside[cell] = 1
+        self.dist = dist = self.grid.CellArray(INF, 4)
+        self.rebuilds += 1
+
+        if not self.inside[self.target]:
+            return
+
+        queue = deque()
+        for d in range(4):
+            dist[self.target * 4 + d] = 0
+            queue.append((0, self.target * 4 + d))
+
+        touched = self.touched
+        self.Spread(queue, deque.popleft, deque.append)
+        self.touched = touched
+
+
+    # <summary>
+    # A cell of the grid was written, update the field if it became safe
+    # or stopped being safe
+    # </summary>
+    # <param name="cell">x * height + y</param>
+    def CellChanged(self, cell):
+
+        safe = KNOWN_SAFE[self.grid.view[cell]]
+        if safe == self.inside[cell]:
+            return
+
+        self.repairs += 1
+        self.inside[cell] = safe
+        if cell == self.target:
+            self.Rebuild()
+        elif safe:
+            self.Relax([cell * 4 + d for d in range(4)])
+        else:
+            self.Invalidate(cell)
+
+
+    def Relax(self, states):
+        """ Recalcula states a partir dos vizinhos e espalha as distâncias que diminuíram"""
+
+        dist = self.dist
+        heap = []
+        for state in states:
+            best = INF
+            for n in self.Neighbors(state):
+                if dist[n] < best:
+                    best = dist[n]
+            if best + 1 < dist[state]:
+                dist[state] = best + 1
+                heap.append((best + 1, state))
+        heapq.heapify(heap)
+        self.Spread(heap, heapq.heappop, heapq.heappush)
+
+
+    def Spread(self, queue, pop, push):
+        """ Espalha distâncias a partir dos estados em queue (heap de (g, estado) ou
+        deque em ordem de g). Mesmo percurso de Neighbors, escrito por extenso porque
+        é o laço mais quente do campo."""
+
+        dist = self.dist
+        inside = self.inside
+        width = self.grid.width
+        height = self.grid.height
+        touched = 0
+
+        while queue:
+            g, state = pop(queue)
+            if g > dist[state]:
+                continue
+            g += 1
+            base = state & ~3
+            d = state & 3
+
+            for n in (base | ((d + 1) & 3), base | ((d - 1) & 3)):
+                if dist[n] > g:
+                    dist[n] = g
+                    push(queue, (g, n))
+                    touched += 1
+
+            cell = state >> 2
+            x = cell // height
+            y = cell - x * height
+            dx = DX[d]
+            dy = DY[d]
+            for nx, ny in ((x + dx, y + dy), (x - dx, y - dy)):
+                if 0 <= nx < width and 0 <= ny < height:
+                    ncell = nx * height + ny
+                    if inside[ncell]:
+                        n = ncell * 4 + d
+                        if dist[n] > g:
+                            dist[n] = g
+                            push(queue, (g, n))
+                            touched += 1
+
+        self.touched += touched
+
+
+    def Invalidate(self, cell):
+        """ Tira cell do campo: zera os estados que dependiam dela e preenche de novo"""
+
+        dist = self.dist
+        work = deque()
+        affected = []
+
+        height = self.grid.height
+        x = cell // height
+        y = cell - x * height
+
+        # the cell is already out of the field, so its old neighbours are
+        # found from its position and not through Neighbors
+        for d in range(4):
+            state = cell * 4 + d
+            old = dist[state]
+            dist[state] = INF
+            if old < INF:
+                for nx, ny in ((x + DX[d], y + DY[d]), (x - DX[d], y - DY[d])):
+                    if 0 <= nx < self.grid.width and 0 <= ny < height:
+                        n = (nx * height + ny) * 4 + d
+                        if dist[n] == old + 1:
+                            work.append(n)
+
+        while work:
+            state = work.popleft()
+            g = dist[state]
+            if g == INF or g == 0:
+                continue
+            supported = False
+            for n in self.Neighbors(state):
+                if dist[n] == g - 1:
+                    supported = True
+                    break
+            if supported:
+                continue
+            dist[state] = INF
+            affected.append(state)
+            for n in self.Neighbors(state):
+                if dist[n] == g + 1:
+                    work.append(n)
+
+        self.Relax(affected)
+
+
+    def Distance(self, x, y, facing):
+        return self.dist[(x * self.grid.height + y) * 4 + facing]
+
+
+    def NextAction(self, x, y, facing):
+        """ Ação que diminui a distância em 1 (frente, ré, direita, esquerda, nessa ordem),
+        ou None se já está no alvo ou não há caminho conhecido"""
+
+        height = self.grid.height
+        state = (x * height + y) * 4 + facing
+        g = self.dist[state]
+        if g == 0 or g >= INF:
+            return None
+
+        dist = self.dist
+        for sign, name in ((1, FORWARD), (-1, BACKWARD)):
+            nx = x + sign * DX[facing]
+            ny = y + sign * DY[facing]
+            if 0 <= nx < self.grid.width and 0 <= ny < height and dist[(nx * height + ny) * 4 + facing] == g - 1:
+                return name
+        if dist[(state & ~3) | ((facing + 1) & 3)] == g - 1:
+            return TURN_RIGHT
+        if dist[(state & ~3) | ((facing - 1) & 3)] == g - 1:
+            return TURN_LEFT
+        return None
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""Frontier.py: INF1771 Set of cells worth exploring, kept up to date cell by cell."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from collections import deque
+from Map.Grid import CELL_CHARS, UNKNOWN, SAFE
+from Map.DistanceField import KNOWN_SAFE
+from Map.Planner import DX, DY
+
+KNOWN = bytes(0 if c == "#" else 1 for c in CELL_CHARS) + bytes(256 - len(CELL_CHARS))
+
+
+# <summary>
+# Frontier cells: known safe cells ("." "?" "T" "L") that were never
+# stood on ("?") or that still touch an unknown cell ("#"). Standing on
+# one reveals its item and its four neighbours.
+#
+# A write can only change the status of the written cell and its four
+# neighbours, so CellChanged looks at those five cells and nothing else.
+# </summary>
+class Frontier():
+
+    grid = None
+    cells = None  # set of frontier cells (x * height + y)
+    seen = None   # cell => 1 once it stopped being "#"
+
+    known = 0     # cells that are not "#" anymore
+    updates = 0   # cells rechecked by CellChanged
+    searches = 0  # Nearest calls
+    expanded = 0  # states visited by Nearest
+
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.cells = set()
+        self.seen = grid.CellBytes()
+        self.known = 0
+        self.updates = 0
+        self.searches = 0
+        self.expanded = 0
+        for cell in grid.CellsWhere(KNOWN):
+            self.seen[cell] = 1
+            self.known += 1
+            if self.IsFrontier(cell):
+                self.cells.add(cell)
+
+
+    def IsFrontier(self, cell):
+
+        view = self.grid.view
+        code = view[cell]
+        if not KNOWN_SAFE[code]:
+            return False
+        if code == SAFE:
+            return True
+
+        height = self.grid.height
+        x = cell // height
+        y = cell - x * height
+        for d in range(4):
+            nx = x + DX[d]
+            ny = y + DY[d]
+            if 0 <= nx < self.grid.width and 0 <= ny < height and view[nx * height + ny] == UNKNOWN:
+                return True
+        return False
+
+
+    # <summary>
+    # A cell of the grid was written
+    # </summary>
+    # <param name="cell">x * height + y</param>
+    def CellChanged(self, cell):
+
+        if not self.seen[cell] and self.grid.view[cell] != UNKNOWN:
+            self.seen[cell] = 1
+            self.known += 1
+
+        height = self.grid.height
+        x = cell // height
+        y = cell - x * height
+        check = [cell]
+        for d in range(4):
+            nx = x + DX[d]
+            ny = y + DY[d]
+            if 0 <= nx < self.grid.width and 0 <= ny < height:
+                check.append(nx * height + ny)
+
+        for c in check:
+            if self.IsFrontier(c):
+                self.cells.add(c)
+            else:
+                self.cells.discard(c)
+        self.updates += len(check)
+
+
+    def __len__(self):
+        return len(self.cells)
+
+
+    def __contains__(self, cell):
+        return cell in self.cells
+
+
+    # <summary>
+    # Frontier cell with the fewest actions from (x, y, facing), moving
+    # only through known safe cells (BFS over (cell, facing), turns cost one)
+    # </summary>
+    # <returns>(x, y) of the cell, or None if no frontier cell is reachable</returns>
+    def Nearest(self, x, y, facing):
+
+        self.searches += 1
+        if not self.cells:
+            return None
+
+        width = self.grid.width
+        height = self.grid.height
+        view = self.grid.view
+        cells = self.cells
+
+        start = (x * height + y) * 4 + facing
+        here = x * height + y
+        seen = {start}
+        queue = deque([start])
+        expanded = 0
+
+        while queue:
+            state = queue.popleft()
+            cell = state >> 2
+            if cell in cells and cell != here:
+                self.expanded += expanded
+                return cell // height, cell % height
+            expanded += 1
+
+            d = state & 3
+            base = state & ~3
+            cx = cell // height
+            cy = cell - cx * height
+            nexts = [base | ((d + 1) & 3), base | ((d - 1) & 3)]
+            for nx, ny in ((cx + DX[d], cy + DY[d]), (cx - DX[d], cy - DY[d])):
+                if 0 <= nx < width and 0 <= ny < height and KNOWN_SAFE[view[nx * height + ny]]:
+                    nexts.append((nx * height + ny) * 4 + d)
+            for n in nexts:
+                if n not in seen:
+                    seen.add(n)
+                    queue.append(n)
+
+        self.expanded += expanded
+        return None
+
+
+    def GetStats(self):
+        return {
+            "frontier": len(self.cells),
+            "known": self.known,
+            "updates": self.updates,
+            "searches": self.searches,
+            "expanded": self.expanded,
+        }
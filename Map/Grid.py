@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+
+"""Grid.py: INF1771 Map grid stored as a NumPy uint8 array, or in chunks for large maps."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import numpy
+
+# <summary>
+# Cell codes. CELL_CHARS[code] is the character GameAI has always used
+# for the cell (see the GameAI docstring).
+# </summary>
+UNKNOWN = 0 # "#" never seen
+FREE = 1    # "." visited, nothing in it
+DANGER = 2  # "!" possible hole or teleport
+SAFE = 3    # "?" not visited but safe
+GOLD = 4    # "T" gold spawns here
+POWERUP = 5 # "L" power-up spawns here
+WALL = 6    # "W"
+
+CELL_CHARS = "#.!?TLW"
+CELL_CODES = {c: code for code, c in enumerate(CELL_CHARS)}
+
+PASSABLE = (FREE, SAFE, GOLD, POWERUP)
+
+
+def CodeTable(codes):
+    """ Tabela code => bool, para montar máscaras com uma indexação só (lut[cells])"""
+    table = numpy.zeros(256, dtype=bool)
+    table[list(codes)] = True
+    return table
+
+
+PASSABLE_TABLE = CodeTable(PASSABLE)
+UNKNOWN_TABLE = CodeTable((UNKNOWN, SAFE))
+
+# <summary>
+# Maps up to DENSE_LIMIT cells (the 59 x 34 = 2006 of the game fits) use
+# Grid and plain per-cell lists; larger ones, including every map grown
+# from the default one by GameAI.Resize, use ChunkedGrid and SparseArray, so memory and
+# scans grow with the explored area and not with the map area. A dense
+# limit much above the real map made each bot on a large server hold
+# several MB of per-cell lists (one DistanceField of 4 entries per cell
+# for each known gold or powerup).
+# </summary>
+DENSE_LIMIT = 1 << 11
+
+
+def IsDense(width, height):
+    return width * height <= DENSE_LIMIT
+
+
+def MapSize(text):
+    """ "LxA" => (largura, altura), para a opção --map-size"""
+
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def NewGrid(width=59, height=34, fill="#"):
+    """ Grid ou ChunkedGrid, conforme o tamanho do mapa"""
+
+    if IsDense(width, height):
+        return Grid(width, height, fill)
+    return ChunkedGrid(width, height, fill)
+
+
+# <summary>
+# Per-cell data for maps too large for a list: reads of cells never
+# written return default (without storing it)
+# </summary>
+class SparseArray(dict):
+
+    __slots__ = ("default",)
+
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+def CellArray(width, height, default, per_cell=1):
+    """ Uma entrada por casa (ou per_cell por casa, ex.: 4 direções) iniciada com default:
+    lista se o mapa é pequeno, SparseArray se é grande"""
+
+    if IsDense(width, height):
+        return [default] * (width * height * per_cell)
+    return SparseArray(default)
+
+
+def CellBytes(width, height):
+    """ Como CellArray(width, height, 0), mas bytearray no mapa pequeno"""
+
+    if IsDense(width, height):
+        return bytearray(width * height)
+    return SparseArray(0)
+
+
+# <summary>
+# map[x] of the old list of lists: map[x][y] reads and writes characters
+# </summary>
+class GridColumn():
+
+    __slots__ = ("grid", "x")
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def __getitem__(self, y):
+        return self.grid.Get(self.x, y)
+
+    def __setitem__(self, y, c):
+        self.grid.Set(self.x, y, c)
+
+    def __len__(self):
+        return self.grid.height
+
+
+# <summary>
+# width x height cells, one byte each. cells[x, y] is the NumPy view used
+# by the vectorized queries; single cell reads and writes go through a
+# memoryview over the same bytes (index x * height + y), which is much
+# cheaper than indexing the array one element at a time.
+# </summary>
+class Grid():
+
+    width = 0
+    height = 0
+    cells = None
+    view = None
+
+
+    # <summary>
+    # Create a grid with every cell set to fill
+    # </summary>
+    # <param name="width">number of columns (x)</param>
+    # <param name="height">number of rows (y)</param>
+    # <param name="fill">initial cell character</param>
+    def __init__(self, width=59, height=34, fill="#"):
+        self.width = width
+        self.height = height
+        self.cells = numpy.full((width, height), CELL_CODES[fill], dtype=numpy.uint8)
+        self.view = memoryview(self.cells.reshape(-1))
+
+
+    def InBounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+
+    def Get(self, x, y):
+        return CELL_CHARS[self.view[x * self.height + y]]
+
+
+    def Set(self, x, y, c):
+        self.view[x * self.height + y] = CELL_CODES[c]
+
+
+    def GetCode(self, x, y):
+        return self.view[x * self.height + y]
+
+
+    def SetCode(self, x, y, code):
+        self.view[x * self.height + y] = code
+
+
+    # compatibility with the list of lists: map[x][y], len(map), for column in map
+    def __getitem__(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError(x)
+        return GridColumn(self, x)
+
+    def __len__(self):
+        return self.width
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield GridColumn(self, x)
+
+
+    ###########################################################################
+    #
+    # Vectorized queries
+    #
+    ###########################################################################
+
+    def Mask(self, *chars):
+        """ Máscara booleana (width x height) das casas com qualquer um dos caracteres"""
+
+        if len(chars) == 1:
+            return self.cells == CELL_CODES[chars[0]]
+        return CodeTable(CELL_CODES[c] for c in chars)[self.cells]
+
+
+    def PassableMask(self):
+        """ Casas por onde o bot pode andar sem risco: ".", "?", "T" e "L" """
+        return PASSABLE_TABLE[self.cells]
+
+
+    def UnknownMask(self):
+        """ Casas nunca visitadas: "#" e "?" """
+        return UNKNOWN_TABLE[self.cells]
+
+
+    def Positions(self, c):
+        """ Lista de (x, y) das casas com o caractere c, em ordem de y e depois x
+        (a mesma ordem da varredura antiga em GetAllGoldsPositions)"""
+
+        ys, xs = numpy.nonzero(self.cells.T == CELL_CODES[c])
+        return list(zip(xs.tolist(), ys.tolist()))
+
+
+    def Count(self, c):
+        return int(numpy.count_nonzero(self.cells == CELL_CODES[c]))
+
+
+    def NeighborCount(self, mask):
+        """ Para cada casa, quantos dos 4 vizinhos (norte, sul, leste, oeste) estão na máscara"""
+
+        m = mask.astype(numpy.uint8)
+        counts = numpy.zeros(m.shape, dtype=numpy.uint8)
+        counts[1:, :] += m[:-1, :]
+        counts[:-1, :] += m[1:, :]
+        counts[:, 1:] += m[:, :-1]
+        counts[:, :-1] += m[:, 1:]
+        return counts
+
+
+    def ToString(self):
+        """ Mapa em texto, uma linha por y (como print_map sempre mostrou)"""
+
+        lut = numpy.frombuffer(CELL_CHARS.encode("ascii"), dtype=numpy.uint8)
+        rows = lut[self.cells.T]
+        return "\n".join(row.tobytes().decode("ascii") for row in rows)
+
+
+    def CellsWhere(self, table):
+        """ Índices (x * height + y) das casas cujo código c tem table[c] verdadeiro,
+        em ordem crescente. table: bytes de 256 posições (ex.: Map.Planner.BLOCKED)"""
+
+        lut = numpy.frombuffer(table, dtype=numpy.uint8)
+        return numpy.flatnonzero(lut[self.cells.reshape(-1)]).tolist()
+
+
+    def CellArray(self, default, per_cell=1):
+        return CellArray(self.width, self.height, default, per_cell)
+
+
+    def CellBytes(self):
+        return CellBytes(self.width, self.height)
+
+
+# <summary>
+# view of a ChunkedGrid: view[x * height + y] is the cell code, WALL for
+# cells of chunks never allocated
+# </summary>
+class ChunkView():
+
+    __slots__ = ("grid",)
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __getitem__(self, cell):
+        grid = self.grid
+        x = cell // grid.height
+        y = cell - x * grid.height
+        chunk = grid.chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return WALL
+        return chunk[((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)]
+
+
+CHUNK_SHIFT = 5
+CHUNK = 1 << CHUNK_SHIFT # cells per chunk side
+CHUNK_MASK = CHUNK - 1
+
+
+# <summary>
+# Same interface as Grid (Get/Set, GetCode/SetCode, map[x][y], view,
+# Positions, Count, ToString, CellsWhere) for maps of any size. Cells
+# are kept in CHUNK x CHUNK blocks allocated the first time a cell in
+# them, or next to them, is written; cells of other chunks read as fill.
+#
+# view reads those never allocated cells as WALL, so the planner, the
+# distance fields and the frontier never leave the allocated region.
+# Since writing a cell also allocates the chunks of its four neighbours,
+# every known cell still sees its unknown neighbours as "#". The NumPy
+# masks of Grid (Mask, PassableMask, UnknownMask, NeighborCount) would
+# cost the whole map area and are not provided.
+# </summary>
+class ChunkedGrid():
+
+    width = 0
+    height = 0
+    fill = 0
+    chunks = None # (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT) => bytearray(CHUNK * CHUNK)
+    view = None
+
+
+    def __init__(self, width, height, fill="#"):
+        self.width = width
+        self.height = height
+        self.fill = CELL_CODES[fill]
+        self.chunks = {}
+        self.view = ChunkView(self)
+
+
+    def InBounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+
+    def Get(self, x, y):
+        return CELL_CHARS[self.GetCode(x, y)]
+
+
+    def Set(self, x, y, c):
+        self.SetCode(x, y, CELL_CODES[c])
+
+
+    def GetCode(self, x, y):
+        chunk = self.chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return self.fill
+        return chunk[((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)]
+
+
+    def SetCode(self, x, y, code):
+        chunk = self.Chunk(x, y)
+        chunk[((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)] = code
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                self.Chunk(nx, ny)
+
+
+    def Chunk(self, x, y):
+        """ Bloco da casa (x, y), criado (todo fill) se ainda não existe"""
+
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = bytearray([self.fill]) * (CHUNK * CHUNK)
+        return chunk
+
+
+    # compatibility with the list of lists: map[x][y], len(map), for column in map
+    def __getitem__(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError(x)
+        return GridColumn(self, x)
+
+    def __len__(self):
+        return self.width
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield GridColumn(self, x)
+
+
+    def Allocated(self):
+        """ Casas (x, y, código) dos blocos já criados, bloco a bloco"""
+
+        for (cx, cy), chunk in self.chunks.items():
+            x0 = cx << CHUNK_SHIFT
+            y0 = cy << CHUNK_SHIFT
+            for i, code in enumerate(chunk):
+                x = x0 + (i >> CHUNK_SHIFT)
+                y = y0 + (i & CHUNK_MASK)
+                if x < self.width and y < self.height:
+                    yield x, y, code
+
+
+    def Positions(self, c):
+        """ Lista de (x, y) das casas com o caractere c, em ordem de y e depois x
+        (as casas dos blocos nunca criados não entram)"""
+
+        code = CELL_CODES[c]
+        return sorted(((x, y) for x, y, v in self.Allocated() if v == code), key=lambda p: (p[1], p[0]))
+
+
+    def Count(self, c):
+        code = CELL_CODES[c]
+        return sum(1 for x, y, v in self.Allocated() if v == code)
+
+
+    def CellsWhere(self, table):
+        """ Como Grid.CellsWhere, só nos blocos já criados"""
+
+        height = self.height
+        return sorted(x * height + y for x, y, code in self.Allocated() if table[code])
+
+
+    def CellArray(self, default, per_cell=1):
+        return CellArray(self.width, self.height, default, per_cell)
+
+
+    def CellBytes(self):
+        return CellBytes(self.width, self.height)
+
+
+    def ToString(self):
+        """ Mapa em texto do retângulo que cobre os blocos já criados"""
+
+        if not self.chunks:
+            return ""
+        x0 = min(cx for cx, cy in self.chunks) << CHUNK_SHIFT
+        x1 = min(self.width, (max(cx for cx, cy in self.chunks) + 1) << CHUNK_SHIFT)
+        y0 = min(cy for cx, cy in self.chunks) << CHUNK_SHIFT
+        y1 = min(self.height, (max(cy for cx, cy in self.chunks) + 1) << CHUNK_SHIFT)
+        return "\n".join("".join(self.Get(x, y) for x in range(x0, x1)) for y in range(y0, y1))
+
+
+    def GetStats(self):
+        return {
+            "chunks": len(self.chunks),
+            "bytes": len(self.chunks) * CHUNK * CHUNK,
+        }
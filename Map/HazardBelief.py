@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+
+"""HazardBelief.py: INF1771 Pit and teleport probabilities per cell, combined from every breeze and flash."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from Map.Grid import CellArray, CellBytes, IsDense
+from Map.Planner import DX, DY
+
+# <summary>
+# Hazard kinds: breeze tells about pits, flash about teleports
+# </summary>
+PIT, TELEPORT = 0, 1
+KINDS = (PIT, TELEPORT)
+
+# <summary>
+# What was sensed standing on a cell, for one kind
+# </summary>
+NO_READING = 0 # never stood there
+CLEAR = 1      # no breeze/flash: no neighbour has the hazard
+SENSED = 2     # breeze/flash: at least one neighbour has it
+
+
+# <summary>
+# Belief about where the pits and teleports are. Each reading is a
+# constraint on the four neighbours of the cell it was taken on: CLEAR
+# says none of them has the hazard, SENSED says at least one of the
+# neighbours not yet cleared (its candidates) has it.
+#
+# Per kind and cell:
+#   free    = 1 if the cell cannot have the hazard (stood on, wall, or
+#             next to a CLEAR reading)
+#   certain = 1 if it was the only candidate left of a SENSED reading
+#   prob    = 0 if free, 1 if certain, otherwise the largest 1 / k over
+#             the SENSED readings next to it (k candidates), or prior if
+#             none. A reading with a certain candidate still counts: one
+#             hazard explains it, but a second one may be next to it too
+#
+# Everything a new reading or a new free cell can change is within two
+# cells of it, so each update recomputes only those cells (a few dozen
+# at most) and returns them. On large maps (see Map.Grid.IsDense) the
+# per-cell arrays are SparseArray, and only the cells ever recomputed
+# (touched) are kept.
+# </summary>
+class HazardBelief():
+
+    width = 0
+    height = 0
+    prior = 0.0
+    reading = None # kind => bytearray cell => NO_READING, CLEAR or SENSED
+    free = None    # kind => bytearray
+    certain = None # kind => bytearray
+    prob = None    # kind => list cell => float
+    touched = None # cells whose probability was recomputed at least once
+
+    observations = 0 # Observe calls that brought something new
+    updates = 0      # cell probabilities recomputed
+
+
+    # <summary>
+    # Belief over a width x height map, cells indexed x * height + y
+    # </summary>
+    # <param name="prior">probability of a cell no SENSED reading points at</param>
+    def __init__(self, width, height, prior=0.05):
+        self.width = width
+        self.height = height
+        self.prior = prior
+        self.reading = [CellBytes(width, height) for _ in KINDS]
+        self.free = [CellBytes(width, height) for _ in KINDS]
+        self.certain = [CellBytes(width, height) for _ in KINDS]
+        self.prob = [CellArray(width, height, prior) for _ in KINDS]
+        self.touched = set()
+        self.observations = 0
+        self.updates = 0
+
+
+    def Neighbors(self, cell):
+
+        height = self.height
+        x = cell // height
+        y = cell - x * height
+        result = []
+        for d in range(4):
+            nx = x + DX[d]
+            ny = y + DY[d]
+            if 0 <= nx < self.width and 0 <= ny < height:
+                result.append(nx * height + ny)
+        return result
+
+
+    def Candidates(self, kind, cell):
+        """ Vizinhos de cell que ainda podem ter o perigo"""
+        free = self.free[kind]
+        return [n for n in self.Neighbors(cell) if not free[n]]
+
+
+    # <summary>
+    # The bot is standing on (x, y) and sensed breeze/flash or not
+    # </summary>
+    # <returns>list of cells whose probability may have changed (empty if nothing new)</returns>
+    def Observe(self, x, y, breeze, flash):
+
+        cell = x * self.height + y
+        new = (SENSED if breeze else CLEAR, SENSED if flash else CLEAR)
+        if (self.reading[PIT][cell] == new[PIT] and self.reading[TELEPORT][cell] == new[TELEPORT] and
+                self.free[PIT][cell] and self.free[TELEPORT][cell]):
+            return []
+
+        self.observations += 1
+        dirty = set()
+        for kind in KINDS:
+            self.SetFree(kind, cell, dirty)
+            if self.reading[kind][cell] == new[kind]:
+                continue
+            self.reading[kind][cell] = new[kind]
+            if new[kind] == CLEAR:
+                for n in self.Neighbors(cell):
+                    self.SetFree(kind, n, dirty)
+            else:
+                self.Sensed(kind, cell, dirty)
+
+        return self.Recompute(dirty)
+
+
+    # <summary>
+    # (x, y) has neither hazard (a wall, or the bot got through it)
+    # </summary>
+    # <returns>list of cells whose probability may have changed</returns>
+    def MarkSafe(self, x, y):
+
+        cell = x * self.height + y
+        if self.free[PIT][cell] and self.free[TELEPORT][cell]:
+            return []
+        dirty = set()
+        for kind in KINDS:
+            self.SetFree(kind, cell, dirty)
+        return self.Recompute(dirty)
+
+
+    def SetFree(self, kind, cell, dirty):
+        """ cell não tem o perigo: sai dos candidatos das leituras SENSED vizinhas,
+        e a leitura que ficar com um candidato só o torna certo"""
+
+        free = self.free[kind]
+        if free[cell]:
+            return
+        free[cell] = 1
+        self.certain[kind][cell] = 0
+        dirty.add(cell)
+
+        reading = self.reading[kind]
+        for n in self.Neighbors(cell):
+            if reading[n] == SENSED:
+                self.Sensed(kind, n, dirty)
+
+
+    def Sensed(self, kind, cell, dirty):
+        """ A leitura SENSED em cell mudou (é nova ou perdeu um candidato)"""
+
+        candidates = self.Candidates(kind, cell)
+        dirty.update(candidates)
+        if len(candidates) == 1:
+            # the hazard is there
+            self.certain[kind][candidates[0]] = 1
+
+
+    def Recompute(self, dirty):
+
+        for kind in KINDS:
+            free = self.free[kind]
+            certain = self.certain[kind]
+            reading = self.reading[kind]
+            prob = self.prob[kind]
+            for cell in dirty:
+                if free[cell]:
+                    p = 0.0
+                elif certain[cell]:
+                    p = 1.0
+                else:
+                    p = self.prior
+                    for n in self.Neighbors(cell):
+                        if reading[n] != SENSED:
+                            continue
+                        candidates = self.Candidates(kind, n)
+                        if 1.0 / len(candidates) > p:
+                            p = 1.0 / len(candidates)
+                prob[cell] = p
+        self.updates += len(dirty)
+        self.touched.update(dirty)
+        return list(dirty)
+
+
+    ###########################################################################
+    #
+    # Queries
+    #
+    ###########################################################################
+
+    def Probability(self, x, y):
+        """ Probabilidade de (x, y) ter buraco ou teletransporte"""
+
+        cell = x * self.height + y
+        return 1.0 - (1.0 - self.prob[PIT][cell]) * (1.0 - self.prob[TELEPORT][cell])
+
+
+    def IsSafe(self, x, y, threshold):
+        """ True se a probabilidade de perigo em (x, y) é menor que threshold"""
+        return self.Probability(x, y) < threshold
+
+
+    def IsKnownSafe(self, x, y):
+        """ True se (x, y) com certeza não tem nenhum dos dois perigos"""
+
+        cell = x * self.height + y
+        return bool(self.free[PIT][cell] and self.free[TELEPORT][cell])
+
+
+    def IsCertain(self, x, y):
+        """ True se (x, y) com certeza tem buraco ou teletransporte"""
+
+        cell = x * self.height + y
+        return bool(self.certain[PIT][cell] or self.certain[TELEPORT][cell])
+
+
+    def Hazards(self, threshold):
+        """ Lista de (x, y) com probabilidade de perigo >= threshold (casas longe
+        de qualquer leitura ficam com a prior; no mapa grande só entram as já calculadas)"""
+
+        height = self.height
+        if IsDense(self.width, height):
+            cells = range(self.width * height)
+        else:
+            cells = sorted(self.touched)
+        result = []
+        for cell in cells:
+            if not (self.free[PIT][cell] and self.free[TELEPORT][cell]):
+                x = cell // height
+                y = cell - x * height
+                if self.Probability(x, y) >= threshold:
+                    result.append((x, y))
+        return result
+
+
+    def Readings(self):
+        """ (x, y, breeze, flash) de cada casa onde o bot já esteve, para refazer
+        a crença em outro mapa (GameAI.Resize)"""
+
+        height = self.height
+        for cell in sorted(self.touched):
+            if self.reading[PIT][cell] != NO_READING:
+                x = cell // height
+                yield x, cell - x * height, self.reading[PIT][cell] == SENSED, self.reading[TELEPORT][cell] == SENSED
+
+
+    def GetStats(self):
+        return {
+            "observations": self.observations,
+            "updates": self.updates,
+            "certain": sum(1 for kind in KINDS for cell in self.touched if self.certain[kind][cell]),
+        }
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+"""ItemIndex.py: INF1771 Known item spawn cells ("T" or "L") kept up to date incrementally."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from Map.Position import Position
+
+
+# <summary>
+# Spawn cells of one item type. GameAI adds and removes cells as the map
+# changes, so queries never scan the grid. A map has a handful of spawn
+# cells, so a linear pass over them is already the cheapest spatial index.
+# </summary>
+class ItemIndex():
+
+    positions = None # (x, y) => Position, the same object is returned every time
+
+
+    def __init__(self):
+        self.positions = {}
+
+
+    def __len__(self):
+        return len(self.positions)
+
+
+    def __contains__(self, xy):
+        return xy in self.positions
+
+
+    def Add(self, x, y):
+        if (x, y) not in self.positions:
+            self.positions[x, y] = Position(x, y)
+
+
+    def Remove(self, x, y):
+        self.positions.pop((x, y), None)
+
+
+    def Clear(self):
+        self.positions.clear()
+
+
+    def All(self):
+        """ Posições em ordem de y e depois x, a ordem da antiga varredura do mapa"""
+        return [self.positions[xy] for xy in sorted(self.positions, key=lambda xy: (xy[1], xy[0]))]
+
+
+    def Nearest(self, x, y, available=None):
+        """ Posição mais próxima de (x, y) em manhattan, ou None.
+        Empates ficam com a menor (y, x), como na varredura antiga.
+
+        Args:
+            available: função opcional Position => bool, para pular posições
+        """
+
+        best = None
+        best_key = None
+        for (px, py), pos in self.positions.items():
+            key = (abs(px - x) + abs(py - y), py, px)
+            if best_key is None or key < best_key:
+                if available is None or available(pos):
+                    best = pos
+                    best_key = key
+        return best
+
+
+    def Any(self, available=None):
+        """ True se existe alguma posição (disponível, se available for dado)"""
+
+        if available is None:
+            return bool(self.positions)
+        for pos in self.positions.values():
+            if available(pos):
+                return True
+        return False
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""Neighbors.py: INF1771 Precomputed (cell, facing) => neighbouring cell tables."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from Map.Grid import IsDense
+from Map.Planner import DX, DY
+
+tables = {} # (width, height) => NeighborTable, shared by every GameAI
+
+
+# <summary>
+# For every state (cell * 4 + facing, cell = x * height + y, as in
+# Map.Planner) the cell in front, behind, to the right and to the left,
+# or -1 when it is outside the map. adjacent[cell] are the cells of
+# x - 1, x + 1, y - 1 and y + 1 that exist, in that order.
+#
+# The tables never change after they are built, so one per map size is
+# shared (see Tables) and a lookup is a single list index. Entries point
+# at the same int object for the same cell (ids), instead of one int per
+# entry: four lists of 8024 entries would otherwise hold ~1 MB of ints.
+# </summary>
+class NeighborTable():
+
+    width = 0
+    height = 0
+    forward = None
+    behind = None
+    right = None
+    left = None
+    adjacent = None
+    ids = None
+
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.ids = list(range(size))
+        self.forward = [-1] * (size * 4)
+        self.behind = [-1] * (size * 4)
+        self.right = [-1] * (size * 4)
+        self.left = [-1] * (size * 4)
+        self.adjacent = [()] * size
+
+        for x in range(width):
+            for y in range(height):
+                cell = x * height + y
+                for facing in range(4):
+                    state = cell * 4 + facing
+                    self.forward[state] = self.Cell(x + DX[facing], y + DY[facing])
+                    self.behind[state] = self.Cell(x - DX[facing], y - DY[facing])
+                    right = (facing + 1) & 3
+                    self.right[state] = self.Cell(x + DX[right], y + DY[right])
+                    self.left[state] = self.Cell(x - DX[right], y - DY[right])
+                self.adjacent[cell] = tuple(c for c in (self.Cell(x - 1, y), self.Cell(x + 1, y),
+                                                        self.Cell(x, y - 1), self.Cell(x, y + 1)) if c >= 0)
+
+
+    def Cell(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.ids[x * self.height + y]
+        return -1
+
+
+# <summary>
+# NeighborTable for large maps: the same forward/behind/right/left and
+# adjacent lookups, computed on every access instead of stored
+# (a 1000 x 1000 table would take hundreds of MB)
+# </summary>
+class NeighborLookup():
+
+    width = 0
+    height = 0
+    forward = None
+    behind = None
+    right = None
+    left = None
+    adjacent = None
+
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.forward = Lookup(self, 0, 1)
+        self.behind = Lookup(self, 0, -1)
+        self.right = Lookup(self, 1, 1)
+        self.left = Lookup(self, 1, -1)
+        self.adjacent = AdjacentLookup(self)
+
+
+    def Cell(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x * self.height + y
+        return -1
+
+
+# <summary>
+# lookup[state]: the cell sign steps away from state's cell, in the
+# direction turn quarter turns to the right of its facing
+# </summary>
+class Lookup():
+
+    __slots__ = ("table", "turn", "sign")
+
+    def __init__(self, table, turn, sign):
+        self.table = table
+        self.turn = turn
+        self.sign = sign
+
+    def __getitem__(self, state):
+        height = self.table.height
+        cell = state >> 2
+        d = (state + self.turn) & 3
+        x = cell // height
+        return self.table.Cell(x + self.sign * DX[d], cell - x * height + self.sign * DY[d])
+
+
+class AdjacentLookup():
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, cell):
+        table = self.table
+        x = cell // table.height
+        y = cell - x * table.height
+        return tuple(c for c in (table.Cell(x - 1, y), table.Cell(x + 1, y),
+                                 table.Cell(x, y - 1), table.Cell(x, y + 1)) if c >= 0)
+
+
+def Tables(width, height):
+    """ NeighborTable do tamanho pedido, criada só na primeira vez
+    (NeighborLookup se o mapa é grande)"""
+
+    table = tables.get((width, height))
+    if table is None:
+        if IsDense(width, height):
+            table = NeighborTable(width, height)
+        else:
+            table = NeighborLookup(width, height)
+        tables[width, height] = table
+    return table
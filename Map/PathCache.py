@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""PathCache.py: INF1771 Reuses planned routes until the bot leaves them or they get blocked."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from Map.Planner import BLOCKED, DX, DY, FORWARD, BACKWARD, TURN_RIGHT
+
+
+# <summary>
+# One cached plan. states[i] is the (cell * 4 + facing) state the bot is
+# in before actions[i]; states[-1] is the state at the target.
+# </summary>
+class CachedPlan():
+
+    __slots__ = ("actions", "states", "index", "version")
+
+    def __init__(self, actions, states, version):
+        self.actions = actions
+        self.states = states
+        self.version = version
+        self.index = {}
+        for i in range(len(states) - 1, -1, -1):
+            self.index[states[i]] = i
+
+
+# <summary>
+# Plans per target, kept while the bot follows them. A plan is redone when
+# the bot is in a state that is not on it (it deviated: escaped, was
+# blocked, respawned) or when a cell still ahead on the route became a
+# wall or a possible hole after the plan was made. Cells are checked only
+# if their version (GameAI.cell_versions) is newer than the plan.
+# </summary>
+class PathCache():
+
+    planner = None
+    plans = None # (tx, ty) => CachedPlan
+
+    hits = 0
+    misses = 0
+    replans = 0
+
+
+    def __init__(self, planner):
+        self.planner = planner
+        self.plans = {}
+        self.hits = 0
+        self.misses = 0
+        self.replans = 0
+
+
+    # <summary>
+    # Next action towards (tx, ty)
+    # </summary>
+    # <param name="version">current map version</param>
+    # <param name="cell_versions">map version of the last write to each cell</param>
+    # <returns>action, or None if unreachable or already there</returns>
+    def Next(self, x, y, facing, tx, ty, version, cell_versions):
+
+        height = self.planner.grid.height
+        state = (x * height + y) * 4 + facing
+        plan = self.plans.get((tx, ty))
+
+        if plan is None:
+            self.misses += 1
+        else:
+            i = plan.index.get(state)
+            if i is None or (plan.version != version and self.IsBlockedAhead(plan, i, cell_versions)):
+                self.replans += 1
+            else:
+                self.hits += 1
+                plan.version = version
+                return plan.actions[i] if i < len(plan.actions) else None
+
+        actions = self.planner.Plan(x, y, facing, tx, ty)
+        if actions is None:
+            self.plans.pop((tx, ty), None)
+            return None
+
+        self.plans[tx, ty] = CachedPlan(actions, self.States(state, actions), version)
+        return actions[0] if actions else None
+
+
+    def IsBlockedAhead(self, plan, i, cell_versions):
+
+        view = self.planner.grid.view
+        version = plan.version
+        for state in plan.states[i + 1:]:
+            cell = state >> 2
+            if cell_versions[cell] > version and BLOCKED[view[cell]]:
+                return True
+        return False
+
+
+    def States(self, state, actions):
+
+        height = self.planner.grid.height
+        states = [state]
+        for name in actions:
+            cell = state >> 2
+            d = state & 3
+            if name == FORWARD:
+                cell += DX[d] * height + DY[d]
+            elif name == BACKWARD:
+                cell -= DX[d] * height + DY[d]
+            elif name == TURN_RIGHT:
+                d = (d + 1) & 3
+            else:
+                d = (d - 1) & 3
+            state = cell * 4 + d
+            states.append(state)
+        return states
+
+
+    def Forget(self, tx, ty):
+        self.plans.pop((tx, ty), None)
+
+
+    def Clear(self):
+        self.plans.clear()
+
+
+    def GetStats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "replans": self.replans,
+            "plans": self.planner.plans,
+            "expanded": self.planner.expanded,
+        }
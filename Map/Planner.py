@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+"""Planner.py: INF1771 A* over (x, y, facing) with one action per move or turn."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import heapq
+from Map.Grid import CELL_CHARS
+
+# <summary>
+# Facing. Turning right is +1, turning left is -1 (mod 4).
+# </summary>
+NORTH, EAST, SOUTH, WEST = 0, 1, 2, 3
+DIRECTIONS = {"north": NORTH, "east": EAST, "south": SOUTH, "west": WEST}
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
+
+# <summary>
+# Actions, with the names GameAI.current_action uses
+# </summary>
+FORWARD = "andar"
+BACKWARD = "andar_re"
+TURN_RIGHT = "virar_direita"
+TURN_LEFT = "virar_esquerda"
+
+# <summary>
+# Cells the planner never enters: walls and possible holes/teleports.
+# Unknown cells ("#") are allowed, the bot always sees a cell from the
+# one next to it before stepping in, and the plan is redone if it changes.
+# </summary>
+BLOCKED = bytes(1 if c in "W!" else 0 for c in CELL_CHARS) + bytes(256 - len(CELL_CHARS))
+
+
+workspaces = {} # (width, height) => Workspace, shared by every Planner
+
+
+# <summary>
+# Search arrays of a Plan call, indexed by state. They are scratch: a
+# generation stamp tells which entries belong to the current search, so
+# one Workspace per map size is shared by the planners of every agent
+# (256 KiB on the 59 x 34 map). Plans must therefore run one at a time,
+# as they do on the single decision thread/loop of Bot and Fleet.
+# </summary>
+class Workspace():
+
+    cost = None
+    parent = None
+    action = None
+    stamp = None
+    generation = 0
+
+
+    def __init__(self, grid):
+        self.cost = grid.CellArray(0, 4)
+        self.parent = grid.CellArray(-1, 4)
+        self.action = grid.CellArray(None, 4)
+        self.stamp = grid.CellArray(0, 4)
+        self.generation = 0
+
+
+def GetWorkspace(grid):
+    """ Workspace do tamanho de grid, criado só na primeira vez"""
+
+    work = workspaces.get((grid.width, grid.height))
+    if work is None:
+        work = workspaces[grid.width, grid.height] = Workspace(grid)
+    return work
+
+
+# <summary>
+# Plans on one Map.Grid, in the shared Workspace of its size
+# </summary>
+class Planner():
+
+    grid = None
+    work = None
+
+    plans = 0
+    expanded = 0
+
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.work = GetWorkspace(grid)
+        self.plans = 0
+        self.expanded = 0
+
+
+    # <summary>
+    # Shortest action sequence from (x, y, facing) to (tx, ty), any facing
+    # </summary>
+    # <param name="facing">NORTH, EAST, SOUTH or WEST</param>
+    # <returns>list of actions, [] if already there, None if unreachable</returns>
+    def Plan(self, x, y, facing, tx, ty):
+
+        grid = self.grid
+        width = grid.width
+        height = grid.height
+        view = grid.view
+        work = self.work
+        cost = work.cost
+        parent = work.parent
+        action = work.action
+        stamp = work.stamp
+
+        self.plans += 1
+        work.generation += 1
+        generation = work.generation
+
+        if not (0 <= tx < width and 0 <= ty < height) or BLOCKED[view[tx * height + ty]]:
+            return None
+
+        start = (x * height + y) * 4 + facing
+        goal = tx * height + ty
+        stamp[start] = generation
+        cost[start] = 0
+        parent[start] = -1
+
+        # (f, -g, state): among equal f, expand the deepest first
+        heap = [(self.Heuristic(x, y, facing, tx, ty), 0, start)]
+        expanded = 0
+
+        while heap:
+
+            f, g, state = heapq.heappop(heap)
+            g = -g
+            if g > cost[state]:
+                continue
+
+            cell = state >> 2
+            if cell == goal:
+                self.expanded += expanded
+                return self.Actions(state)
+
+            expanded += 1
+            d = state & 3
+            cx = cell // height
+            cy = cell - cx * height
+            g += 1
+
+            # forward, backward, right, left
+            for nx, ny, nd, name in ((cx + DX[d], cy + DY[d], d, FORWARD),
+                                     (cx - DX[d], cy - DY[d], d, BACKWARD),
+                                     (cx, cy, (d + 1) & 3, TURN_RIGHT),
+                                     (cx, cy, (d - 1) & 3, TURN_LEFT)):
+
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                ncell = nx * height + ny
+                if ncell != cell and BLOCKED[view[ncell]]:
+                    continue
+
+                n = ncell * 4 + nd
+                if stamp[n] == generation and cost[n] <= g:
+                    continue
+                stamp[n] = generation
+                cost[n] = g
+                parent[n] = state
+                action[n] = name
+                ddx = tx - nx
+                ddy = ty - ny
+                # Manhattan, plus one turn when the facing axis cannot reach the target
+                h = (ddx if ddx > 0 else -ddx) + (ddy if ddy > 0 else -ddy)
+                if (ddx if nd & 1 == 0 else ddy) != 0:
+                    h += 1
+                heapq.heappush(heap, (g + h, -g, n))
+
+        self.expanded += expanded
+        return None
+
+
+    def Heuristic(self, x, y, facing, tx, ty):
+        """ Ações mínimas até o alvo: cada passo anda uma casa e, se o alvo
+        não está no eixo para onde o bot olha (frente ou ré), falta uma virada"""
+
+        h = abs(tx - x) + abs(ty - y)
+        if (tx - x if facing & 1 == 0 else ty - y) != 0:
+            h += 1
+        return h
+
+
+    def Actions(self, state):
+
+        parent = self.work.parent
+        action = self.work.action
+        actions = []
+        while parent[state] != -1:
+            actions.append(action[state])
+            state = parent[state]
+        actions.reverse()
+        return actions
+
@@ -18,6 +18,8 @@ __version__ = "1.0.0"
 __email__ = "abaffa@inf.puc-rio.br"
 #############################################################
 
+from Map.Grid import IsDense
+
 # <summary>
 # Player Position Object
 # </summary>
@@ -26,7 +28,7 @@ class Position():
     # <summary>
     # Player x, y position
     # </summary>
-    x, y = -1, -1
+    __slots__ = ("x", "y")
 
     # <summary>
     # Position Constructor - Set new position
@@ -36,3 +38,41 @@ class Position():
     def __init__(self, x = 0, y = 0):
         self.x = x
         self.y = y
+
+
+# <summary>
+# One shared Position per cell of a width x height map, indexed
+# x * height + y (2006 for the 59 x 34 map). Helpers that only hand a
+# position out take it from here instead of building a new one on every
+# call, so these must never be changed; GameAI.player is its own object.
+# Large maps (see Map.Grid.IsDense) get a LazyCells instead of a list.
+# </summary>
+interned = {} # (width, height) => list of Position, or LazyCells
+
+def Cells(width = 59, height = 34):
+    table = interned.get((width, height))
+    if table is None:
+        if IsDense(width, height):
+            table = [Position(x, y) for x in range(width) for y in range(height)]
+        else:
+            table = LazyCells(height)
+        interned[width, height] = table
+    return table
+
+
+# <summary>
+# Same as the list of Cells, but each Position is built the first time
+# its cell is asked for
+# </summary>
+class LazyCells(dict):
+
+    __slots__ = ("height",)
+
+    def __init__(self, height):
+        super().__init__()
+        self.height = height
+
+    def __missing__(self, cell):
+        x = cell // self.height
+        position = self[cell] = Position(x, cell - x * self.height)
+        return position
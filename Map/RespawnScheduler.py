@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+"""RespawnScheduler.py: INF1771 Cells whose item was taken, ordered by when it comes back."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import heapq
+
+
+# <summary>
+# Items that are not there right now. deadlines[cell] is the time until
+# which the item at cell is still gone; heap holds (deadline, cell) so
+# Advance only looks at the entries that expired.
+#
+# queued[cell] is the live heap entry of cell (the tuple itself), so
+# there is at most one live entry per cell. Scheduling a cell that
+# already has one (pending, or cancelled but not popped yet) only sets
+# deadlines[cell]; when the entry reaches the top of the heap it is
+# pushed again with the new deadline. Only a deadline earlier than the
+# queued one pushes a second entry, and the old one becomes stale (it is
+# no longer queued[cell]) and is dropped when popped. GameAI never does
+# that: its deadlines only grow within a game.
+# Times are in whatever unit the caller uses (GameAI: milliseconds).
+# </summary>
+class RespawnScheduler():
+
+    heap = None
+    deadlines = None # cell => deadline
+    queued = None    # cell => its live heap entry
+
+    scheduled = 0
+    expired = 0
+
+
+    def __init__(self):
+        self.heap = []
+        self.deadlines = {}
+        self.queued = {}
+        self.scheduled = 0
+        self.expired = 0
+
+
+    # <summary>
+    # The item at cell is gone until deadline (inclusive)
+    # </summary>
+    def Schedule(self, cell, deadline):
+
+        self.scheduled += 1
+        self.deadlines[cell] = deadline
+        queued = self.queued.get(cell)
+        if queued is None or deadline < queued[0]:
+            entry = (deadline, cell)
+            self.queued[cell] = entry
+            heapq.heappush(self.heap, entry)
+
+
+    def Cancel(self, cell):
+        """ O item em cell voltou antes do previsto (a entrada do heap é descartada ao sair)"""
+        self.deadlines.pop(cell, None)
+
+
+    # <summary>
+    # Drop every item whose deadline is before now
+    # </summary>
+    # <returns>number of cells that became available</returns>
+    def Advance(self, now):
+
+        heap = self.heap
+        deadlines = self.deadlines
+        queued = self.queued
+        count = 0
+        while heap and heap[0][0] < now:
+            entry = heapq.heappop(heap)
+            deadline, cell = entry
+            if queued.get(cell) is not entry:
+                continue # stale: an earlier entry replaced it
+            current = deadlines.get(cell)
+            if current is None:
+                del queued[cell] # cancelled
+                continue
+            if current > deadline:
+                entry = (current, cell)
+                queued[cell] = entry
+                heapq.heappush(heap, entry)
+                continue
+            del queued[cell]
+            del deadlines[cell]
+            count += 1
+        self.expired += count
+        return count
+
+
+    def IsPending(self, cell, now):
+        """ True se o item em cell ainda não voltou no tempo now"""
+
+        deadline = self.deadlines.get(cell)
+        return deadline is not None and now <= deadline
+
+
+    def Clear(self):
+        self.heap.clear()
+        self.deadlines.clear()
+        self.queued.clear()
+
+
+    def __len__(self):
+        return len(self.deadlines)
+
+
+    def GetStats(self):
+        return {
+            "pending": len(self.deadlines),
+            "heap": len(self.heap),
+            "scheduled": self.scheduled,
+            "expired": self.expired,
+        }
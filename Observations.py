@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+"""Observations.py: INF1771 Observations of one tick as a 9-bit mask."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from collections.abc import Mapping
+
+# <summary>
+# One bit per observation, in the order of NAMES. A mask is a small int
+# (0 to 511): cheap to compare, hash and log, e.g. as a cache key.
+# </summary>
+NAMES = (
+    "blocked",        # casa para onde tentou andar está bloqueada (parede ou fim do mapa)
+    "steps",          # inimigo em até manhattan = 2
+    "breeze",         # buraco nas adjacências
+    "flash",          # teletransporte nas adjacências
+    "blueLight",      # tesouro na posição atual
+    "redLight",       # powerup na posição atual
+    "damage",         # recebeu dano
+    "hit",            # acertou tiro
+    "enemy_in_front", # inimigo a até 10 passos na direção para onde está apontando
+)
+
+OBS_BLOCKED = 1 << 0
+OBS_STEPS = 1 << 1
+OBS_BREEZE = 1 << 2
+OBS_FLASH = 1 << 3
+OBS_BLUE_LIGHT = 1 << 4
+OBS_RED_LIGHT = 1 << 5
+OBS_DAMAGE = 1 << 6
+OBS_HIT = 1 << 7
+OBS_ENEMY_IN_FRONT = 1 << 8
+
+OBS_ALL = (1 << len(NAMES)) - 1
+
+BITS = {name: 1 << i for i, name in enumerate(NAMES)}
+
+
+def Encode(observations):
+    """ Lista de observações recebidas do servidor => máscara. A observação de inimigo
+    à frente vem com o nome do inimigo, mas sempre começa com "enemy"; as
+    desconhecidas são ignoradas"""
+
+    mask = 0
+    for o in observations:
+        bit = BITS.get(o)
+        if bit is None:
+            if not o.startswith("enemy"):
+                continue
+            bit = OBS_ENEMY_IN_FRONT
+        mask |= bit
+    return mask
+
+
+def Names(mask):
+    """ Máscara => lista dos nomes das observações, na ordem de NAMES"""
+    return [name for i, name in enumerate(NAMES) if mask >> i & 1]
+
+
+# <summary>
+# Read-only dict view of a mask, for code that still reads
+# current_observations["breeze"]: every name of NAMES is a key
+# </summary>
+class ObservationView(Mapping):
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, name):
+        return bool(self.mask & BITS[name])
+
+    def __iter__(self):
+        return iter(NAMES)
+
+    def __len__(self):
+        return len(NAMES)
+
+    def __repr__(self):
+        return repr(dict(self))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+"""Patterns.py: INF1771 Random walk and random exploration, precomputed for every neighbourhood.
+
+As casas da frente, da esquerda e da direita do jogador formam um padrão
+(código do mapa de cada uma, ou OUT se está fora do mapa). Para cada padrão
+as tabelas guardam as ações possíveis, todas com a mesma chance (uma ação
+repetida k vezes em WALK_DRAWS tem probabilidade k / WALK_DRAWS), então a
+decisão é actions[Pattern(...)] e um sorteio com o RNG do agente.
+
+Uso (a partir da raiz do repositório), para ver as tabelas:
+    python Patterns.py
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from Map.Grid import DANGER, SAFE, WALL, CELL_CHARS
+
+# <summary>
+# Code of a neighbour outside the map, after the Grid codes (0 to 6),
+# so each neighbour fits in PATTERN_SHIFT bits
+# </summary>
+OUT = len(CELL_CHARS)
+PATTERN_SHIFT = 3
+CODES = 1 << PATTERN_SHIFT
+PATTERNS = CODES ** 3
+
+WALK_DRAWS = 8      # RandomWalkAvoidingWall: randint(0, 7)
+EXPLORE_DRAWS = 2   # StateRandomExplore: randint(0, 1), a esquerda ou a direita tem prioridade
+
+
+def Pattern(forward, left, right):
+    """ Padrão dos códigos da frente, da esquerda e da direita (OUT fora do mapa)"""
+    return forward | left << PATTERN_SHIFT | right << 2 * PATTERN_SHIFT
+
+
+def Split(pattern):
+    """ Padrão => (frente, esquerda, direita)"""
+    return (pattern & CODES - 1, pattern >> PATTERN_SHIFT & CODES - 1, pattern >> 2 * PATTERN_SHIFT)
+
+
+def WalkActions(forward, left, right):
+    """ Caminhada aleatória evitando colisões com a parede, com probabilidades maiores
+    para andar para a frente. Livre = existe e não é "W" nem "!".
+
+    Returns:
+        tupla de WALK_DRAWS ações igualmente prováveis
+    """
+
+    forward_free = forward not in (WALL, DANGER, OUT)
+    left_free = left not in (WALL, DANGER, OUT)
+    right_free = right not in (WALL, DANGER, OUT)
+
+    if forward_free and left_free and right_free:
+        return ("virar_direita", "virar_esquerda") + ("andar",) * 6
+    if forward_free and left_free:
+        return ("virar_esquerda",) * 2 + ("andar",) * 6
+    if forward_free and right_free:
+        return ("virar_direita",) * 2 + ("andar",) * 6
+    if left_free and right_free:
+        return ("virar_direita",) * 4 + ("virar_esquerda",) * 4
+    if forward_free:
+        return ("andar",) * WALK_DRAWS
+    # só um dos lados livre: vira sempre para a esquerda
+    if left_free or right_free:
+        return ("virar_esquerda",) * WALK_DRAWS
+    return ("virar_direita", "virar_esquerda") + ("andar",) * 6
+
+
+def ExploreActions(forward, left, right):
+    """ Exploração sem fronteira alcançável: prioridade para ir para casas ainda desconhecidas
+    ("?"), e para a frente antes de virar (uma ação em vez de duas). Se a da frente já é
+    conhecida, vê as duas do lado; o sorteio decide se a esquerda tem prioridade sobre a
+    direita ou o contrário.
+
+    Returns:
+        tupla de EXPLORE_DRAWS ações igualmente prováveis (esquerda primeiro, direita primeiro)
+    """
+
+    if forward == SAFE:
+        return ("andar",) * EXPLORE_DRAWS
+
+    actions = []
+    for first, second, first_code, second_code in (("virar_esquerda", "virar_direita", left, right),
+                                                   ("virar_direita", "virar_esquerda", right, left)):
+        if first_code == SAFE:
+            actions.append(first)
+        elif second_code == SAFE:
+            actions.append(second)
+        elif forward not in (WALL, OUT):
+            actions.append("andar")
+        elif first_code not in (WALL, OUT):
+            actions.append(first)
+        else:
+            actions.append(second)
+    return tuple(actions)
+
+
+# <summary>
+# walk[pattern] and explore[pattern] for every pattern, built once on
+# import and shared by every agent
+# </summary>
+walk = tuple(WalkActions(*Split(pattern)) for pattern in range(PATTERNS))
+explore = tuple(ExploreActions(*Split(pattern)) for pattern in range(PATTERNS))
+
+
+def PrintTables():
+    """ Mostra a distribuição de cada padrão (esquerda, frente, direita; "x" é fora do mapa)"""
+
+    chars = CELL_CHARS + "x"
+    print("pattern  walk (of %d)                                 explore (of %d)" % (WALK_DRAWS, EXPLORE_DRAWS))
+    for pattern in range(PATTERNS):
+        forward, left, right = Split(pattern)
+        distributions = []
+        for actions in (walk[pattern], explore[pattern]):
+            counts = {}
+            for action in actions:
+                counts[action] = counts.get(action, 0) + 1
+            distributions.append(" ".join("%s:%d" % item for item in sorted(counts.items())))
+        print(" %s%s%s     %-44s %s" % (chars[left], chars[forward], chars[right], *distributions))
+
+
+if __name__ == "__main__":
+    PrintTables()
@@ -18,8 +18,32 @@ __version__ = "1.0.0"
 __email__ = "abaffa@inf.puc-rio.br"
 #############################################################
 
+import argparse
+import asyncio
 from Bot import Bot
+from Map.Grid import MapSize
 
 if __name__ == "__main__":
-    bot = Bot()
 
+    parser = argparse.ArgumentParser(description="INF1771 bot")
+    parser.add_argument("--host", default=None, help="server address (e.g. a local Server.GameServer)")
+    parser.add_argument("--threads", action="store_true", help="reader thread + scheduler thread instead of asyncio")
+    parser.add_argument("--record", default=None, help="append all traffic to this log (see Replay.py)")
+    parser.add_argument("--event-driven", action="store_true", help="decide as soon as status and observation replies arrive")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the AI random choices")
+    parser.add_argument("--map-size", type=MapSize, default=None, metavar="WxH",
+                        help="map size (default 59x34; grows by itself if the server sends a larger position)")
+    args = parser.parse_args()
+
+    if args.threads:
+        bot = Bot(host=args.host, record=args.record, event_driven=args.event_driven, map_size=args.map_size,
+                  seed=args.seed)
+    else:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        bot = Bot(loop, args.host, record=args.record, event_driven=args.event_driven, map_size=args.map_size,
+                  seed=args.seed)
+        try:
+            loop.run_forever()
+        finally:
+            bot.client.StopRecording()
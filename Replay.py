@@ -0,0 +1,119 @@
+﻿#!/usr/bin/env python
+
+"""Replay.py: INF1771 Replays a recorded game through Bot and GameAI.
+
+Alimenta as linhas recebidas de um log gravado com `Program.py --record`
+em Bot.ReceiveCommand e chama a decisão exatamente onde o bot gravado
+mandou uma ação, sem socket e sem timer, o mais rápido possível.
+
+Uso (a partir da raiz do repositório):
+    python Replay.py jogo.log [--seed N] [--profile]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import time
+from Bot import Bot
+from Socket.HandleClient import HandleClient
+from Socket.TrafficLog import ReadTrafficLog, INBOUND, OUTBOUND
+
+# commands sent by Bot.DoDecision
+ACTIONS = {"w", "s", "a", "d", "t", "e"}
+
+
+# <summary>
+# Offline client: never connects, keeps what the bot sends in memory
+# </summary>
+class ReplayClient(HandleClient):
+
+    sent = None
+
+
+    def __init__(self):
+        self.InitClientState()
+        self.connected = True
+        self.active = True
+        self.sent = []
+
+
+    def connect(self, s):
+        pass
+
+
+    def sendMsg(self, serverResponse):
+        self.sent.append(serverResponse)
+
+
+# <summary>
+# Replay one log
+# </summary>
+# <param name="path">traffic log</param>
+# <param name="seed">seed of the AI random choices, use the same one given to Program.py to reproduce the game</param>
+# <returns>dictionary with the replay counters</returns>
+def Replay(path, seed=None):
+
+    client = ReplayClient()
+    bot = Bot(client=client, start=False, seed=seed)
+
+    lines = ticks = matches = 0
+    receive_time = decision_time = 0.0
+    cpu_start = time.process_time()
+
+    for kind, t, line in ReadTrafficLog(path):
+
+        if kind == INBOUND:
+            start = time.perf_counter()
+            client.processLine(line)
+            receive_time += time.perf_counter() - start
+            lines += 1
+
+        elif kind == OUTBOUND and line in ACTIONS:
+            client.sent.clear()
+            start = time.perf_counter()
+            bot.DoDecision()
+            decision_time += time.perf_counter() - start
+            ticks += 1
+
+            for sent in client.sent:
+                if sent in ACTIONS:
+                    if sent == line:
+                        matches += 1
+                    break
+
+    return {
+        "lines": lines,
+        "ticks": ticks,
+        "matches": matches,
+        "receive_time": receive_time,
+        "decision_time": decision_time,
+        "cpu_time": time.process_time() - cpu_start,
+        "bot": bot,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 traffic log replay")
+    parser.add_argument("log")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and print the top functions")
+    args = parser.parse_args()
+
+    if args.profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        stats = profiler.runcall(Replay, args.log, args.seed)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    else:
+        stats = Replay(args.log, args.seed)
+
+    print("lines received   %10d  %8.2f us/line" % (stats["lines"], stats["receive_time"] * 1e6 / max(1, stats["lines"])))
+    print("decisions        %10d  %8.2f us/tick" % (stats["ticks"], stats["decision_time"] * 1e6 / max(1, stats["ticks"])))
+    print("same action      %10d  %8.1f %%" % (stats["matches"], stats["matches"] * 100.0 / max(1, stats["ticks"])))
+    print("cpu time         %10.3f s" % stats["cpu_time"])
@@ -0,0 +1,260 @@
+﻿#!/usr/bin/env python
+
+"""Scheduler.py: INF1771 Drift-free periodic jobs on a monotonic clock."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import threading
+import time
+from Socket.LatencyStats import LatencyHistogram
+
+# <summary>
+# Overrun policies: what to do when a job is already late for its next deadline
+# </summary>
+CATCH_UP = "catch_up" # run every missed deadline, back to back
+SKIP = "skip"         # drop missed deadlines and realign to the grid
+
+
+# <summary>
+# One periodic job. Deadlines are absolute (start + n * interval), so
+# the period never drifts with the callback duration or wakeup latency.
+# </summary>
+class ScheduledJob():
+
+    name = ""
+    interval = 0.0
+    callback = None
+    policy = SKIP
+    deadline = 0.0
+
+    runs = 0
+    skipped = 0
+    overruns = 0
+    lateness = None
+
+
+    def __init__(self, name, interval, callback, policy, deadline):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.policy = policy
+        self.deadline = deadline
+        self.runs = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.lateness = LatencyHistogram()
+
+
+    def __lt__(self, other):
+        return self.deadline < other.deadline
+
+
+    # <summary>
+    # Run the job and move its deadline forward
+    # </summary>
+    # <param name="now">clock value when the job was started</param>
+    # <param name="clock">clock function, read again after the callback</param>
+    def Run(self, now, clock):
+
+        deadline = self.deadline
+        self.lateness.record(now - deadline)
+        self.runs += 1
+        self.callback()
+
+        # woken (Scheduler.wake) while running: keep the new deadline
+        if self.deadline != deadline:
+            return
+
+        self.deadline += self.interval
+        end = clock()
+        if end > self.deadline:
+            self.overruns += 1
+            if self.policy == SKIP:
+                missed = int((end - self.deadline) / self.interval) + 1
+                self.skipped += missed
+                self.deadline += missed * self.interval
+
+
+    def GetStats(self):
+        stats = self.lateness.summary()
+        stats["runs"] = self.runs
+        stats["skipped"] = self.skipped
+        stats["overruns"] = self.overruns
+        stats["interval"] = self.interval
+        return stats
+
+
+# <summary>
+# Runs periodic jobs either on an asyncio loop (loop.call_at, the loop
+# clock is monotonic) or on a single scheduler thread that sleeps until
+# the earliest deadline. Jobs never run concurrently with each other.
+# </summary>
+class Scheduler():
+
+    loop = None
+    clock = None
+    jobs = None
+    running = False
+
+    thread = None
+    condition = None
+    handles = None
+
+
+    # <summary>
+    # Scheduler Constructor
+    # </summary>
+    # <param name="loop">asyncio event loop, None to use a scheduler thread</param>
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.clock = loop.time if loop is not None else time.monotonic
+        self.jobs = {}
+        self.handles = {}
+        self.condition = threading.Condition()
+        self.running = False
+
+
+    # <summary>
+    # Add a periodic job
+    # </summary>
+    # <param name="name">job name, used by wake and in the stats</param>
+    # <param name="interval">period in seconds</param>
+    # <param name="callback">function without arguments</param>
+    # <param name="policy">CATCH_UP or SKIP</param>
+    # <param name="delay">seconds until the first run, defaults to one interval</param>
+    def add_job(self, name, interval, callback, policy=SKIP, delay=None):
+
+        first = self.clock() + (interval if delay is None else delay)
+        job = ScheduledJob(name, interval, callback, policy, first)
+
+        with self.condition:
+            self.jobs[name] = job
+            self.condition.notify()
+
+        if self.loop is not None and self.running:
+            self.__arm(job)
+        return job
+
+
+    # <summary>
+    # Bring a job's next run forward. Later deadlines keep counting from
+    # the new one.
+    # </summary>
+    # <param name="name">job name</param>
+    # <param name="when">clock time, clamped to now</param>
+    def wake(self, name, when=None):
+
+        job = self.jobs.get(name)
+        if job is None:
+            return
+
+        now = self.clock()
+        when = now if when is None or when < now else when
+
+        with self.condition:
+            if when >= job.deadline:
+                return
+            job.deadline = when
+            self.condition.notify()
+
+        if self.loop is not None and self.running:
+            self.__arm(job)
+
+
+    def now(self):
+        return self.clock()
+
+
+    def start(self):
+
+        self.running = True
+
+        if self.loop is not None:
+            for job in self.jobs.values():
+                self.__arm(job)
+        else:
+            self.thread = threading.Thread(target=self.__thread_loop, name="Scheduler")
+            self.thread.start()
+
+
+    def stop(self):
+
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+        for handle in self.handles.values():
+            handle.cancel()
+        self.handles.clear()
+
+
+    def GetStats(self):
+        """ Dicionário nome do job => execuções, saltos, atrasos (us) e percentis"""
+        return {name: job.GetStats() for name, job in self.jobs.items()}
+
+
+    ###########################################################################
+    #
+    # asyncio
+    #
+    ###########################################################################
+
+    def __arm(self, job):
+
+        handle = self.handles.get(job.name)
+        if handle is not None:
+            handle.cancel()
+        self.handles[job.name] = self.loop.call_at(job.deadline, self.__run_on_loop, job)
+
+
+    def __run_on_loop(self, job):
+
+        self.handles.pop(job.name, None)
+        if not self.running:
+            return
+
+        try:
+            job.Run(self.clock(), self.clock)
+        except Exception as ex:
+            print(ex)
+            job.deadline = max(job.deadline + job.interval, self.clock())
+
+        if self.running and job.name not in self.handles:
+            self.__arm(job)
+
+
+    ###########################################################################
+    #
+    # thread
+    #
+    ###########################################################################
+
+    def __thread_loop(self):
+
+        while True:
+
+            with self.condition:
+
+                if not self.running:
+                    return
+
+                queue = list(self.jobs.values())
+                if not queue:
+                    self.condition.wait()
+                    continue
+
+                job = min(queue)
+                delay = job.deadline - self.clock()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+
+            try:
+                job.Run(self.clock(), self.clock)
+            except Exception as ex:
+                print(ex)
+                job.deadline = max(job.deadline + job.interval, self.clock())
@@ -0,0 +1,518 @@
+﻿#!/usr/bin/env python
+
+"""GameServer.py: INF1771 Local headless game server for benchmarks and load tests.
+
+Fala o mesmo protocolo texto que o HandleClient usa com o servidor oficial,
+então o Bot pode ser apontado para localhost sem nenhuma mudança.
+
+Uso (a partir da raiz do repositório):
+    python -m Server.GameServer [--port 8888] [--tick 0.1] [--seed 1771] ...
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import asyncio
+import random
+from Socket.LineBuffer import LineBuffer
+
+# cell types
+FREE = 0
+WALL = 1
+PIT = 2
+TELEPORT = 3
+GOLD = 4
+POWERUP = 5
+
+DIRECTIONS = ["north", "east", "south", "west"]
+DELTAS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+# dto.PlayerInfo.State values
+STATE_READY = 1
+STATE_GAME = 2
+STATE_DEAD = 3
+
+
+# <summary>
+# Arena: terrain, item spawn points and their respawn timers
+# </summary>
+class GameMap():
+
+    width = 59
+    height = 34
+
+    cells = None
+
+    # <summary>
+    # (x, y) => game time when the item is back, 0 if it is there now
+    # </summary>
+    respawn = None
+
+
+    def __init__(self, width=59, height=34):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.respawn = {}
+
+
+    def Generate(self, rnd, walls=0.15, pits=0.02, teleports=0.01, golds=10, powerups=6):
+        """ Espalha paredes, buracos, teletransportes, ouros e powerups aleatoriamente"""
+
+        area = self.width * self.height
+        for kind, count in ((WALL, int(area * walls)), (PIT, int(area * pits)),
+                            (TELEPORT, int(area * teleports)), (GOLD, golds), (POWERUP, powerups)):
+            placed = 0
+            while placed < count:
+                x = rnd.randrange(self.width)
+                y = rnd.randrange(self.height)
+                if self.Get(x, y) == FREE:
+                    self.Set(x, y, kind)
+                    if kind == GOLD or kind == POWERUP:
+                        self.respawn[x, y] = 0
+                    placed += 1
+
+
+    def InBounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+
+    def Get(self, x, y):
+        return self.cells[x * self.height + y]
+
+
+    def Set(self, x, y, kind):
+        self.cells[x * self.height + y] = kind
+
+
+    def IsItemAvailable(self, x, y, now):
+        return (x, y) in self.respawn and self.respawn[x, y] <= now
+
+
+    def RandomFreeCell(self, rnd):
+        while True:
+            x = rnd.randrange(self.width)
+            y = rnd.randrange(self.height)
+            if self.Get(x, y) == FREE:
+                return x, y
+
+
+# <summary>
+# One connected bot
+# </summary>
+class Player():
+
+    def __init__(self, node, connection):
+        self.node = node
+        self.connection = connection
+        self.name = ""
+        self.color = (0, 0, 0)
+        self.x = 0
+        self.y = 0
+        self.dir = 0
+        self.energy = 100
+        self.score = 0
+        self.state = STATE_GAME
+        self.blocked = False
+        self.actions_left = 1
+        self.respawn_at = 0.0
+
+
+    def ColorString(self):
+        return "Color [A=255, R=%d, G=%d, B=%d]" % self.color
+
+
+# <summary>
+# Game rules. Replies are returned as lists of lines, messages for
+# other players go through their connection's Send.
+# </summary>
+class GameServer():
+
+    def __init__(self, width=59, height=34, seed=1771, tick=0.1, spawn_seconds=15.0,
+                 respawn_seconds=5.0, actions_per_tick=1, game_seconds=0.0, reply_delay=0.0):
+
+        self.rnd = random.Random(seed)
+        self.map = GameMap(width, height)
+        self.map.Generate(self.rnd)
+
+        self.tick = tick
+        self.spawn_seconds = spawn_seconds
+        self.respawn_seconds = respawn_seconds
+        self.actions_per_tick = actions_per_tick
+        self.game_seconds = game_seconds
+        self.reply_delay = reply_delay
+
+        self.players = {}
+        self.next_node = 1
+        self.time = 0.0
+        self.ticks = 0
+
+        self.commands = 0
+        self.actions = 0
+
+
+    def GameStatus(self):
+        if self.game_seconds > 0 and self.time >= self.game_seconds:
+            return "GameOver"
+        return "Game"
+
+
+    ###########################################################################
+    #
+    # Connections
+    #
+    ###########################################################################
+
+    def Join(self, connection):
+        player = Player(self.next_node, connection)
+        self.next_node += 1
+        player.x, player.y = self.map.RandomFreeCell(self.rnd)
+        player.dir = self.rnd.randrange(4)
+        self.players[player.node] = player
+        return player
+
+
+    def Leave(self, player):
+        self.players.pop(player.node, None)
+        if player.name:
+            self.Broadcast("goodbye;" + player.name)
+
+
+    def Broadcast(self, line, exclude=None):
+        for other in list(self.players.values()):
+            if other is not exclude:
+                other.connection.Send(line)
+
+
+    ###########################################################################
+    #
+    # Game tick
+    #
+    ###########################################################################
+
+    def Tick(self):
+        """ Avança o relógio do jogo, renova o orçamento de ações e revive mortos"""
+
+        self.ticks += 1
+        self.time += self.tick
+
+        for player in self.players.values():
+            player.actions_left = self.actions_per_tick
+            if player.state == STATE_DEAD and self.time >= player.respawn_at:
+                player.x, player.y = self.map.RandomFreeCell(self.rnd)
+                player.energy = 100
+                player.state = STATE_GAME
+
+
+    ###########################################################################
+    #
+    # Commands
+    #
+    ###########################################################################
+
+    def Handle(self, player, line):
+        """ Executa um comando e devolve a lista de linhas de resposta"""
+
+        self.commands += 1
+        fields = line.split(";")
+        cmd = fields[0]
+
+        if cmd in ("w", "s", "a", "d", "t", "e"):
+            if player.state == STATE_GAME and player.actions_left > 0 and self.GameStatus() == "Game":
+                player.actions_left -= 1
+                self.actions += 1
+                return self.Action(player, cmd)
+            return []
+
+        if cmd == "o":
+            return ["o;" + ",".join(self.Observations(player))]
+        if cmd == "q":
+            return ["s;%d;%d;%s;%s;%d;%d" % (player.x, player.y, DIRECTIONS[player.dir],
+                    "game" if player.state == STATE_GAME else "dead", player.score, player.energy)]
+        if cmd == "g":
+            return ["g;%s;%d" % (self.GameStatus(), int(self.time))]
+        if cmd == "u":
+            return ["u;" + ";".join("%s#connected#%d#%d#%s" % (p.name, p.score, p.energy, p.ColorString())
+                                    for p in self.players.values() if p.name)]
+        if cmd == "p":
+            return ["player;%d;%s;%d;%d;%d;%d;%s" % (p.node, p.name, p.x, p.y, p.dir + 1, p.state, p.ColorString())
+                    for p in self.players.values() if p is not player and p.name]
+        if cmd == "name" and len(fields) > 1:
+            if player.name:
+                self.Broadcast("changename;%s;%s" % (player.name, fields[1]))
+            else:
+                self.Broadcast("hello;" + fields[1], exclude=player)
+            player.name = fields[1]
+            return []
+        if cmd == "say" and len(fields) > 1:
+            self.Broadcast("notification;%s: %s" % (player.name, fields[1]))
+            return []
+        if cmd == "color" and len(fields) > 3:
+            player.color = (int(fields[1]), int(fields[2]), int(fields[3]))
+            return []
+        if cmd == "quit":
+            player.connection.Close()
+            return []
+
+        return []
+
+
+    def Action(self, player, cmd):
+
+        player.blocked = False
+
+        if cmd == "a":
+            player.dir = (player.dir + 3) % 4
+        elif cmd == "d":
+            player.dir = (player.dir + 1) % 4
+        elif cmd == "w":
+            self.Move(player, DELTAS[player.dir])
+        elif cmd == "s":
+            dx, dy = DELTAS[player.dir]
+            self.Move(player, (-dx, -dy))
+        elif cmd == "t":
+            self.GetItem(player)
+        elif cmd == "e":
+            return self.Shoot(player)
+        return []
+
+
+    def Move(self, player, delta):
+
+        x = player.x + delta[0]
+        y = player.y + delta[1]
+
+        if not self.map.InBounds(x, y) or self.map.Get(x, y) == WALL:
+            player.blocked = True
+            return
+
+        kind = self.map.Get(x, y)
+        if kind == PIT:
+            player.x, player.y = x, y
+            self.Kill(player)
+        elif kind == TELEPORT:
+            player.x, player.y = self.map.RandomFreeCell(self.rnd)
+        else:
+            player.x, player.y = x, y
+
+
+    def GetItem(self, player):
+
+        kind = self.map.Get(player.x, player.y)
+        if not self.map.IsItemAvailable(player.x, player.y, self.time):
+            return
+
+        if kind == GOLD:
+            player.score += 1000
+        elif kind == POWERUP:
+            if player.energy >= 100:
+                return
+            player.energy = min(100, player.energy + 50)
+        self.map.respawn[player.x, player.y] = self.time + self.spawn_seconds
+
+
+    def Shoot(self, player):
+
+        target = self.EnemyInFront(player)
+        player.score -= 1
+        if target is None:
+            return []
+
+        target.energy -= 10
+        player.score += 10
+        target.connection.Send("d;" + player.name)
+        if target.energy <= 0:
+            self.Kill(target)
+            player.score += 500
+        return ["h;" + target.name]
+
+
+    def Kill(self, player):
+        player.energy = 0
+        player.state = STATE_DEAD
+        player.score -= 500
+        player.respawn_at = self.time + self.respawn_seconds
+
+
+    def EnemyInFront(self, player, reach=10):
+        """ Primeiro jogador vivo em linha reta à frente, até reach casas, sem atravessar paredes"""
+
+        occupied = {}
+        for other in self.players.values():
+            if other is not player and other.state == STATE_GAME:
+                occupied[other.x, other.y] = other
+
+        dx, dy = DELTAS[player.dir]
+        x, y = player.x, player.y
+        for _ in range(reach):
+            x += dx
+            y += dy
+            if not self.map.InBounds(x, y) or self.map.Get(x, y) == WALL:
+                return None
+            if (x, y) in occupied:
+                return occupied[x, y]
+        return None
+
+
+    def Observations(self, player):
+
+        obs = []
+        if player.blocked:
+            obs.append("blocked")
+
+        for other in self.players.values():
+            if other is not player and other.state == STATE_GAME and \
+               abs(other.x - player.x) + abs(other.y - player.y) <= 2:
+                obs.append("steps")
+                break
+
+        breeze = flash = False
+        for dx, dy in DELTAS:
+            x = player.x + dx
+            y = player.y + dy
+            if self.map.InBounds(x, y):
+                kind = self.map.Get(x, y)
+                breeze = breeze or kind == PIT
+                flash = flash or kind == TELEPORT
+        if breeze:
+            obs.append("breeze")
+        if flash:
+            obs.append("flash")
+
+        if self.map.IsItemAvailable(player.x, player.y, self.time):
+            kind = self.map.Get(player.x, player.y)
+            obs.append("blueLight" if kind == GOLD else "redLight")
+
+        enemy = self.EnemyInFront(player)
+        if enemy is not None:
+            obs.append("enemy#%d" % (abs(enemy.x - player.x) + abs(enemy.y - player.y)))
+
+        return obs
+
+
+# <summary>
+# asyncio protocol for one bot connection.
+# Everything sent to a connection during one pass of the event loop
+# (replies, broadcasts) is written with a single transport.write.
+# </summary>
+class Connection(asyncio.Protocol):
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.player = None
+        self.lines = LineBuffer()
+        self.outbox = []
+
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.player = self.server.Join(self)
+
+
+    def data_received(self, data):
+
+        self.lines.feed(data)
+        for line in self.lines.pop_lines():
+            line = line.strip("\r")
+            if line:
+                for reply in self.server.Handle(self.player, line):
+                    self.Send(reply)
+
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self.outbox = []
+        self.server.Leave(self.player)
+
+
+    def IsOpen(self):
+        return self.transport is not None and not self.transport.is_closing()
+
+
+    def Send(self, line):
+        if not self.outbox:
+            if self.server.reply_delay > 0:
+                asyncio.get_running_loop().call_later(self.server.reply_delay, self.Flush)
+            else:
+                asyncio.get_running_loop().call_soon(self.Flush)
+        self.outbox.append(line)
+
+
+    def Flush(self):
+        if self.outbox and self.IsOpen():
+            self.outbox.append("")
+            self.transport.write("\n".join(self.outbox).encode("utf-8"))
+        self.outbox = []
+
+
+    def Close(self):
+        if self.IsOpen():
+            self.Flush()
+            self.transport.close()
+
+
+async def TickLoop(server, stats_interval):
+    """ Roda os ticks do jogo com prazos absolutos e imprime estatísticas"""
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    last_stats = deadline
+    last_commands = last_actions = 0
+
+    while True:
+        deadline += server.tick
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        server.Tick()
+
+        now = loop.time()
+        if stats_interval > 0 and now - last_stats >= stats_interval:
+            elapsed = now - last_stats
+            print("time %6.1f  players %4d  commands/s %8.0f  actions/s %7.0f  tick lag %6.1f ms" % (
+                server.time, len(server.players),
+                (server.commands - last_commands) / elapsed,
+                (server.actions - last_actions) / elapsed,
+                max(0.0, now - deadline) * 1000))
+            last_commands, last_actions = server.commands, server.actions
+            last_stats = now
+
+
+async def Serve(args):
+
+    server = GameServer(args.width, args.height, args.seed, args.tick, args.spawn_seconds,
+                        args.respawn_seconds, args.actions_per_tick, args.game_seconds, args.reply_delay)
+    loop = asyncio.get_running_loop()
+    listener = await loop.create_server(lambda: Connection(server), args.host, args.port,
+                                        backlog=1024, reuse_address=True)
+    print("listening on %s:%d (%dx%d, tick %.3f s)" % (args.host, args.port, args.width, args.height, args.tick))
+    async with listener:
+        await TickLoop(server, args.stats)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 local game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--width", type=int, default=59)
+    parser.add_argument("--height", type=int, default=34)
+    parser.add_argument("--seed", type=int, default=1771)
+    parser.add_argument("--tick", type=float, default=0.1, help="game tick in seconds")
+    parser.add_argument("--actions-per-tick", type=int, default=1)
+    parser.add_argument("--spawn-seconds", type=float, default=15.0, help="gold/power-up respawn time")
+    parser.add_argument("--respawn-seconds", type=float, default=5.0, help="player respawn time")
+    parser.add_argument("--game-seconds", type=float, default=0.0, help="game length, 0 = endless")
+    parser.add_argument("--reply-delay", type=float, default=0.0, help="extra seconds before replies are sent (simulated lag)")
+    parser.add_argument("--stats", type=float, default=5.0, help="seconds between stats lines, 0 = off")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(Serve(args))
+    except KeyboardInterrupt:
+        pass
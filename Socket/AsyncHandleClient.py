@@ -0,0 +1,117 @@
+﻿#!/usr/bin/env python
+
+"""AsyncHandleClient.py: INF1771 Controls Socket Connection to Server using asyncio."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import asyncio
+import socket
+from Socket.HandleClient import HandleClient
+from Socket.LineBuffer import LineBuffer
+
+# <summary>
+# TCP Client Class driven by an asyncio event loop.
+# Same send* API and handler hooks as HandleClient, but the socket is
+# read by the loop (no doLoop thread) and every handler runs on the
+# loop thread.
+# </summary>
+class AsyncHandleClient(HandleClient, asyncio.Protocol):
+
+    loop = None
+
+    transport = None
+
+    lines = None
+
+
+    # <summary>
+    # Client Constructor
+    # </summary>
+    # <param name="loop">event loop that owns the connection</param>
+    def __init__(self, loop=None):
+        self.InitClientState()
+        self.loop = loop if loop is not None else asyncio.new_event_loop()
+
+
+    # <summary>
+    # Connects socket to a url or ip address.
+    # Blocks until connected if the loop is not running yet.
+    # </summary>
+    # <param name="s">url or ip address</param>
+    def connect(self, s):
+
+        if not self.connected:
+
+            coro = self.loop.create_connection(lambda: self, s, 8888)
+
+            if self.loop.is_running():
+                self.loop.create_task(coro)
+            else:
+                self.loop.run_until_complete(coro)
+
+
+    # <summary>
+    # Disconnects socket
+    # </summary>
+    def disconnect(self):
+
+        if self.connected:
+            self.transport.close()
+
+        self.StopRecording()
+
+        self.KeepAlive()
+        self.active = False
+        self.connected = False
+
+
+    # <summary>
+    # Write already encoded commands to the transport
+    # </summary>
+    # <param name="data">bytes to send</param>
+    def writeBytes(self, data):
+        self.transport.write(data)
+
+
+    ###########################################################################
+    #
+    # asyncio.Protocol callbacks
+    #
+    ###########################################################################
+
+    def connection_made(self, transport):
+
+        self.transport = transport
+        self.lines = LineBuffer()
+
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self.connected = True
+        self.active = True
+        self.processSocketStatusEvent()
+
+
+    def data_received(self, data):
+
+        try:
+            self.lines.feed(data)
+            self.ProcessLines(self.lines)
+
+        except Exception as ex:
+            print(ex)
+            self.KeepAlive()
+
+
+    def connection_lost(self, exc):
+
+        if exc is not None:
+            print(exc)
+
+        self.connected = False
+        self.KeepAlive()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+"""Codec.py: INF1771 Typed decoding of the server messages."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from Observations import Encode
+
+# <summary>
+# Decoded messages. Every decoder takes the ';' split line (cmd) and
+# returns one of these, or None when the line has the wrong number of
+# fields. Malformed numbers raise ValueError.
+# Plain __slots__ classes: cheaper to build than namedtuples.
+# "o", "s" and "g" have no record: they are nearly all the traffic, and
+# Bot reads their fields straight into the GameAI calls (ObservationMask
+# for "o").
+# </summary>
+class Player():  # player
+    __slots__ = ("node", "name", "x", "y", "dir", "state", "color")
+    def __init__(self, node, name, x, y, dir, state, color):
+        self.node = node
+        self.name = name
+        self.x = x
+        self.y = y
+        self.dir = dir
+        self.state = state
+        self.color = color
+
+class ScoreEntry():
+    __slots__ = ("name", "connected", "score", "energy", "color")
+    def __init__(self, name, connected, score, energy, color):
+        self.name = name
+        self.connected = connected
+        self.score = score
+        self.energy = energy
+        self.color = color
+
+class Scoreboard():  # u
+    __slots__ = ("entries",)
+    def __init__(self, entries):
+        self.entries = entries
+
+class Text():  # notification
+    __slots__ = ("text",)
+    def __init__(self, text):
+        self.text = text
+
+class PlayerName():  # hello, goodbye, h, d
+    __slots__ = ("name",)
+    def __init__(self, name):
+        self.name = name
+
+class NameChange():  # changename
+    __slots__ = ("old", "new")
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+NO_COLOR = (0, 0, 0)
+
+
+# <summary>
+# Colors already seen, the server repeats the same handful of strings.
+# Cleared when full so a misbehaving server cannot grow it forever.
+# </summary>
+color_cache = {}
+color_cache_size = 1024
+
+
+# <summary>
+# Observation mask of each observation field already seen (the server
+# sends the same few combinations over and over), cleared when full
+# </summary>
+observation_cache = {}
+observation_cache_size = 1024
+
+
+# <summary>
+# Parse a .NET color string, e.g. "Color [A=255, R=255, G=128, B=0]"
+# </summary>
+# <param name="c">color string</param>
+# <returns>(R, G, B)</returns>
+def ParseColor(c):
+
+    color = color_cache.get(c)
+    if color is not None:
+        return color
+
+    p = c.split('=')
+    # ["Color [A", "255, R", "255, G", "128, B", "0]"]: each value is
+    # at the start of the part after its name
+    color = (int(p[2].split(',', 1)[0]),
+             int(p[3].split(',', 1)[0]),
+             int(p[4].rstrip().rstrip(']')))
+
+    if len(color_cache) >= color_cache_size:
+        color_cache.clear()
+    color_cache[c] = color
+    return color
+
+
+def DecodePlayer(cmd):
+    if len(cmd) != 8:
+        return None
+    return Player(int(cmd[1]), cmd[2], int(cmd[3]), int(cmd[4]), int(cmd[5]), int(cmd[6]), ParseColor(cmd[7]))
+
+
+def DecodeScoreboard(cmd):
+
+    if len(cmd) < 2:
+        return None
+
+    entries = []
+    for i in range(1, len(cmd)):
+        a = cmd[i].split('#')
+        if len(a) == 4:
+            entries.append(ScoreEntry(a[0], a[1] == "connected", int(a[2]), int(a[3]), NO_COLOR))
+        elif len(a) == 5:
+            entries.append(ScoreEntry(a[0], a[1] == "connected", int(a[2]), int(a[3]), ParseColor(a[4])))
+    return Scoreboard(entries)
+
+
+def DecodeText(cmd):
+    if len(cmd) < 2:
+        return None
+    return Text(cmd[1])
+
+
+def DecodePlayerName(cmd):
+    if len(cmd) < 2:
+        return None
+    return PlayerName(cmd[1])
+
+
+def DecodeNameChange(cmd):
+    if len(cmd) < 3:
+        return None
+    return NameChange(cmd[1], cmd[2])
+
+
+# <summary>
+# Message type (cmd[0]) => decoder
+# </summary>
+DECODERS = {
+    "player": DecodePlayer,
+    "u": DecodeScoreboard,
+    "notification": DecodeText,
+    "hello": DecodePlayerName,
+    "goodbye": DecodePlayerName,
+    "changename": DecodeNameChange,
+    "h": DecodePlayerName,
+    "d": DecodePlayerName,
+}
+
+
+# <summary>
+# Observation field (e.g. "breeze,flash") => Observations mask
+# </summary>
+# <param name="text">second field of an "o" line</param>
+# <returns>mask, 0 when nothing was observed</returns>
+def ObservationMask(text):
+
+    mask = observation_cache.get(text)
+    if mask is not None:
+        return mask
+
+    mask = Encode(text.split(',')) if text.strip() != "" else 0
+    if len(observation_cache) >= observation_cache_size:
+        observation_cache.clear()
+    observation_cache[text] = mask
+    return mask
+
+
+# <summary>
+# receive(cmd) for a handler of records: decodes the line and calls
+# handler with the record, or does nothing on a wrong field count.
+# Malformed numbers raise ValueError before the handler runs.
+# </summary>
+# <param name="decoder">one of DECODERS</param>
+# <param name="handler">function of one record</param>
+def RecordReceiver(decoder, handler):
+
+    def Receive(cmd):
+        message = decoder(cmd)
+        if message is not None:
+            handler(message)
+    return Receive
+
+
+# <summary>
+# Decode one message
+# </summary>
+# <param name="cmd">line split on ';'</param>
+# <returns>typed record, or None for "o", "s", "g", unknown types and wrong field counts</returns>
+def Decode(cmd):
+    decoder = DECODERS.get(cmd[0])
+    if decoder is None:
+        return None
+    return decoder(cmd)
@@ -23,6 +23,9 @@ import sys
 #from multiprocessing import Process
 import threading
 import time
+from Socket.LineBuffer import LineBuffer
+from Socket.LatencyStats import RequestTracker
+from Socket.TrafficLog import TrafficRecorder, INBOUND, OUTBOUND
 
 # <summary>
 # TCP Client Class
@@ -34,13 +37,13 @@ class HandleClient():
     # Command Event Handler
     # </summary>
     #public static event EventHandler CommandEvent;
-    __cmd_event_handlers = []
+    __cmd_event_handlers = None
 
     # <summary>
     # Status Change Event Handler
     # </summary>
     #public static event EventHandler ChangeStatusEvent;
-    __chg_event_handlers = []
+    __chg_event_handlers = None
 
     # <summary>
     # Is Client Connected?
@@ -56,15 +59,62 @@ class HandleClient():
 
     cThread = None
 
+    # <summary>
+    # Outbound batch. While batching, sendMsg only queues the encoded
+    # command and flushBatch writes all of them with a single call.
+    # The tick thread batches, but the reader thread can send too (command
+    # and status change handlers), so batching, batch and batch_requests
+    # only change under batch_lock: a command is either in the batch that
+    # flushBatch takes or written after it, never lost in between, and the
+    # requests of a batch are timed when that batch is written. Reentrant,
+    # since a failed write runs the status change handlers, which may send.
+    # </summary>
+    batching = False
+    batch = None
+    batch_requests = None
+    batch_lock = None
+
+    # <summary>
+    # Batch counters
+    # </summary>
+    flush_count = 0
+    flushed_commands = 0
+    flushed_bytes = 0
+    syscalls_saved = 0
+
+    # <summary>
+    # Round trip latency of requests, per command
+    # </summary>
+    latency = None
+
+    # <summary>
+    # Traffic recorder, None when not recording
+    # </summary>
+    recorder = None
+
 
     def __init__(self): 
+        self.InitClientState()
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # <summary>
+    # Per-client state (handlers, batch, latency). Subclasses that do not
+    # create a socket call this instead of HandleClient.__init__
+    # </summary>
+    def InitClientState(self):
+        self.__cmd_event_handlers = []
+        self.__chg_event_handlers = []
+        self.batch = []
+        self.batch_requests = []
+        self.batch_lock = threading.RLock()
+        self.latency = RequestTracker()
 
     def append_cmd_handler(self, cmd_handler):
-        HandleClient.__cmd_event_handlers.append(cmd_handler)
+        self.__cmd_event_handlers.append(cmd_handler)
 
     def append_chg_handler(self, chg_handler):
-        HandleClient.__chg_event_handlers.append(chg_handler)
+        self.__chg_event_handlers.append(chg_handler)
 
 
     # <summary>
@@ -94,6 +144,8 @@ class HandleClient():
     
         if self.connected:
             self.client_socket.close()
+
+        self.StopRecording()
         
         self.KeepAlive()
         self.active = False
@@ -216,12 +268,109 @@ class HandleClient():
             if self.connected:
                 send_cmd = serverResponse + "\n"
                 send_cmd = send_cmd.encode("utf-8")
-                self.client_socket.send(send_cmd)
+
+                with self.batch_lock:
+                    if self.recorder is not None:
+                        self.recorder.write(OUTBOUND, serverResponse)
+
+                    if self.batching:
+                        self.batch.append(send_cmd)
+                        if self.latency.IsTracked(serverResponse):
+                            self.batch_requests.append(serverResponse)
+                    else:
+                        self.writeBytes(send_cmd)
+                        self.latency.on_sent(serverResponse, self.latency.now())
 
         except Exception as ex:
             print(ex)
             self.KeepAlive()
 
+    # <summary>
+    # Write already encoded commands to the socket
+    # </summary>
+    # <param name="data">bytes to send</param>
+    def writeBytes(self, data):
+        self.client_socket.sendall(data)
+
+    # <summary>
+    # Start queueing commands instead of sending them one by one
+    # </summary>
+    def beginBatch(self):
+        with self.batch_lock:
+            self.batching = True
+
+    # <summary>
+    # Send every queued command with one write and stop batching
+    # </summary>
+    def flushBatch(self):
+
+        with self.batch_lock:
+
+            self.batching = False
+            batch = self.batch
+            if len(batch) == 0:
+                return
+
+            requests = self.batch_requests
+            self.batch = []
+            self.batch_requests = []
+            data = b"".join(batch)
+
+            try:
+
+                if self.connected:
+                    self.writeBytes(data)
+
+                    now = self.latency.now()
+                    for request in requests:
+                        self.latency.on_sent(request, now)
+
+                    self.flush_count += 1
+                    self.flushed_commands += len(batch)
+                    self.flushed_bytes += len(data)
+                    self.syscalls_saved += len(batch) - 1
+
+            except Exception as ex:
+                print(ex)
+                self.KeepAlive()
+
+    # <summary>
+    # Outbound batching counters
+    # </summary>
+    # <returns>dictionary with flushes, commands, bytes, syscalls saved and average bytes per flush</returns>
+    def GetBatchStats(self):
+
+        return {
+            "flushes": self.flush_count,
+            "commands": self.flushed_commands,
+            "bytes": self.flushed_bytes,
+            "syscalls_saved": self.syscalls_saved,
+            "bytes_per_flush": (self.flushed_bytes / self.flush_count) if self.flush_count > 0 else 0,
+        }
+
+    # <summary>
+    # Start appending every received line and sent command to a log
+    # </summary>
+    # <param name="path">log file path</param>
+    def StartRecording(self, path):
+        self.StopRecording()
+        self.recorder = TrafficRecorder(path)
+
+    # <summary>
+    # Stop recording and close the log
+    # </summary>
+    def StopRecording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    # <summary>
+    # Round trip latency per request type
+    # </summary>
+    # <returns>dictionary command => count, mean, min, p50, p90, p99, max (microseconds), outstanding and lost requests</returns>
+    def GetLatencyStats(self):
+        return self.latency.GetStats()
+
     # <summary>
     # Keep socket alive - verify current status
     # </summary>
@@ -242,7 +391,7 @@ class HandleClient():
         #if (handler != null)
         #    EventArgs e = new EventArgs();
         #    handler(this, e);
-        for eventhandler in HandleClient.__chg_event_handlers: 
+        for eventhandler in self.__chg_event_handlers: 
             eventhandler()
 
     
@@ -256,6 +405,7 @@ class HandleClient():
                 if command.find(';') > -1:
 
                     cmd = command.split(';')
+                    self.latency.on_reply(cmd[0])
 
                     #EventHandler handler = CommandEvent;
                     #if (handler != null)
@@ -266,7 +416,7 @@ class HandleClient():
                     # <summary>
                     # Command Event Arguments - helps sending received messages from socket to other classes
                     # </summary>
-                    for eventhandler in HandleClient.__cmd_event_handlers: 
+                    for eventhandler in self.__cmd_event_handlers: 
                         eventhandler(cmd)
 
             except Exception as ex: # (Exception ex)
@@ -274,31 +424,49 @@ class HandleClient():
                 self.KeepAlive()
 
 
+    # <summary>
+    # Filter and dispatch one received line
+    # </summary>
+    # <param name="command">line without the trailing "\n"</param>
+    def processLine(self, command):
+
+        command = command.strip('\0').strip('\r').strip('\n')
+
+        if self.recorder is not None:
+            self.recorder.write(INBOUND, command)
+
+        if command.find(chr(1)) == -1 or command.find(chr(3)) == -1:
+            if len(command) > 0:
+                self.processCommand(command)
+
+
+    # <summary>
+    # Dispatch every complete line held by a LineBuffer
+    # </summary>
+    # <param name="lines">LineBuffer with received data</param>
+    def ProcessLines(self, lines):
+
+        for command in lines.pop_lines():
+            self.processLine(command)
+
+
     def ProcessBuffer(self, data):
         
+        start = 0
         index = data.find('\n')
-        length = len(data)
 
-        while (index > -1 and index < length):
+        while index > -1:
         
-            command = data[:index]
-            data = data[(index+1):]
-            
-            command = command.strip('\0').strip('\r').strip('\n')
-
-            if command.find(chr(1)) == -1 or command.find(chr(3)) == -1:
-                if len(command) > 0:
-                    self.processCommand(command)
-
-            index = data.find('\n')
-
+            self.processLine(data[start:index])
+            start = index + 1
+            index = data.find('\n', start)
 
-        return data
+        return data[start:]
     
     
     def doLoop(self):
 
-        offset = ""
+        lines = LineBuffer()
         self.processSocketStatusEvent()
 
         while (self.active):
@@ -308,9 +476,8 @@ class HandleClient():
             if self.connected:
 
                 try:
-                    recv_str = self.client_socket.recv(receiveBufferSize)
-                    data = offset + recv_str.decode('utf-8')
-                    offset = self.ProcessBuffer(data)
+                    lines.recv_into(self.client_socket, receiveBufferSize)
+                    self.ProcessLines(lines)
 
                 except Exception as ex: # (Exception ex)
                     print(ex)
@@ -0,0 +1,286 @@
+﻿#!/usr/bin/env python
+
+"""LatencyStats.py: INF1771 Request/reply correlation and latency histograms."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+from collections import deque
+import time
+
+# <summary>
+# Log-linear (HDR style) latency histogram.
+# Values are kept in whole microseconds (truncated). Below sub_buckets us
+# each value has a bucket of its own. Above, each power of two
+# [2^k, 2^(k+1)) is split into sub_buckets / 2 linear buckets, and a
+# bucket is reported by its middle, so the error is at most
+# 1/sub_buckets of the value. Add the truncation (under 1 us) to that,
+# which is what bounds small values.
+# There is no top or overflow bucket: counts is a dict with one counter
+# per bucket used (sub_buckets / 2 per power of two at most), so any
+# value gets a bucket of the same precision. Percentiles are also clamped
+# to the recorded min and max.
+# </summary>
+class LatencyHistogram():
+
+    sub_bits = 5
+    sub_buckets = 32
+
+    counts = None
+    total = 0
+    sum_us = 0
+    min_us = 0
+    max_us = 0
+
+
+    # <summary>
+    # LatencyHistogram Constructor
+    # </summary>
+    # <param name="sub_bits">log2 of the number of linear buckets per power of two</param>
+    def __init__(self, sub_bits=5):
+        self.sub_bits = sub_bits
+        self.sub_buckets = 1 << sub_bits
+        self.counts = {}
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+
+    def BucketIndex(self, value):
+        """ Bucket onde value (em microssegundos) cai"""
+
+        shift = value.bit_length() - self.sub_bits
+        if shift <= 0:
+            return value
+        return (shift << self.sub_bits) + (value >> shift)
+
+
+    def BucketValue(self, index):
+        """ Valor representativo (meio do intervalo) do bucket index"""
+
+        shift = index >> self.sub_bits
+        if shift == 0:
+            return index
+        mantissa = index - (shift << self.sub_bits)
+        return (mantissa << shift) + (1 << (shift - 1))
+
+
+    # <summary>
+    # Record one latency sample
+    # </summary>
+    # <param name="seconds">latency in seconds</param>
+    def record(self, seconds):
+
+        value = int(seconds * 1000000)
+        if value < 0:
+            value = 0
+
+        index = self.BucketIndex(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+
+        if self.total == 0 or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+        self.total += 1
+        self.sum_us += value
+
+
+    # <summary>
+    # Latency at a given percentile
+    # </summary>
+    # <param name="p">percentile between 0 and 100</param>
+    # <returns>latency in microseconds</returns>
+    def percentile(self, p):
+
+        if self.total == 0:
+            return 0
+
+        rank = max(1, int(self.total * p / 100.0 + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self.BucketValue(index), self.min_us), self.max_us)
+        return self.max_us
+
+
+    def summary(self):
+        """ Dicionário com contagem, média, mínimo, máximo e percentis em microssegundos"""
+
+        return {
+            "count": self.total,
+            "mean": (self.sum_us / self.total) if self.total > 0 else 0,
+            "min": self.min_us,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max_us,
+        }
+
+
+# <summary>
+# Matches replies with the requests that caused them.
+# The protocol has no request ids, but the server answers each kind of
+# request in order, so one FIFO of send times per reply kind is enough.
+# </summary>
+class RequestTracker():
+
+    # <summary>
+    # Request command => reply command
+    # </summary>
+    REPLY_KIND = {
+        "o": "o",
+        "q": "s",
+        "g": "g",
+        "u": "u",
+    }
+
+    # <summary>
+    # A request still without a reply after this many seconds (a few
+    # decision ticks) counts as lost and leaves the FIFO. Replies only pair
+    # with requests inside this window, so a server-pushed reply with no
+    # request waiting is not sampled, and once a kind goes quiet for that
+    # long (end of a game, reconnect) the FIFO is back in sync. Without
+    # request ids a lost reply cannot be told from a slow one while
+    # requests keep going out every tick: until then each reply pairs with
+    # the request one before it.
+    # </summary>
+    reply_timeout = 1.0
+
+    outstanding = None
+    histograms = None
+    lost = None
+
+
+    def __init__(self):
+        self.outstanding = {}
+        self.histograms = {}
+        self.lost = {}
+        for request, reply in self.REPLY_KIND.items():
+            self.outstanding[reply] = deque()
+            self.histograms[request] = LatencyHistogram()
+            self.lost[request] = 0
+
+
+    def now(self):
+        return time.perf_counter()
+
+
+    def IsTracked(self, command):
+        return command in self.REPLY_KIND
+
+
+    def Expire(self, pending, t):
+        """ Tira de pending os pedidos mais velhos que reply_timeout, contando como perdidos"""
+
+        deadline = t - self.reply_timeout
+        while pending and pending[0][1] < deadline:
+            command, sent = pending.popleft()
+            self.lost[command] += 1
+
+
+    # <summary>
+    # A request left the client
+    # </summary>
+    # <param name="command">raw command ("o", "q", ...)</param>
+    # <param name="t">send time, perf_counter seconds</param>
+    def on_sent(self, command, t):
+
+        reply = self.REPLY_KIND.get(command)
+        if reply is not None:
+            pending = self.outstanding[reply]
+            self.Expire(pending, t)
+            pending.append((command, t))
+
+
+    # <summary>
+    # A reply arrived. It is paired with the oldest request of its kind
+    # sent within reply_timeout; replies with no such request (pushed by
+    # the server, or answering a request already counted as lost) are
+    # ignored.
+    # </summary>
+    # <param name="kind">first field of the reply ("o", "s", ...)</param>
+    # <returns>round trip in seconds, None if no request was waiting</returns>
+    def on_reply(self, kind, t=None):
+
+        pending = self.outstanding.get(kind)
+        if not pending:
+            return None
+
+        if t is None:
+            t = self.now()
+        self.Expire(pending, t)
+        if not pending:
+            return None
+
+        command, sent = pending.popleft()
+        rtt = t - sent
+        self.histograms[command].record(rtt)
+        return rtt
+
+
+    def Pending(self, kind, t=None):
+        """ Quantos pedidos ainda esperam uma resposta kind ("o", "s", ...) dentro de reply_timeout"""
+
+        pending = self.outstanding.get(kind)
+        if not pending:
+            return 0
+        self.Expire(pending, self.now() if t is None else t)
+        return len(pending)
+
+
+    def Forget(self, kind):
+        """ O chamador desistiu das respostas kind que faltam: os pedidos ainda na fila
+        contam como perdidos, e uma resposta atrasada a eles é ignorada"""
+
+        pending = self.outstanding.get(kind)
+        while pending:
+            command, sent = pending.popleft()
+            self.lost[command] += 1
+
+
+    # <summary>
+    # Record a latency that is not a request/reply pair
+    # (e.g. observation received -> action sent)
+    # </summary>
+    def record(self, name, seconds):
+
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+        self.histograms[name].record(seconds)
+
+
+    def GetStats(self):
+        """ Dicionário nome => resumo do histograma, mais pedidos ainda sem resposta e perdidos"""
+
+        stats = {}
+        for name, histogram in self.histograms.items():
+            stats[name] = histogram.summary()
+            reply = self.REPLY_KIND.get(name)
+            if reply is not None:
+                stats[name]["outstanding"] = len(self.outstanding[reply])
+                stats[name]["lost"] = self.lost[name]
+        return stats
+
+
+    def Dump(self):
+        """ Tabela em texto com as latências (ms) de cada tipo de pedido"""
+
+        lines = ["%-10s %8s %8s %8s %8s %8s %8s %8s" % ("latency", "count", "p50", "p90", "p99", "max", "pend", "lost")]
+        for name, s in sorted(self.GetStats().items()):
+            if s["count"] == 0:
+                # requests with no reply yet, or all lost: no percentiles, but the row shows them
+                if not s.get("outstanding") and not s.get("lost"):
+                    continue
+                lines.append("%-10s %8d %8s %8s %8s %8s %8s %8s" % (
+                    name, 0, "", "", "", "", s.get("outstanding", ""), s.get("lost", "")))
+                continue
+            lines.append("%-10s %8d %8.1f %8.1f %8.1f %8.1f %8s %8s" % (
+                name, s["count"], s["p50"] / 1000.0, s["p90"] / 1000.0, s["p99"] / 1000.0,
+                s["max"] / 1000.0, s.get("outstanding", ""), s.get("lost", "")))
+        return "\n".join(lines)
@@ -0,0 +1,124 @@
+﻿#!/usr/bin/env python
+
+"""LineBuffer.py: INF1771 Newline framing over a growable bytearray."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+# <summary>
+# Receive buffer that splits the server stream into lines.
+# Bytes are kept undecoded until a whole line is available, so a
+# multi-byte UTF-8 character split between two recv calls is decoded
+# correctly. The last "\n" is found with bytearray.rfind on the buffer
+# itself (never rescanning an incomplete tail) and the buffer is only
+# compacted when it runs out of room.
+# </summary>
+class LineBuffer():
+
+    # <summary>
+    # Raw bytes. Valid data is buffer[start:end]
+    # </summary>
+    buffer = None
+    start = 0
+    end = 0
+
+    # <summary>
+    # Position where the next search for "\n" starts
+    # </summary>
+    scan = 0
+
+
+    # <summary>
+    # LineBuffer Constructor
+    # </summary>
+    # <param name="size">initial capacity in bytes</param>
+    def __init__(self, size=4096):
+        self.buffer = bytearray(size)
+        self.start = 0
+        self.end = 0
+        self.scan = 0
+
+
+    def __len__(self):
+        return self.end - self.start
+
+
+    # <summary>
+    # Make sure there are at least n free bytes after end.
+    # Moves pending data to the front first and only grows the
+    # buffer if that is not enough.
+    # </summary>
+    # <param name="n">number of bytes needed</param>
+    def reserve(self, n):
+
+        if len(self.buffer) - self.end >= n:
+            return
+
+        if self.start > 0:
+            pending = self.end - self.start
+            self.buffer[:pending] = self.buffer[self.start:self.end]
+            self.scan -= self.start
+            self.start = 0
+            self.end = pending
+
+        free = len(self.buffer) - self.end
+        if free < n:
+            self.buffer.extend(bytes(max(n - free, len(self.buffer))))
+
+
+    # <summary>
+    # Append received bytes
+    # </summary>
+    # <param name="data">bytes-like object</param>
+    def feed(self, data):
+
+        n = len(data)
+        self.reserve(n)
+        self.buffer[self.end:self.end + n] = data
+        self.end += n
+
+
+    # <summary>
+    # Receive straight into the buffer (no intermediate bytes object)
+    # </summary>
+    # <param name="sock">connected socket</param>
+    # <param name="size">maximum number of bytes to read</param>
+    # <returns>number of bytes read, 0 if the connection was closed</returns>
+    def recv_into(self, sock, size=1024):
+
+        self.reserve(size)
+        with memoryview(self.buffer) as view:
+            n = sock.recv_into(view[self.end:self.end + size], size)
+        self.end += n
+        return n
+
+
+    # <summary>
+    # Remove and decode every complete line in the buffer.
+    # All complete lines are decoded with a single call and split on
+    # "\n", the incomplete tail stays in the buffer as bytes.
+    # </summary>
+    # <returns>list of lines without the trailing "\n"</returns>
+    def pop_lines(self):
+
+        end = self.end
+        index = self.buffer.rfind(b"\n", self.scan, end)
+
+        if index < 0:
+            self.scan = end
+            return []
+
+        with memoryview(self.buffer) as view:
+            lines = str(view[self.start:index], "utf-8", "replace").split("\n")
+
+        start = index + 1
+        if start == end:
+            start = end = 0
+
+        self.start = start
+        self.end = end
+        self.scan = end
+        return lines
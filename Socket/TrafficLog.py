@@ -0,0 +1,146 @@
+﻿#!/usr/bin/env python
+
+"""TrafficLog.py: INF1771 Append-only binary log of client/server traffic."""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import struct
+import threading
+import time
+
+# <summary>
+# Record kinds
+# </summary>
+SESSION = 0  # payload is the wall clock time (ISO text) when recording started
+INBOUND = 1  # line received from the server
+OUTBOUND = 2 # command sent to the server
+
+# <summary>
+# Record header: kind, microseconds since the previous record, payload length.
+# A payload length of 0xFFFF means the real length follows as an uint32.
+# </summary>
+RECORD = struct.Struct("<BIH")
+LONG_LENGTH = struct.Struct("<I")
+MAGIC = b"INF1771LOG\x01"
+
+
+# <summary>
+# Writes traffic to an append-only log.
+# Times come from time.monotonic and are stored as deltas, so each
+# record costs 7 bytes plus the UTF-8 line.
+# </summary>
+class TrafficRecorder():
+
+    file = None
+    last_us = 0
+    last_flush_us = 0
+    lock = None
+
+    # <summary>
+    # Buffered records are written to disk at least this often, so
+    # killing the bot loses at most this much traffic
+    # </summary>
+    flush_interval_us = 1000000
+
+
+    # <summary>
+    # Open (or create) a log and start a new session in it
+    # </summary>
+    # <param name="path">log file path</param>
+    def __init__(self, path):
+
+        self.lock = threading.Lock()
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+        self.last_us = time.monotonic_ns() // 1000
+        self.last_flush_us = self.last_us
+        self.__write(SESSION, time.strftime("%Y-%m-%dT%H:%M:%S").encode("utf-8"), self.last_us)
+
+
+    def __write(self, kind, payload, now_us):
+
+        delta = min(now_us - self.last_us, 0xFFFFFFFF)
+        self.last_us = now_us
+
+        length = len(payload)
+        if length < 0xFFFF:
+            self.file.write(RECORD.pack(kind, delta, length))
+        else:
+            self.file.write(RECORD.pack(kind, delta, 0xFFFF))
+            self.file.write(LONG_LENGTH.pack(length))
+        self.file.write(payload)
+
+
+    # <summary>
+    # Append one line
+    # </summary>
+    # <param name="kind">INBOUND or OUTBOUND</param>
+    # <param name="line">line without "\n"</param>
+    def write(self, kind, line):
+
+        payload = line.encode("utf-8")
+        with self.lock:
+            if self.file is not None:
+                now_us = time.monotonic_ns() // 1000
+                self.__write(kind, payload, now_us)
+                if now_us - self.last_flush_us >= self.flush_interval_us:
+                    self.file.flush()
+                    self.last_flush_us = now_us
+
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+# <summary>
+# Read a traffic log
+# </summary>
+# <param name="path">log file path</param>
+# <returns>generator of (kind, seconds since the session started, line)</returns>
+def ReadTrafficLog(path):
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError(path + " is not an INF1771 traffic log")
+
+    offset = len(MAGIC)
+    size = len(data)
+    elapsed_us = 0
+
+    while offset + RECORD.size <= size:
+
+        kind, delta, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if length == 0xFFFF:
+            length, = LONG_LENGTH.unpack_from(data, offset)
+            offset += LONG_LENGTH.size
+
+        if offset + length > size:
+            break # truncated tail (recorder was killed)
+
+        line = data[offset:offset + length].decode("utf-8", "replace")
+        offset += length
+
+        if kind == SESSION:
+            elapsed_us = 0
+        else:
+            elapsed_us += delta
+
+        yield kind, elapsed_us / 1000000.0, line
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+"""bench_codec.py: INF1771 Benchmark of Bot.ReceiveCommand decoding and dispatch.
+
+Compara a cadeia if/elif antiga com o Socket.Codec + dicionário de handlers,
+sobre um log gravado com `Program.py --record` ou sobre tráfego sintético.
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_codec [jogo.log] [--repeat N]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import time
+from Bot import Bot
+from Replay import ReplayClient
+from Socket import Codec
+from Socket.TrafficLog import ReadTrafficLog, INBOUND
+from bench.bench_framing import GenerateTraffic
+from dto.PlayerInfo import PlayerInfo
+from dto.ScoreBoard import ScoreBoard
+
+
+def LegacyConvertFromString(c):
+
+    c = c.replace('[','')
+    c = c.replace(']','')
+    p = c.split(',')
+
+    R = int(p[1][((p[1].find('=')) + 1):])
+    G = int(p[2][((p[2].find('=')) + 1):])
+    B = int(p[3][((p[3].find('=')) + 1):])
+
+    return (R, G, B)
+
+
+def LegacyReceiveCommand(bot, cmd):
+    """ Bot.ReceiveCommand antes do Codec (sem o playerList.append, que
+    levantava exceção para todo jogador novo)"""
+
+    if len(cmd) > 0:
+        try:
+            if cmd[0] == "o":
+                bot.observation_time = bot.client.latency.now()
+                if len(cmd) > 1:
+                    if cmd[1].strip() == "":
+                        bot.gameAi.GetObservationsClean()
+                    else:
+                        o = []
+                        if cmd[1].find(",") > -1:
+                            os = cmd[1].split(',')
+                            for i in range(0, len(os)):
+                                o.append(os[i])
+                        else:
+                            o.append(cmd[1])
+                        bot.gameAi.GetObservations(o)
+                else:
+                    bot.gameAi.GetObservationsClean()
+                bot.awaiting_observation = False
+                bot.ReplyArrived()
+
+            elif cmd[0] == "s":
+                if len(cmd) > 1:
+                    bot.gameAi.SetStatus(int(cmd[1]), int(cmd[2]), cmd[3], cmd[4], int(cmd[5]), int(cmd[6]))
+                    bot.awaiting_status = False
+                    bot.ReplyArrived()
+
+            elif cmd[0] == "player":
+                if len(cmd) == 8:
+                    bot.playerList[int(cmd[1])] = PlayerInfo(int(cmd[1]), cmd[2], int(cmd[3]), int(cmd[4]),
+                        int(cmd[5]), int(cmd[6]), LegacyConvertFromString(cmd[7]))
+
+            elif cmd[0] == "g":
+                if len(cmd) == 3:
+                    if bot.gameStatus != cmd[1]:
+                        bot.playerList.clear()
+                    bot.gameStatus = cmd[1]
+                    bot.time = int(cmd[2])
+
+            elif cmd[0] == "u":
+                if len(cmd) > 1:
+                    for i in range(1, len(cmd)):
+                        a = cmd[i].split('#')
+                        if len(a) == 4:
+                            bot.scoreList.append(ScoreBoard(a[0], (a[1] == "connected"), int(a[2]), int(a[3]), (0, 0, 0)))
+                        elif len(a) == 5:
+                            bot.scoreList.append(ScoreBoard(a[0], (a[1] == "connected"), int(a[2]), int(a[3]),
+                                LegacyConvertFromString(a[4])))
+                    bot.sscoreList = ""
+                    for sb in bot.scoreList:
+                        bot.sscoreList += sb.name + "\n"
+                        bot.sscoreList += ("connected" if sb.connected else "offline") + "\n"
+                        bot.sscoreList += str(sb.energy) + "\n"
+                        bot.sscoreList += str(sb.score) + "\n"
+                        bot.sscoreList += "---\n"
+                    bot.scoreList.clear()
+
+            elif cmd[0] == "notification":
+                if len(cmd) > 1:
+                    bot.msg.append(cmd[1])
+
+            elif cmd[0] == "hello":
+                if len(cmd) > 1:
+                    bot.msg.append(cmd[1] + " has entered the game!")
+
+            elif cmd[0] == "goodbye":
+                if len(cmd) > 1:
+                    bot.msg.append(cmd[1] + " has left the game!")
+
+            elif cmd[0] == "changename":
+                if len(cmd) > 1:
+                    bot.msg.append(cmd[1] + " is now known as " + cmd[2] + ".")
+
+            elif cmd[0] == "h":
+                if len(cmd) > 1:
+                    bot.gameAi.GetObservations(["hit"])
+                    bot.msg.append("you hit " + cmd[1])
+
+            elif cmd[0] == "d":
+                if len(cmd) > 1:
+                    bot.gameAi.GetObservations(["damage"])
+                    bot.msg.append(cmd[1] + " hit you")
+
+        except Exception as ex:
+            print(ex)
+
+
+def LoadCommands(path):
+    """ Linhas recebidas já quebradas em ';', como o HandleClient entrega"""
+
+    if path is not None:
+        lines = [line for kind, t, line in ReadTrafficLog(path) if kind == INBOUND]
+    else:
+        lines = GenerateTraffic(4).decode("utf-8").split("\n")
+
+    return [line.split(';') for line in lines if line.find(';') > -1]
+
+
+def Run(name, receive, commands, repeat):
+
+    bot = Bot(client=ReplayClient(), start=False)
+    bot.verbose = False
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cmd in commands:
+            receive(bot, cmd)
+            bot.msg.clear()
+    elapsed = time.perf_counter() - start
+
+    count = len(commands) * repeat
+    print("%-10s %9d messages  %8.3f s  %12.0f messages/s" % (name, count, elapsed, count / elapsed))
+
+
+def DecodeOnly(commands, repeat):
+    """ Só o Codec.Decode, nas mensagens que têm registro (o, s e g não têm)"""
+
+    commands = [cmd for cmd in commands if cmd[0] in Codec.DECODERS]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cmd in commands:
+            Codec.Decode(cmd)
+    elapsed = time.perf_counter() - start
+
+    count = len(commands) * repeat
+    print("%-10s %9d messages  %8.3f s  %12.0f messages/s" % ("decode", count, elapsed, count / max(1e-9, elapsed)))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 message decoding benchmark")
+    parser.add_argument("log", nargs="?", default=None, help="traffic log, synthetic traffic if omitted")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    commands = LoadCommands(args.log)
+    Run("legacy", LegacyReceiveCommand, commands, args.repeat)
+    Run("codec", Bot.ReceiveCommand, commands, args.repeat)
+    DecodeOnly(commands, args.repeat)
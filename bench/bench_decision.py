@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""bench_decision.py: INF1771 Decision.py table checked and timed against GameAI.DecideState on a log.
+
+Replays o log (como Replay.py) e, a cada tick, monta a chave do agente
+(Decision.Key) antes do DecideState e, depois dele, vê o que ele fez
+(Decision.Outcome). Mostra quantos ticks a tabela compilada
+(Decision.Compile, gerada rodando o próprio DecideState) discordou do
+DecideState (deve ser 0: senão Key deixou de ver algo que o DecideState
+olha), quanto custa o DecideState e quanto custaria montar a chave.
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_decision jogo.log [--seed N] [--repeat 20]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import time
+import Decision
+from GameAI import GameAI
+from Replay import Replay
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 decision table benchmark")
+    parser.add_argument("log")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=20, help="key lookups per tick, for the timing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = Decision.Compile()
+    compiled = time.perf_counter() - start
+
+    totals = {"decide": 0.0, "key": 0.0}
+    counts = {"ticks": 0, "different": 0}
+    outcomes = [0] * len(Decision.OUTCOME_NAMES)
+    decide = GameAI.DecideState
+
+    def Measured(ai):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            expected = table[Decision.Key(ai)]
+        totals["key"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        decide(ai)
+        totals["decide"] += time.perf_counter() - start
+
+        outcome = Decision.Outcome(ai)
+        counts["ticks"] += 1
+        outcomes[outcome] += 1
+        if outcome != expected:
+            counts["different"] += 1
+
+    GameAI.DecideState = Measured
+    try:
+        Replay(args.log, args.seed)
+    finally:
+        GameAI.DecideState = decide
+
+    ticks = max(1, counts["ticks"])
+    print("table compiled in %.3f s" % compiled)
+    print("%d decisions, %d where the table differs from DecideState" % (counts["ticks"], counts["different"]))
+    print("  %-24s %8.2f us/decision (state function included)" % ("DecideState", totals["decide"] * 1e6 / ticks))
+    print("  %-24s %8.2f us/decision" % ("Key + table lookup", totals["key"] * 1e6 / (ticks * args.repeat)))
+    for outcome, name in enumerate(Decision.OUTCOME_NAMES):
+        if outcomes[outcome]:
+            print("  %-24s %8d" % (name, outcomes[outcome]))
@@ -0,0 +1,118 @@
+﻿#!/usr/bin/env python
+
+"""bench_framing.py: INF1771 Benchmark of the receive-side line framing.
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_framing [megabytes]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import random
+import sys
+import time
+from Socket.LineBuffer import LineBuffer
+
+
+def GenerateTraffic(megabytes, seed=1771):
+    """ Gera saída parecida com a do servidor: placar grande, rajadas de
+    player/notification e as respostas o/s/g de cada tick. Tem acentos para
+    exercitar UTF-8 multi-byte."""
+
+    rnd = random.Random(seed)
+    names = ["Nattanzinho Carpinteiro", "Elias Carpinteiro", "Ação Direta", "Bot Ñandú", "Zé"]
+    color = "Color [A=255, R=255, G=128, B=0]"
+    scoreboard = "u;" + ";".join(
+        "%s %d#connected#%d#%d#%s" % (rnd.choice(names), i, rnd.randint(0, 5000), rnd.randint(0, 100), color)
+        for i in range(60)) + "\n"
+
+    lines = []
+    size = 0
+    target = megabytes * 1024 * 1024
+    while size < target:
+        kind = rnd.randint(0, 9)
+        if kind == 0:
+            line = scoreboard
+        elif kind < 4:
+            line = "player;%d;%s;%d;%d;%d;%d;%s\n" % (rnd.randint(1, 500), rnd.choice(names),
+                rnd.randint(0, 58), rnd.randint(0, 33), rnd.randint(1, 4), rnd.randint(1, 4), color)
+        elif kind < 6:
+            line = "notification;%s pegou um ouro e está à frente!\n" % rnd.choice(names)
+        elif kind < 8:
+            line = "o;breeze,steps,enemy#3\n"
+        else:
+            line = "s;%d;%d;north;game;%d;%d\ng;Game;%d\n" % (rnd.randint(0, 58), rnd.randint(0, 33),
+                rnd.randint(0, 5000), rnd.randint(0, 100), rnd.randint(0, 600))
+        lines.append(line)
+        size += len(line)
+
+    return "".join(lines).encode("utf-8")
+
+
+def Fragment(data, max_chunk, seed=1771):
+    """ Quebra o fluxo em pedaços de até max_chunk bytes, como chegariam do recv
+    (1024 na thread do HandleClient, até 256 KiB num data_received do asyncio)"""
+
+    rnd = random.Random(seed)
+    chunks = []
+    i = 0
+    while i < len(data):
+        n = rnd.randint(1, max_chunk)
+        chunks.append(data[i:i + n])
+        i += n
+    return chunks
+
+
+def LegacyFraming(chunks):
+    """ Implementação antiga (str re-fatiada a cada linha, decode por pedaço).
+    Usa errors='replace' porque o decode por pedaço quebra em UTF-8 dividido."""
+
+    count = 0
+    offset = ""
+    for chunk in chunks:
+        data = offset + chunk.decode("utf-8", "replace")
+        index = data.find('\n')
+        length = len(data)
+        while index > -1 and index < length:
+            command = data[:index]
+            data = data[(index + 1):]
+            if len(command.strip('\0').strip('\r')) > 0:
+                count += 1
+            index = data.find('\n')
+        offset = data
+    return count
+
+
+def LineBufferFraming(chunks):
+    count = 0
+    lines = LineBuffer()
+    for chunk in chunks:
+        lines.feed(chunk)
+        for command in lines.pop_lines():
+            if len(command.strip('\0').strip('\r')) > 0:
+                count += 1
+    return count
+
+
+def Run(name, function, chunks, total_bytes):
+    start = time.perf_counter()
+    count = function(chunks)
+    elapsed = time.perf_counter() - start
+    print("%-12s %9d lines  %8.3f s  %12.0f lines/s  %8.1f MB/s" %
+          (name, count, elapsed, count / elapsed, total_bytes / elapsed / (1024 * 1024)))
+
+
+if __name__ == "__main__":
+
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    data = GenerateTraffic(megabytes)
+
+    for max_chunk in (1024, 65536, 262144):
+        chunks = Fragment(data, max_chunk)
+        print("%d bytes in %d chunks of up to %d bytes" % (len(data), len(chunks), max_chunk))
+        Run("legacy", LegacyFraming, chunks, len(data))
+        Run("linebuffer", LineBufferFraming, chunks, len(data))
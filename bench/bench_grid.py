@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""bench_grid.py: INF1771 Benchmark of the map scans, list of lists vs Map.Grid.
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_grid [repeticoes]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import random
+import sys
+import time
+from Map.Grid import Grid
+
+
+def RandomMaps(seed=1771):
+    """ Mesmo mapa meio explorado nos dois formatos"""
+
+    rnd = random.Random(seed)
+    legacy = [["#"] * 34 for _ in range(59)]
+    grid = Grid(59, 34)
+    for x in range(59):
+        for y in range(34):
+            c = rnd.choice("#####....??!WWTL" if rnd.random() < 0.1 else "#####....??!WW")
+            legacy[x][y] = c
+            grid.Set(x, y, c)
+    return legacy, grid
+
+
+def LegacyPositions(legacy, c):
+    positions = []
+    for y in range(34):
+        for x in range(59):
+            if legacy[x][y] == c:
+                positions.append((x, y))
+    return positions
+
+
+def LegacyToString(legacy):
+    return "\n".join("".join(column[y] for column in legacy) for y in range(34))
+
+
+def Run(name, function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    elapsed = time.perf_counter() - start
+    print("%-24s %10.2f us/call" % (name, elapsed * 1e6 / repeat))
+
+
+if __name__ == "__main__":
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    legacy, grid = RandomMaps()
+
+    assert LegacyPositions(legacy, "T") == grid.Positions("T")
+    assert LegacyToString(legacy) == grid.ToString()
+
+    Run("legacy golds", lambda: LegacyPositions(legacy, "T"), repeat)
+    Run("grid golds", lambda: grid.Positions("T"), repeat)
+    Run("legacy print_map", lambda: LegacyToString(legacy), repeat)
+    Run("grid print_map", lambda: grid.ToString(), repeat)
+    Run("grid passable+neighbors", lambda: grid.NeighborCount(grid.PassableMask()), repeat)
+    Run("legacy map[x][y]", lambda: legacy[30][20], repeat * 100)
+    Run("grid.Get(x, y)", lambda: grid.Get(30, 20), repeat * 100)
+    Run("grid map[x][y]", lambda: grid[30][20], repeat * 100)
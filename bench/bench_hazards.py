@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""bench_hazards.py: INF1771 Cost per tick of the hazard belief update on a 59x34 map.
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_hazards [ticks] [--pits 0.04] [--teleports 0.02]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import random
+import time
+from Map.HazardBelief import HazardBelief
+from Map.Planner import DX, DY
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 hazard belief benchmark")
+    parser.add_argument("ticks", nargs="?", type=int, default=50000)
+    parser.add_argument("--pits", type=float, default=0.04, help="fraction of pit cells")
+    parser.add_argument("--teleports", type=float, default=0.02, help="fraction of teleport cells")
+    parser.add_argument("--seed", type=int, default=1771)
+    args = parser.parse_args()
+
+    width, height = 59, 34
+    rnd = random.Random(args.seed)
+    pits = set()
+    teleports = set()
+    for x in range(width):
+        for y in range(height):
+            r = rnd.random()
+            if r < args.pits:
+                pits.add((x, y))
+            elif r < args.pits + args.teleports:
+                teleports.add((x, y))
+
+    def Near(cells, x, y):
+        return any((x + DX[d], y + DY[d]) in cells for d in range(4))
+
+    # random walk that never steps on a hazard, as a cautious bot would
+    walk = []
+    x, y = width // 2, height // 2
+    while (x, y) in pits or (x, y) in teleports:
+        x += 1
+    for _ in range(args.ticks):
+        walk.append((x, y, Near(pits, x, y), Near(teleports, x, y)))
+        d = rnd.randrange(4)
+        nx, ny = x + DX[d], y + DY[d]
+        if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in pits and (nx, ny) not in teleports:
+            x, y = nx, ny
+
+    belief = HazardBelief(width, height)
+    times = []
+    changed = 0
+    start = time.perf_counter()
+    for tick in walk:
+        t = time.perf_counter()
+        cells = belief.Observe(*tick)
+        if cells:
+            times.append(time.perf_counter() - t)
+            changed += len(cells)
+    elapsed = time.perf_counter() - start
+    times.sort()
+
+    stats = belief.GetStats()
+    wrong = [(x, y) for x in range(width) for y in range(height)
+             if belief.IsCertain(x, y) and (x, y) not in pits and (x, y) not in teleports]
+    print("%d ticks, %d new observations, %d cells changed, %d certain hazards (%d wrong)" % (
+        args.ticks, stats["observations"], changed, stats["certain"], len(wrong)))
+    print("%8.2f us/tick  new observations: %8.1f us median  %8.1f us p99  %8.1f us max" % (
+        elapsed * 1e6 / args.ticks, times[len(times) // 2] * 1e6,
+        times[int(len(times) * 0.99)] * 1e6, times[-1] * 1e6))
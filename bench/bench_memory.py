@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+"""bench_memory.py: INF1771 Memory and object allocations of Bot and GameAI over a recorded game.
+
+Replays o log duas vezes (como Replay.py): uma sob tracemalloc, para a
+memória atual e o pico, e outra contando os objetos das classes do bot
+criados por tick (Position, PlayerInfo, ScoreBoard, ShotInfo e as
+mensagens do Socket.Codec). Com --agents N mede também a memória de N
+GameAI novos e de N clones do agente do fim do replay (AgentState).
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_memory jogo.log [--seed N] [--top 8] [--agents 100]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import collections
+import os
+import sys
+import tracemalloc
+from GameAI import GameAI
+from Replay import Replay
+
+# files whose __init__ calls are counted
+COUNTED = ("Position.py", "PlayerInfo.py", "ScoreBoard.py", "ShotInfo.py", "Codec.py")
+
+
+def CountConstructions(path, seed):
+    """ Replay contando as chamadas de __init__ das classes em COUNTED, por classe"""
+
+    counts = collections.Counter()
+
+    def Hook(frame, event, arg):
+        if event == "call" and frame.f_code.co_name == "__init__":
+            name = os.path.basename(frame.f_code.co_filename)
+            if name in COUNTED:
+                counts[type(frame.f_locals["self"]).__name__] += 1
+
+    sys.setprofile(Hook)
+    try:
+        stats = Replay(path, seed)
+    finally:
+        sys.setprofile(None)
+    return stats, counts
+
+
+def AgentFootprint(count, make):
+    """ Memória (bytes) por agente de count agentes criados por make()"""
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agents = [make() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / max(1, len(agents))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 memory benchmark")
+    parser.add_argument("log")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--top", type=int, default=8, help="allocation sites to list")
+    parser.add_argument("--agents", type=int, default=0, help="also measure this many fresh and cloned agents")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    stats = Replay(args.log, args.seed)
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    ticks = max(1, stats["ticks"])
+    print("%d lines, %d decisions" % (stats["lines"], stats["ticks"]))
+    print("traced memory    %8.1f KiB now  %8.1f KiB peak" % (current / 1024, peak / 1024))
+    print("retained since start, by line:")
+    for diff in after.compare_to(before, "lineno")[:args.top]:
+        frame = diff.traceback[0]
+        print("  %8.1f KiB %7d blocks  %s:%d" % (diff.size_diff / 1024, diff.count_diff,
+                                                   os.path.relpath(frame.filename), frame.lineno))
+
+    stats, counts = CountConstructions(args.log, args.seed)
+    total = sum(counts.values())
+    print("objects built    %8d  %8.2f per decision  %8.3f per line" % (
+        total, total / ticks, total / max(1, stats["lines"])))
+    for name, n in counts.most_common():
+        print("  %-12s %8d  %8.2f per decision" % (name, n, n / ticks))
+
+    if args.agents:
+        GameAI() # shared tables of the map size are built once, outside the measure
+        played = stats["bot"].gameAi
+        print("per agent        %8.1f KiB new  %8.1f KiB clone after the replay (%d agents)" % (
+            AgentFootprint(args.agents, GameAI) / 1024, AgentFootprint(args.agents, played.Clone) / 1024,
+            args.agents))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""bench_planner.py: INF1771 Benchmark of the A* planner on full 59x34 maps.
+
+Uso (a partir da raiz do repositório):
+    python -m bench.bench_planner [planos] [--walls 0.2]
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import argparse
+import random
+import time
+from Map.Grid import Grid
+from Map.Planner import Planner
+
+
+def RandomGrid(walls, seed, width=59, height=34):
+    """ Mapa todo conhecido, com paredes e "!" espalhados"""
+
+    rnd = random.Random(seed)
+    grid = Grid(width, height, ".")
+    for x in range(width):
+        for y in range(height):
+            r = rnd.random()
+            if r < walls:
+                grid.Set(x, y, "W")
+            elif r < walls * 1.2:
+                grid.Set(x, y, "!")
+    return grid
+
+
+def FreeCell(grid, rnd):
+    while True:
+        x = rnd.randrange(grid.width)
+        y = rnd.randrange(grid.height)
+        if grid.Get(x, y) == ".":
+            return x, y
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INF1771 planner benchmark")
+    parser.add_argument("plans", nargs="?", type=int, default=2000)
+    parser.add_argument("--walls", type=float, default=0.2, help="fraction of wall cells")
+    parser.add_argument("--seed", type=int, default=1771)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    grid = RandomGrid(args.walls, args.seed)
+    planner = Planner(grid)
+    queries = []
+    for _ in range(args.plans):
+        x, y = FreeCell(grid, rnd)
+        tx, ty = FreeCell(grid, rnd)
+        queries.append((x, y, rnd.randrange(4), tx, ty))
+
+    found = length = 0
+    start = time.perf_counter()
+    for query in queries:
+        actions = planner.Plan(*query)
+        if actions is not None:
+            found += 1
+            length += len(actions)
+    elapsed = time.perf_counter() - start
+
+    print("%d plans (%d reachable, %.1f actions avg) in %.3f s" % (
+        args.plans, found, length / max(1, found), elapsed))
+    print("%10.0f plans/s  %8.1f us/plan  %8.0f states expanded/plan" % (
+        args.plans / elapsed, elapsed * 1e6 / args.plans, planner.expanded / args.plans))
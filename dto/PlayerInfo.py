@@ -37,18 +37,12 @@ class State(Enum):
 ''' Player Information '''
 class PlayerInfo():
 
-    node = -1 # Player node id
-    name = "" # Player name
-    x, y = -1, -1  # Player position x, y
-
-    '''Player direction (north,south, east or west)'''
-    dir = Direction.north
-    
-    '''Player state (ready, game, dead or gameover)'''
-    state = State.ready
-    
-    '''Player color (R, G, B)'''
-    color = (0,0,0)
+    __slots__ = ("node",     # Player node id
+                 "name",     # Player name
+                 "x", "y",   # Player position x, y
+                 "dir",      # Player direction (north,south, east or west)
+                 "state",    # Player state (ready, game, dead or gameover)
+                 "color")    # Player color (R, G, B)
         
     # Create a new PlayerInfo DTO
     #################################
@@ -60,6 +54,19 @@ class PlayerInfo():
     # <param name="state">Player state (ready, game, dead or gameover)</param>
     # <param name="color">Player color (R, G, B)</param>
     def __init__(self, node, name, x, y, dir, state, color):
+        self.Update(node, name, x, y, dir, state, color)
+
+    # Overwrite this record with a newer "player" message, so the same
+    # object is kept for the whole game instead of one per message
+    #################################
+    # <param name="node">Player  node id</param>
+    # <param name="name">Player name</param>
+    # <param name="x">Player position x</param>
+    # <param name="y">Player position y</param>
+    # <param name="dir">Player direction (north, southk, east or west)</param>
+    # <param name="state">Player state (ready, game, dead or gameover)</param>
+    # <param name="color">Player color (R, G, B)</param>
+    def Update(self, node, name, x, y, dir, state, color):
         self.node = node
         self.name = name
         self.x = x
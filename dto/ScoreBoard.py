@@ -24,40 +24,33 @@ __email__ = "abaffa@inf.puc-rio.br"
 class ScoreBoard():
 
     # <summary>
-    # Player name
+    # Player name, is player still connected?, player score,
+    # player energy and player color (R, G, B)
     # </summary>
-    name = ""
+    __slots__ = ("name", "connected", "score", "energy", "color")
 
-    # <summary>
-    # Is player still connected?
-    # </summary>
-    connected = False
-
-    # <summary>
-    # Player score
-    # </summary>
-    score = 0
 
     # <summary>
-    # Player energy
-    # </summary>
-    energy = 0
-
-    # <summary>
-    # Player color (R, G, B)
+    # Create a scoreboard DTO
     # </summary>
-    color = (0, 0, 0)
+    # <param name="name">Player name</param>
+    # <param name="connected">Is player still connected?</param>
+    # <param name="score">Player score</param>
+    # <param name="energy">Player energy</param>
+    # <param name="color">Player color</param>
+    def __init__(self, name, connected, score, energy, color):
+        self.Update(name, connected, score, energy, color)
 
 
     # <summary>
-    # Create a scoreboard DTO
+    # Overwrite this entry with a newer scoreboard line
     # </summary>
     # <param name="name">Player name</param>
     # <param name="connected">Is player still connected?</param>
     # <param name="score">Player score</param>
     # <param name="energy">Player energy</param>
     # <param name="color">Player color</param>
-    def __init__(self, name, connected, score, energy, color):
+    def Update(self, name, connected, score, energy, color):
         self.name = name
         self.connected = connected
         self.score = score
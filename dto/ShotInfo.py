@@ -18,7 +18,7 @@ __version__ = "1.0.0"
 __email__ = "abaffa@inf.puc-rio.br"
 #############################################################
 
-from PlayerInfo import Direction
+from dto.PlayerInfo import Direction
 
 # <summary>
 # Shot Information
@@ -26,19 +26,9 @@ from PlayerInfo import Direction
 class ShotInfo():
 
     # <summary>
-    # Shot position x, y
+    # Shot position x, y, direction (north,south, east or west) and color (R, G, B)
     # </summary>
-    x, y = -1, -1
-
-    # <summary>
-    # Shot direction (north,south, east or west)
-    # </summary>
-    dir = Direction.north
-
-    # <summary>
-    # Shot color (R, G, B)
-    # </summary>
-    color = (0,0,0)
+    __slots__ = ("x", "y", "dir", "color")
 
     # <summary>
     # Create a (fire)shot DTO
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""test_batching.py: INF1771 HandleClient outbound batches with a second thread sending.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import threading
+import unittest
+from Socket.HandleClient import HandleClient
+
+
+# <summary>
+# HandleClient without a socket, keeping every write
+# </summary>
+class MemoryClient(HandleClient):
+
+    def __init__(self):
+        self.InitClientState()
+        self.connected = True
+        self.active = True
+        self.writes = []
+
+    def writeBytes(self, data):
+        self.writes.append(data)
+
+
+class BatchingTest(unittest.TestCase):
+
+    def testBatchIsOneWrite(self):
+        client = MemoryClient()
+        client.beginBatch()
+        client.sendMsg("w")
+        client.sendMsg("o")
+        self.assertEqual(client.writes, [])
+        client.flushBatch()
+        self.assertEqual(client.writes, [b"w\no\n"])
+        self.assertEqual(client.latency.Pending("o"), 1)
+
+    def testOtherThreadSendsAreNeverLost(self):
+        client = MemoryClient()
+        ticks = 2000
+
+        def Tick():
+            for _ in range(ticks):
+                client.beginBatch()
+                client.sendMsg("w")
+                client.sendMsg("q")
+                client.flushBatch()
+
+        def Reader():
+            for _ in range(ticks):
+                client.sendMsg("say;x")
+
+        threads = [threading.Thread(target=Tick), threading.Thread(target=Reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = b"".join(client.writes).split(b"\n")[:-1]
+        self.assertEqual(lines.count(b"w"), ticks)
+        self.assertEqual(lines.count(b"q"), ticks)
+        self.assertEqual(lines.count(b"say;x"), ticks)
+        self.assertEqual(client.batch, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""test_decision.py: INF1771 Decision.py table against GameAI.DecideState.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import random
+import unittest
+import Decision
+
+
+class DecisionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Rules checks Key(ai) == key for every agent it sets up and that all of
+        # them get the same outcome from DecideState: a ValueError here fails it
+        cls.table = Decision.Compile()
+
+    def testEveryKeyHasAnOutcome(self):
+        self.assertEqual(len(self.table), 1 << Decision.FEATURE_BITS)
+        self.assertTrue(all(outcome < len(Decision.OUTCOME_NAMES) for outcome in self.table))
+        self.assertGreater(sum(outcome != Decision.UNREACHABLE for outcome in self.table), 0)
+
+    def testUnreachableKeys(self):
+        # baixa sem estar abaixo de 100; dois estados anteriores ao mesmo tempo
+        self.assertEqual(self.table[Decision.F_LOW], Decision.UNREACHABLE)
+        self.assertEqual(self.table[Decision.F_AVOIDING | Decision.F_ESCAPING], Decision.UNREACHABLE)
+
+    def testGoldHereGrabs(self):
+        for key in range(1 << Decision.FEATURE_BITS):
+            if key & Decision.F_GOLD_HERE and self.table[key] != Decision.UNREACHABLE:
+                self.assertEqual(self.table[key], Decision.GRAB)
+
+    def testRandomAgents(self):
+        """ Agentes montados sem Realize: a tabela na chave deles dá o que o DecideState faz"""
+
+        rng = random.Random(1771)
+        states = ["", "grab", "attack", "random_explore", "search_gold", "search_power_up"] + list(Decision.COUNTERS)
+        for _ in range(3000):
+            ai = Decision.MapAgent(rng.getrandbits(Decision.FEATURE_BITS) & Decision.MAP_FEATURES,
+                                   rng.random() < 0.5)
+            ai.observations = (rng.getrandbits(Decision.FEATURE_BITS) & Decision.OBS_FEATURES) << Decision.OBS_SHIFT
+            ai.energy = rng.randint(0, 100)
+            ai.past_state = ai.current_state = rng.choice(states)
+            ai.avoid_hole_ticks = rng.randint(0, ai.max_avoid_hole_ticks + 1)
+            ai.escape_ticks = rng.randint(0, ai.max_escape_ticks)
+            ai.unstuck_ticks = rng.randint(0, ai.max_unstuck_ticks + 1)
+            ai.consecutive_missed_shots = rng.randint(0, ai.max_consecutive_missed_shots)
+            ai.number_of_moves = rng.randint(1, 2 * ai.max_exploration_ticks)
+            ai.golds_found = rng.randint(0, 2 * ai.min_golds_to_start_seaching)
+            start = ai.number_of_moves - rng.randint(0, 2 * ai.max_gold_search_ticks)
+            ai.gold_position_being_searched = {"position": None, "start_time": start}
+            ai.powerup_position_being_searched = {"position": None, "start_time": start}
+
+            key = Decision.Key(ai)
+            ai.DecideState()
+            self.assertEqual(self.table[key], Decision.Outcome(ai), "key %06x" % key)
+
+
+if __name__ == "__main__":
+    unittest.main()
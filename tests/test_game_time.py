@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+"""test_game_time.py: INF1771 GameAI.SetGameTime: the respawn schedule and the server clock.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import unittest
+from GameAI import GameAI
+from Map.Position import Position
+
+
+class GameTimeTest(unittest.TestCase):
+
+    def TakenGold(self):
+        ai = GameAI(seed=1)
+        ai.SetGameTime(100)
+        ai.SetTimedOutGoldPosition(Position(3, 4))
+        return ai
+
+    def testClockGoingBackKeepsTheSchedule(self):
+        ai = self.TakenGold()
+        ai.SetGameTime(99)
+        self.assertTrue(ai.IsGoldPositionTimedOut(Position(3, 4)))
+        self.assertEqual(len(ai.respawns), 1)
+
+    def testResetStartsANewSchedule(self):
+        ai = self.TakenGold()
+        ai.Reset()
+        ai.SetGameTime(0)
+        self.assertFalse(ai.IsGoldPositionTimedOut(Position(3, 4)))
+        self.assertEqual(len(ai.respawns), 0)
+
+    def testFirstGameTimeDropsEstimatedDeadlines(self):
+        ai = GameAI(seed=1)
+        ai.SetTimedOutGoldPosition(Position(3, 4))
+        ai.SetGameTime(500)
+        self.assertEqual(len(ai.respawns), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
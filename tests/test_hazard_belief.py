@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+"""test_hazard_belief.py: INF1771 Map.HazardBelief: certain hazards and the other candidates of a reading.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import unittest
+from Map.HazardBelief import HazardBelief
+
+THRESHOLD = 0.2 # GameAI.max_hazard_probability
+
+
+class HazardBeliefTest(unittest.TestCase):
+
+    def SensedBetweenTwo(self):
+        """ Brisa em (2, 2) com só (1, 2) e (3, 2) como candidatos"""
+
+        belief = HazardBelief(5, 5)
+        belief.Observe(2, 2, True, False)
+        belief.Observe(2, 0, False, False)  # (2, 1) livre
+        belief.Observe(2, 4, False, False)  # (2, 3) livre
+        return belief
+
+    def testSensedSplitsBetweenCandidates(self):
+        belief = self.SensedBetweenTwo()
+        self.assertAlmostEqual(belief.Probability(1, 2), 0.5)
+        self.assertAlmostEqual(belief.Probability(3, 2), 0.5)
+        self.assertTrue(belief.IsKnownSafe(2, 1))
+
+    def testOnlyCandidateIsCertain(self):
+        belief = self.SensedBetweenTwo()
+        belief.Observe(3, 3, False, False)  # (3, 2) livre
+        self.assertTrue(belief.IsCertain(1, 2))
+        self.assertEqual(belief.Probability(1, 2), 1.0)
+        self.assertEqual(belief.Probability(3, 2), 0.0)
+
+    def testCertainHazardDoesNotClearTheOtherCandidates(self):
+        belief = self.SensedBetweenTwo()
+        # (1, 2) fica certo por outra brisa, a de (0, 2)
+        belief.Observe(0, 0, False, False)  # (0, 1) livre
+        belief.Observe(0, 4, False, False)  # (0, 3) livre
+        belief.Observe(0, 2, True, False)
+        self.assertTrue(belief.IsCertain(1, 2))
+        # a brisa de (2, 2) pode ter um segundo buraco em (3, 2)
+        self.assertAlmostEqual(belief.Probability(3, 2), 0.5)
+        self.assertFalse(belief.IsSafe(3, 2, THRESHOLD))
+        self.assertIn((3, 2), belief.Hazards(THRESHOLD))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""test_latency_stats.py: INF1771 Socket.LatencyStats: histogram precision, lost requests and Dump.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import unittest
+from Socket.LatencyStats import LatencyHistogram, RequestTracker
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def testSmallValuesAreExact(self):
+        histogram = LatencyHistogram()
+        for value in range(histogram.sub_buckets):
+            self.assertEqual(histogram.BucketValue(histogram.BucketIndex(value)), value)
+
+    def testRelativeErrorAboveSubBuckets(self):
+        histogram = LatencyHistogram()
+        for value in list(range(histogram.sub_buckets, 5000)) + [10 ** 6, 10 ** 9 + 7, 10 ** 12 + 3]:
+            reported = histogram.BucketValue(histogram.BucketIndex(value))
+            self.assertLessEqual(abs(reported - value), value / histogram.sub_buckets)
+
+
+class RequestTrackerTest(unittest.TestCase):
+
+    def testUnansweredRequestsAreLost(self):
+        tracker = RequestTracker()
+        tracker.on_sent("q", 0.0)
+        self.assertEqual(tracker.Pending("s", 0.5), 1)
+        self.assertEqual(tracker.Pending("s", 2.0), 0)
+        self.assertIsNone(tracker.on_reply("s", 2.0))
+        self.assertEqual(tracker.GetStats()["q"]["lost"], 1)
+
+    def testDumpShowsCommandsWithOnlyLostRequests(self):
+        tracker = RequestTracker()
+        tracker.on_sent("q", 0.0)
+        tracker.Pending("s", 2.0)
+        rows = {line.split()[0]: line.split() for line in tracker.Dump().splitlines()[1:]}
+        self.assertEqual(rows["q"], ["q", "0", "0", "1"])
+        self.assertNotIn("u", rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
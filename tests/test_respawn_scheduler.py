@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""test_respawn_scheduler.py: INF1771 Map.RespawnScheduler: deadlines and one live heap entry per cell.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import unittest
+from Map.RespawnScheduler import RespawnScheduler
+
+
+class RespawnSchedulerTest(unittest.TestCase):
+
+    def testExpiresAfterDeadline(self):
+        respawns = RespawnScheduler()
+        respawns.Schedule(7, 100)
+        self.assertEqual(respawns.Advance(100), 0)
+        self.assertTrue(respawns.IsPending(7, 100))
+        self.assertEqual(respawns.Advance(101), 1)
+        self.assertFalse(respawns.IsPending(7, 101))
+        self.assertEqual(len(respawns), 0)
+
+    def testRescheduleKeepsOneHeapEntry(self):
+        respawns = RespawnScheduler()
+        respawns.Schedule(7, 100)
+        respawns.Schedule(7, 200)
+        self.assertEqual(len(respawns.heap), 1)
+        self.assertEqual(respawns.Advance(150), 0)
+        self.assertTrue(respawns.IsPending(7, 150))
+        self.assertEqual(respawns.Advance(201), 1)
+
+    def testCancelThenScheduleKeepsOneHeapEntry(self):
+        respawns = RespawnScheduler()
+        respawns.Schedule(7, 100)
+        respawns.Cancel(7)
+        self.assertFalse(respawns.IsPending(7, 50))
+        respawns.Schedule(7, 200)
+        self.assertEqual(len(respawns.heap), 1)
+        self.assertEqual(respawns.Advance(150), 0)
+        self.assertTrue(respawns.IsPending(7, 150))
+        self.assertEqual(respawns.Advance(201), 1)
+        self.assertEqual(len(respawns.heap), 0)
+
+    def testEarlierDeadlineReplacesTheEntry(self):
+        respawns = RespawnScheduler()
+        respawns.Schedule(7, 200)
+        respawns.Schedule(7, 100)
+        self.assertEqual(respawns.Advance(101), 1)
+        self.assertFalse(respawns.IsPending(7, 101))
+        # the stale entry of 200 is dropped without counting again
+        self.assertEqual(respawns.Advance(201), 0)
+        self.assertEqual(len(respawns.heap), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
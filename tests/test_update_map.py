@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""test_update_map.py: INF1771 GameAI.UpdateMap: walls after a blocked move and the cell the bot stands on.
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+####################################################################
+#
+# Grupo: Nattanzinho Carpinteiro: Movidos pela paixão
+# Integrantes: Bruno Coutinho, Henrique Peres e Luiz Fellipe Augusto
+#
+####################################################################
+
+import unittest
+from GameAI import GameAI
+from Observations import OBS_BLOCKED
+
+
+class UpdateMapTest(unittest.TestCase):
+
+    def NewAgent(self):
+        ai = GameAI(seed=1)
+        ai.SetStatus(10, 10, "north", "game", 0, 100)
+        return ai
+
+    def testBlockedForwardMarksWallAhead(self):
+        ai = self.NewAgent()
+        ai.current_action = "andar"
+        ai.SetObservations(OBS_BLOCKED)
+        ai.UpdateMap()
+        self.assertEqual(ai.GetCharPosition(ai.GetPositionForward()), "W")
+        self.assertNotEqual(ai.GetCharPosition(ai.GetPositionBehind()), "W")
+
+    def testBlockedBackwardMarksWallBehind(self):
+        ai = self.NewAgent()
+        ai.current_action = "andar_re"
+        ai.SetObservations(OBS_BLOCKED)
+        ai.UpdateMap()
+        self.assertEqual(ai.GetCharPosition(ai.GetPositionBehind()), "W")
+        self.assertNotEqual(ai.GetCharPosition(ai.GetPositionForward()), "W")
+
+    def testStandingOnDangerClearsIt(self):
+        ai = self.NewAgent()
+        ai.SetCell(10, 10, "!")
+        ai.SetObservations(0)
+        ai.UpdateMap()
+        self.assertEqual(ai.map.Get(10, 10), ".")
+
+
+if __name__ == "__main__":
+    unittest.main()